@@ -0,0 +1,282 @@
+"""Signed client of the private endpoints of one exchange account."""
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+
+import requests
+
+import exchange_client
+import resilience
+import trading_bot_auth
+from constants import LOGFILE, URL_DICT
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+def rejected(data) -> bool:
+    """Check whether a parsed response is an error of the exchange, eg: {"code": 422, "message": "...", "status": "error"}."""
+    if not isinstance(data, dict):
+        return False
+    try:
+        return data.get("status") == "error" or int(data.get("code", 200)) >= 400
+    except (TypeError, ValueError):
+        return False
+
+
+def listed_orders(data, request: str) -> list:
+    """Get the orders of an order listing response, eg: of the active orders or order status endpoints.
+
+    Args:
+        data: The parsed response. Eg: {"orders": [...]} or [...].
+        request (str): The request, named in the error. Eg: "active orders of BTCUSDT".
+
+    Returns:
+        list: The orders.
+
+    Raises:
+        Exception: If the exchange rejected the request or the response is not a listing. An error body must never be read as an
+            empty listing, which would look like every order was closed.
+    """
+    orders = data.get("orders") if isinstance(data, dict) else data
+    if rejected(data) or not isinstance(orders, list):
+        raise Exception(f"No listing of the {request}: {data}")
+    return [order for order in orders if isinstance(order, dict) and "id" in order]
+
+
+class AccountClient:
+    """Sign and send the requests of one account.
+
+    The keys are read once per client. The HMAC of the secret key is keyed once and copied for every request, the constant headers
+    are built once and the bodies are serialized by a single compact JSON encoder. Requests go through the pooled sessions of
+    exchange_client.
+    """
+
+    def __init__(
+        self,
+        username: str = "",
+        api_key: str = None,
+        secret_key: str = None,
+        client: exchange_client.ExchangeClient = None,
+    ) -> None:
+        """Create the client of an account.
+
+        Args:
+            username (str, optional): The username whose keys sign the requests. Defaults to "".
+            api_key (str, optional): The API key, to sign with keys that are not stored for a user. Defaults to None.
+            secret_key (str, optional): The secret key that goes with api_key. Defaults to None.
+            client (exchange_client.ExchangeClient, optional): The HTTP client. Defaults to the shared exchange client.
+        """
+        if api_key is None or secret_key is None:
+            credentials = trading_bot_auth.get_user_credentials(username=username)
+            if not isinstance(credentials, tuple):
+                raise Exception(f"Credentials of {username} not found: {credentials}")
+            api_key, secret_key = credentials
+        self.username = username
+        self.credentials = (api_key, secret_key)
+        self.client = exchange_client.CLIENT if client is None else client
+        self._hmac = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+        self._headers = {"Content-Type": "application/json", "X-AUTH-APIKEY": api_key}
+        self._encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def signed(self, body: dict, timestamp: bool = True) -> tuple:
+        """Serialize and sign a request body.
+
+        Args:
+            body (dict): The request body.
+            timestamp (bool, optional): Add the current timestamp in milliseconds to the body. Defaults to True.
+
+        Returns:
+            tuple: The JSON body and the headers of the request.
+        """
+        if timestamp:
+            body = {**body, "timestamp": int(round(time.time() * 1000))}
+        json_body = self._encoder.encode(body)
+        signer = self._hmac.copy()
+        signer.update(json_body.encode())
+        return json_body, {**self._headers, "X-AUTH-SIGNATURE": signer.hexdigest()}
+
+    def post(self, url: str, body: dict, timestamp: bool = True, **kwargs) -> requests.Response:
+        """Send a signed POST request.
+
+        Args:
+            url (str): The endpoint. Eg: URL_DICT["ACCOUNT_BALANCE_URL"].
+            body (dict): The request body without the timestamp.
+            timestamp (bool, optional): Add the current timestamp to the body. Defaults to True.
+            **kwargs: Passed through to requests. Eg: timeout.
+
+        Returns:
+            requests.Response: The response of the exchange.
+        """
+        json_body, headers = self.signed(body, timestamp=timestamp)
+        return self.client.post(url, data=json_body, headers=headers, **kwargs)
+
+    def _request(self, url: str, body: dict, timestamp: bool, **kwargs):
+        # resilience.POLICY is the only layer retrying the request.
+        response = self.post(url, body, timestamp=timestamp, retry=False, **kwargs)
+        if response.status_code >= 500:
+            response.raise_for_status()
+        data = response.json()
+        if isinstance(data, dict) and 401 in data.values():
+            raise Exception("Unauthorized user credentials")
+        return data
+
+    def request(self, url: str, body: dict, timestamp: bool = True, idempotent: bool = False, **kwargs):
+        """Send a signed POST request and parse its JSON body, through the circuit breaker of the endpoint.
+
+        Args:
+            url (str): The endpoint. Eg: URL_DICT["ACCOUNT_BALANCE_URL"].
+            body (dict): The request body without the timestamp.
+            timestamp (bool, optional): Add the current timestamp to the body. Defaults to True.
+            idempotent (bool, optional): Retry the request, signed again, after a transient failure. Only for the reads, orders
+                are never placed twice. Defaults to False.
+            **kwargs: Passed through to requests. Eg: timeout.
+
+        Returns:
+            The parsed JSON response.
+
+        Raises:
+            Exception: If the exchange rejects the credentials.
+            resilience.CircuitOpenError: If the endpoint keeps failing.
+        """
+        return resilience.POLICY.call(url, self._request, url, body, timestamp, idempotent=idempotent, **kwargs)
+
+    def _notify(self, action: str, body: dict, data) -> None:
+        # The error bodies of the exchange changed nothing on the account.
+        if rejected(data):
+            return
+        for listener in list(_LISTENERS):
+            try:
+                listener(self, action, body, data)
+            except Exception as e:
+                logging.info(f"Listener of {action} for {self.username} failed: {e}")
+
+    def create_order(self, order: dict) -> dict:
+        """Place one order. The order is the body of the create order endpoint without the timestamp."""
+        data = self.request(URL_DICT["NEW_ORDER_URL"], order)
+        self._notify("create", order, data)
+        return data
+
+    def create_multiple_orders(self, orders: list) -> dict:
+        """Place several orders in one request. Every order gets the timestamp of the request."""
+        time_stamp = int(round(time.time() * 1000))
+        data = self.request(
+            URL_DICT["CREATE_MULTIPLE_ORDERS_URL"],
+            {"orders": [{**order, "timestamp": time_stamp} for order in orders]},
+            timestamp=False,
+        )
+        self._notify("create", {"orders": orders}, data)
+        return data
+
+    def order_status(self, order_id: str) -> dict:
+        """Get the status of an order."""
+        return self.request(URL_DICT["ORDER_STATUS_URL"], {"id": order_id}, idempotent=True)
+
+    def order_statuses(self, ids: list) -> list:
+        """Get the status of several orders in one request."""
+        return self.request(URL_DICT["MULTIPLE_ORDER_STATUS_URL"], {"ids": list(ids)}, idempotent=True)
+
+    def active_orders_count(self, market: str = "", side: str = "") -> int:
+        """Get the number of active orders, of a market and side if given."""
+        body = {key: value for key, value in (("market", market), ("side", side)) if value}
+        return int(self.request(URL_DICT["ACTIVE_ORDERS_COUNT_URL"], body, idempotent=True)["count"])
+
+    def active_orders(self, market: str = "", side: str = "") -> dict:
+        """Get the active orders, of a market and side if given."""
+        body = {key: value for key, value in (("market", market), ("side", side)) if value}
+        return self.request(URL_DICT["ACTIVE_ORDERS_URL"], body, idempotent=True)
+
+    def trade_history(self, limit: int = 500, sort: str = "desc", from_id: int = None) -> list:
+        """Get the trades of the account, from the trade from_id on if given."""
+        body = {"limit": limit, "sort": sort}
+        if from_id is not None:
+            body["from_id"] = from_id
+        return self.request(URL_DICT["ACCOUNT_TRADE_HISTORY_URL"], body, idempotent=True)
+
+    def cancel_order(self, order_id: str) -> dict:
+        """Cancel one order."""
+        body = {"id": f"{order_id}"}
+        data = self.request(URL_DICT["CANCEL_ONE_ACTIVE_ORDER_URL"], body)
+        self._notify("cancel", body, data)
+        return data
+
+    def cancel_all_orders(self, market: str = "", side: str = "") -> dict:
+        """Cancel the active orders, of a market and side if given."""
+        body = {key: value for key, value in (("market", market), ("side", side)) if value}
+        data = self.request(URL_DICT["CANCEL_ALL_ACTIVE_ORDERS_URL"], body)
+        self._notify("cancel_all", body, data)
+        return data
+
+    def cancel_multiple_by_ids(self, ids: list) -> dict:
+        """Cancel the orders of ids in one request."""
+        body = {"ids": ids}
+        data = self.request(URL_DICT["CANCEL_MULTIPLE_ACTIVE_ORDERS_BY_IDS_URL"], body, timestamp=False)
+        self._notify("cancel_by_ids", body, data)
+        return data
+
+    def edit_price(self, order_id: str, price: float) -> dict:
+        """Change the price of an order."""
+        body = {"id": f"{order_id}", "price_per_unit": f"{price}"}
+        data = self.request(URL_DICT["EDIT_PRICE_URL"], body)
+        self._notify("edit_price", body, data)
+        return data
+
+    def balances(self) -> list:
+        """Get the balance of every currency of the account."""
+        return self.request(URL_DICT["ACCOUNT_BALANCE_URL"], {}, idempotent=True)
+
+    def fetch_lend_orders(self) -> list:
+        """Get the lend orders of the account."""
+        return self.request(URL_DICT["FETCH_LEND_ORDERS_URL"], {}, idempotent=True)
+
+    def lend_order(self, coin_name: str, amount: float) -> dict:
+        """Lend an amount of a coin to the exchange."""
+        return self.request(URL_DICT["LEND_ORDERS_URL"], {"currency_short_name": coin_name, "amount": amount})
+
+    def settle_orders(self) -> dict:
+        """Settle the lend orders of the account."""
+        return self.request(URL_DICT["SETTLE_ORDERS_URL"], {})
+
+
+_ACCOUNTS = {}
+_ACCOUNTS_LOCK = threading.Lock()
+_LISTENERS = []
+
+
+def add_listener(listener) -> None:
+    """Call listener(client, action, body, data) after every order the exchange accepted to place, cancel or edit.
+
+    Args:
+        listener (callable): Gets the AccountClient, the action ("create", "cancel", "cancel_all", "cancel_by_ids" or "edit_price"),
+            the body of the request without the timestamp and the parsed response. Its errors are logged, never raised.
+    """
+    if listener not in _LISTENERS:
+        _LISTENERS.append(listener)
+
+
+def account(username: str) -> AccountClient:
+    """Get the client of an account, reused across calls while the credentials of the user do not change.
+
+    Args:
+        username (str): The username of the account.
+
+    Returns:
+        AccountClient: The client of the account.
+    """
+    credentials = trading_bot_auth.get_user_credentials(username=username)
+    client = _ACCOUNTS.get(username)
+    if client is None or client.credentials != credentials:
+        with _ACCOUNTS_LOCK:
+            client = _ACCOUNTS.get(username)
+            if client is None or client.credentials != credentials:
+                if not isinstance(credentials, tuple):
+                    raise Exception(f"Credentials of {username} not found: {credentials}")
+                client = _ACCOUNTS[username] = AccountClient(username, api_key=credentials[0], secret_key=credentials[1])
+    return client
@@ -0,0 +1,313 @@
+"""Asyncio HTTP client with async variants of the market data functions and the signed private endpoints.
+
+One event loop drives many concurrent requests over a shared aiohttp connection pool instead of blocking a thread per request.
+Synchronous code runs the coroutines with run_sync, which submits them to a background event loop.
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+import pandas as pd
+
+import account_client
+import exchange_client
+import market_registry
+import rate_limiter
+import ticker_decoder
+from constants import EXCHANGE_CLIENT_CONFIG, LOGFILE, URL_DICT
+from single_flight import AsyncSingleFlight
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AsyncExchangeClient:
+    """Asyncio counterpart of exchange_client.ExchangeClient, sized by the same `exchange_client` section of the config file.
+
+    Every event loop gets one aiohttp session with a keep-alive connection pool and one semaphore per host capping the requests in
+    flight at max_per_host. Concurrent GET requests of the same url and params share one request. Only GET requests are retried on
+    throttling and server errors, once the rate limiter allows it. Signed POST requests are never replayed.
+    """
+
+    def __init__(self, config: dict = EXCHANGE_CLIENT_CONFIG, limiter: rate_limiter.RateLimiter = None) -> None:
+        """Create the client. The session of an event loop is created on its first request.
+
+        Args:
+            config (dict, optional): Pool size, timeouts and retries. Defaults to EXCHANGE_CLIENT_CONFIG.
+            limiter (rate_limiter.RateLimiter, optional): The rate limits of the requests, shared with the synchronous client.
+                Defaults to the shared limiter.
+        """
+        self.config = config
+        self.limiter = rate_limiter.LIMITER if limiter is None else limiter
+        self.timeout = aiohttp.ClientTimeout(
+            total=float(config["read_timeout"]), connect=float(config["connect_timeout"])
+        )
+        self._loops = {}
+        self._lock = threading.Lock()
+
+    def _state(self) -> dict:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None or state["session"].closed:
+                connector = aiohttp.TCPConnector(
+                    limit=int(self.config["pool_maxsize"]) * int(self.config["pool_connections"]),
+                    limit_per_host=int(self.config["pool_maxsize"]),
+                )
+                state = {
+                    "session": aiohttp.ClientSession(connector=connector, timeout=self.timeout),
+                    "limits": {},
+                    "flight": AsyncSingleFlight(),
+                }
+                self._loops[loop] = state
+            return state
+
+    def _host_limit(self, state: dict, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        limit = state["limits"].get(host)
+        if limit is None:
+            limit = state["limits"][host] = asyncio.Semaphore(int(self.config["max_per_host"]))
+        return limit
+
+    async def request(self, method: str, url: str, **kwargs):
+        """Send a request through the pooled session of the running event loop and parse its JSON body.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The url to request.
+            **kwargs: Passed through to aiohttp. Eg: params, data, headers.
+
+        Returns:
+            The parsed JSON body of the response.
+        """
+        state = self._state()
+        retries = int(self.config["retries"]) if method == "GET" else 0
+        for attempt in range(retries + 1):
+            await self.limiter.acquire_async(url)
+            async with self._host_limit(state, url):
+                async with state["session"].request(method, url, **kwargs) as response:
+                    self.limiter.record(url, response.status, response.headers)
+                    if response.status not in RETRY_STATUSES or attempt == retries:
+                        return await response.json(content_type=None, loads=ticker_decoder.loads)
+            await asyncio.sleep(float(self.config["backoff_factor"]) * 2**attempt)
+
+    async def get(self, url: str, **kwargs):
+        """Send a GET request and parse its JSON body. The concurrent callers of the same url and params share one request and its
+        parsed body, which they must not modify."""
+        key = exchange_client.request_key(url, kwargs.get("params"))
+        return await self._state()["flight"].do(key, self.request, "GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        """Send a POST request and parse its JSON body."""
+        return await self.request("POST", url, **kwargs)
+
+    def coalescing_stats(self) -> dict:
+        """Get the GET requests sent, the callers that shared one and the share of the callers coalesced, over every event loop."""
+        with self._lock:
+            flights = [state["flight"].stats() for state in self._loops.values()]
+        calls = sum(stats["calls"] for stats in flights)
+        shared = sum(stats["shared"] for stats in flights)
+        callers = calls + shared
+        return {
+            "calls": calls,
+            "shared": shared,
+            "in_flight": sum(stats["in_flight"] for stats in flights),
+            "coalescing_ratio": round(shared / callers, 4) if callers else 0.0,
+        }
+
+    async def close(self) -> None:
+        """Close the session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.pop(loop, None)
+        if state is not None:
+            await state["session"].close()
+
+
+CLIENT = AsyncExchangeClient()
+_LOOP = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="async_exchange_client", daemon=True).start()
+        return _LOOP
+
+
+def run_sync(coroutine, timeout: float = None):
+    """Run a coroutine on the background event loop of the module from synchronous code and wait for its result.
+
+    Args:
+        coroutine: The coroutine. Eg: get_candles_many(["BTCUSDT", "ETHUSDT"]).
+        timeout (float, optional): Seconds to wait for the result. Defaults to None to wait until it finishes.
+
+    Returns:
+        The result of the coroutine.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, _background_loop()).result(timeout)
+
+
+async def get_ticker(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False) -> pd.DataFrame:
+    """Async variant of trading_bot.get_ticker.
+
+    Args:
+        coin_1 (str, optional): The coin to check the price for. Defaults to "BTC".
+        coin_2 (str, optional): The coin to check the price against. Defaults to "USDT".
+        all_coins (bool, optional): Get the ticker of every market. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The ticker of the market, or of every market decoded by ticker_decoder.decode. None if the market is not
+            listed.
+    """
+    data = await CLIENT.get(URL_DICT["TICKER_URL"])
+    if all_coins:
+        return ticker_decoder.decode(data)
+    for coins in data:
+        if coins["market"] == coin_1.upper() + coin_2.upper():
+            # The ticker may be shared with concurrent callers.
+            coins = dict(coins)
+            coins["unix_timestamp"] = coins["timestamp"]
+            coins["timestamp"] = datetime.fromtimestamp(coins["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+            return pd.DataFrame.from_dict([coins])
+
+
+async def get_market_data() -> pd.DataFrame:
+    """Async variant of the market data download of trading_bot.get_market_data, without the leverage columns.
+
+    Returns:
+        pd.DataFrame: The market data of the USDT, BTC and VRA markets sorted by market.
+    """
+    data = await CLIENT.get(URL_DICT["MARKET_DATA_URL"])
+    markets = [
+        coins
+        for coins in data
+        if "insta" not in coins["market"] and any(quote in coins["market"] for quote in ("USDT", "BTC", "VRA"))
+    ]
+    if not markets:
+        return pd.DataFrame()
+    dataframe = ticker_decoder.decode(markets)
+    dataframe["timestamp"] = pd.to_datetime(dataframe["timestamp"], unit="ms")
+    return dataframe.sort_values("market").reset_index(drop=True)
+
+
+async def get_markets_details(coin_1: str = "", coin_2: str = "USDT", all_coins: bool = False) -> pd.DataFrame:
+    """Async variant of trading_bot.get_markets_details.
+
+    Args:
+        coin_1 (str, optional): The coin to get the details of. Defaults to "".
+        coin_2 (str, optional): The quote currency. Defaults to "USDT".
+        all_coins (bool, optional): Get the details of every market quoted in coin_2. Defaults to False.
+
+    Returns:
+        pd.DataFrame: The market details.
+    """
+    data = await CLIENT.get(URL_DICT["MARKET_DETAILS_URL"])
+    coin_1 = coin_1.upper()
+    coin_2 = coin_2.upper()
+    if all_coins:
+        return pd.DataFrame.from_dict([coins for coins in data if coin_2 in coins["symbol"]])
+    return pd.DataFrame.from_dict([coins for coins in data if coins["symbol"] == coin_1 + coin_2])
+
+
+async def get_candles(coin_1: str = "BTC", coin_2: str = "USDT", limit: int = 100, interval: str = "4h") -> pd.DataFrame:
+    """Async variant of trading_bot.get_candles.
+
+    Args:
+        coin_1 (str, optional): Symbol of coin_1. Defaults to "BTC".
+        coin_2 (str, optional): Symbol of coin_2. Defaults to "USDT".
+        limit (int, optional): maximum 1000 candles. Defaults to 100.
+        interval (str, optional): [1m 5m 15m 30m 1h 2h 4h 6h 8h 1d 3d 1w 1M]. Defaults to "4h".
+
+    Returns:
+        pd.DataFrame: The candles, latest first.
+    """
+    # The registry may download the markets details, which must not block the event loop.
+    pair = await asyncio.to_thread(market_registry.REGISTRY.pair, coin_1.upper(), coin_2.upper())
+    data = await CLIENT.get(URL_DICT["CANDLES_URL"], params={"pair": pair, "interval": interval, "limit": limit})
+    dataframe = pd.DataFrame.from_dict(data)
+    if not dataframe.empty:
+        dataframe["time"] = pd.to_datetime(dataframe["time"], unit="ms")
+    return dataframe
+
+
+async def get_candles_many(markets: list, limit: int = 100, interval: str = "4h") -> dict:
+    """Get the candles of many markets concurrently.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        limit (int, optional): maximum 1000 candles. Defaults to 100.
+        interval (str, optional): [1m 5m 15m 30m 1h 2h 4h 6h 8h 1d 3d 1w 1M]. Defaults to "4h".
+
+    Returns:
+        dict: The candles of every market keyed by market. None for the markets whose request failed.
+    """
+
+    async def fetch(market):
+        coin_1, coin_2 = await asyncio.to_thread(market_registry.REGISTRY.split, market)
+        try:
+            return await get_candles(coin_1=coin_1, coin_2=coin_2, limit=limit, interval=interval)
+        except Exception as e:
+            logging.info(f"Error in the async get_candles for {market}: {e}")
+            return None
+
+    results = await asyncio.gather(*(fetch(market) for market in markets))
+    return dict(zip(markets, results))
+
+
+async def private_post(url: str, body: dict, username: str):
+    """Send a signed request to a private endpoint of the exchange.
+
+    Args:
+        url (str): The endpoint. Eg: URL_DICT["ACCOUNT_BALANCE_URL"].
+        body (dict): The request body without the timestamp, which is added here.
+        username (str): The username whose keys sign the request.
+
+    Returns:
+        The parsed JSON response.
+    """
+    # The keys may be read from the database, which must not block the event loop.
+    account = await asyncio.to_thread(account_client.account, username)
+    json_body, headers = account.signed(body)
+    response = await CLIENT.post(url, data=json_body, headers=headers)
+    if isinstance(response, dict) and 401 in response.values():
+        raise Exception("Unauthorized user credentials")
+    return response
+
+
+async def get_account_balance(username: str) -> list:
+    """Async variant of the balances request of trading_bot.get_account_balance, without the valuation."""
+    return await private_post(URL_DICT["ACCOUNT_BALANCE_URL"], {}, username)
+
+
+async def get_active_orders(username: str, market: str = "", side: str = "") -> dict:
+    """Async variant of trading_bot.get_active_orders."""
+    body = {key: value for key, value in (("market", market), ("side", side)) if value}
+    return await private_post(URL_DICT["ACTIVE_ORDERS_URL"], body, username)
+
+
+async def get_order_status(username: str, order_id: str) -> dict:
+    """Get the status of an order."""
+    return await private_post(URL_DICT["ORDER_STATUS_URL"], {"id": order_id}, username)
+
+
+async def create_order(username: str, order: dict) -> dict:
+    """Place one order. The order is the body of the create order endpoint without the timestamp."""
+    return await private_post(URL_DICT["NEW_ORDER_URL"], order, username)
+
+
+async def cancel_order(username: str, order_id: str) -> dict:
+    """Async variant of trading_bot.cancel_order."""
+    return await private_post(URL_DICT["CANCEL_ONE_ACTIVE_ORDER_URL"], {"id": order_id}, username)
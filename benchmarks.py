@@ -0,0 +1,1131 @@
+"""Benchmarks of the hot paths of the trading bot against stubbed exchange responses.
+
+Run with `python benchmarks.py`. No request leaves the machine: the exchange responses are served from synthetic payloads with a
+simulated network latency so that call counts and wall times can be compared before and after an optimization.
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import hmac
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pandas as pd
+import requests
+import sqlalchemy
+
+import account_client
+import async_exchange_client
+import candle_cache
+import constants
+import database_handler
+import exchange_client
+import indicators
+import market_registry
+import order_book
+import order_gateway
+import order_journal
+import order_maintenance
+import order_tracker
+import rate_limiter
+import resilience
+import ticker_decoder
+import ticker_snapshot
+import trading_bot
+import trading_bot_auth
+import tradingview_batch
+
+PARSER = argparse.ArgumentParser()
+
+
+class StubResponse:
+    """Minimal stand in for requests.Response serving a fixed payload."""
+
+    def __init__(self, payload) -> None:
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self.payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+def check(condition: bool, message: str) -> None:
+    """Fail the benchmark when an optimized path does not give the result of the path it replaces."""
+    if not condition:
+        raise Exception(f"Check failed: {message}")
+
+
+def synthetic_ticker(number_of_markets: int = 500) -> list:
+    """Build a ticker payload with number_of_markets USDT markets and a USDC market for every tenth coin."""
+    ticker = []
+    for index in range(number_of_markets):
+        ticker.append({"market": f"COIN{index}USDT", "last_price": str(1.0 + index), "timestamp": 1700000000})
+        if index % 10 == 0:
+            ticker.append({"market": f"COIN{index}USDC", "last_price": str(1.0 + index), "timestamp": 1700000000})
+    return ticker
+
+
+def synthetic_markets_details(number_of_markets: int = 500) -> list:
+    """Build a markets_details payload matching synthetic_ticker."""
+    return [
+        {
+            "coindcx_name": f"COIN{index}USDT",
+            "symbol": f"COIN{index}USDT",
+            "pair": f"B-COIN{index}_USDT",
+            "base_currency_short_name": "USDT",
+            "target_currency_short_name": f"COIN{index}",
+            "ecode": "B",
+            "max_leverage": index % 5,
+            "max_leverage_short": index % 3,
+        }
+        for index in range(number_of_markets)
+    ]
+
+
+def synthetic_balances(holdings: int = 30) -> list:
+    """Build a balances payload with holdings coins."""
+    return [
+        {"currency": f"COIN{index * 7}", "balance": str(10.0 + index), "locked_balance": "1.0"}
+        for index in range(holdings)
+    ]
+
+
+def stub_exchange(payloads: dict, latency: float = 0.05) -> mock.Mock:
+    """Stub the GET requests of the shared exchange client so that they serve payloads[url] after sleeping latency seconds."""
+
+    def get(url, **kwargs):
+        time.sleep(latency)
+        return StubResponse(payloads[url.split("?")[0]])
+
+    return mock.Mock(side_effect=get)
+
+
+class JsonStubServer:
+    """Local HTTP server answering every GET and POST request with JSON, standing in for the exchange.
+
+    respond is called with the parsed body of the request, None for a GET, and returns the payload to send with a 200, or a
+    (status, payload, headers) tuple. A payload that is already bytes is sent as it is. The requests served are counted.
+    """
+
+    def __init__(self, respond, latency: float = 0.0) -> None:
+        """Start the server on a free local port.
+
+        Args:
+            respond (callable): Returns the payload, or the status, payload and headers, of a request from its parsed body.
+            latency (float, optional): The seconds slept before answering every request. Defaults to 0.0.
+        """
+        self.respond = respond
+        self.latency = latency
+        self.served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def _handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self._send(*stub.answer(json.loads(self.rfile.read(length)) if length else None))
+
+            do_POST = do_GET
+
+            def _send(self, status, payload, headers):
+                self.send_response(status)
+                for name, value in {"Content-Type": "application/json", **headers}.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def answer(self, body) -> tuple:
+        """Get the status, the encoded payload and the headers of the answer to a request."""
+        with self._lock:
+            self.served += 1
+        if self.latency:
+            time.sleep(self.latency)
+        reply = self.respond(body)
+        status, payload, headers = reply if isinstance(reply, tuple) else (200, reply, {})
+        return status, payload if isinstance(payload, bytes) else json.dumps(payload).encode(), headers
+
+    def url(self, path: str) -> str:
+        """Get the url of a path on the server. Eg: url("/exchange/ticker")."""
+        return f"http://127.0.0.1:{self._server.server_port}{path}"
+
+    def shutdown(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def legacy_value_balances(balances: pd.DataFrame) -> pd.DataFrame:
+    """The per coin valuation loop get_account_balance used before value_balances: up to four ticker downloads per coin."""
+    dataframe = balances.copy()
+    dataframe = dataframe[(dataframe["balance"].astype(float) > 0.0) | (dataframe["locked_balance"].astype(float) > 0.0)]
+    for coin in dataframe["currency"]:
+        selected = dataframe["currency"] == coin
+        try:
+            dataframe.loc[selected, "quantity"] = dataframe.loc[selected]["balance"].astype(float)
+            dataframe.loc[selected, "balance"] = float(dataframe.loc[selected]["balance"]) * float(
+                trading_bot.get_ticker(coin_1=coin, max_age=0)["last_price"]
+            )
+            dataframe.loc[selected, "locked_balance"] = float(dataframe.loc[selected]["locked_balance"]) * float(
+                trading_bot.get_ticker(coin_1=coin, max_age=0)["last_price"]
+            )
+        except Exception:
+            try:
+                dataframe.loc[selected, "balance"] = float(dataframe.loc[selected]["balance"]) * float(
+                    trading_bot.get_ticker(coin_1=coin, coin_2="USDC", max_age=0)["last_price"]
+                )
+                dataframe.loc[selected, "locked_balance"] = float(dataframe.loc[selected]["locked_balance"]) * float(
+                    trading_bot.get_ticker(coin_1=coin, coin_2="USDC", max_age=0)["last_price"]
+                )
+            except Exception:
+                pass
+    dataframe = dataframe[(dataframe["balance"].astype(float) > 0.5) | (dataframe["locked_balance"].astype(float) > 0.5)]
+    dataframe = dataframe[dataframe["quantity"] > 0.01]
+    market_dataframe = pd.DataFrame(
+        exchange_client.get(market_registry.REGISTRY.url).json()
+    )[["coindcx_name", "max_leverage"]]
+    market_dataframe.columns = ["currency", "max_leverage"]
+    for coin in list(dataframe["currency"]):
+        dataframe["currency"] = dataframe["currency"].replace(coin, coin + "USDT")
+        if coin + "USDT" not in market_dataframe["currency"].values:
+            dataframe = dataframe.drop(dataframe[dataframe["currency"] == coin + "USDT"].index)
+    dataframe = pd.merge(dataframe, market_dataframe, on="currency", how="left")
+    return dataframe.rename(columns={"currency": "market"})
+
+
+def benchmark_account_balance(holdings: int = 30, latency: float = 0.05) -> dict:
+    """Compare the HTTP call count and latency of the legacy per coin valuation with value_balances.
+
+    Args:
+        holdings (int, optional): The number of coins held. Defaults to 30.
+        latency (float, optional): The simulated latency of one HTTP call in seconds. Defaults to 0.05.
+
+    Returns:
+        dict: The call count and the seconds taken by each valuation path.
+    """
+    payloads = {
+        ticker_snapshot.TICKER.url: synthetic_ticker(),
+        market_registry.REGISTRY.url: synthetic_markets_details(),
+    }
+    balances = pd.DataFrame(synthetic_balances(holdings))
+    results = {}
+    with mock.patch.object(exchange_client.CLIENT, "get", stub_exchange(payloads, latency)) as get:
+        start = time.perf_counter()
+        before = legacy_value_balances(balances)
+        results["before"] = {"calls": get.call_count, "seconds": round(time.perf_counter() - start, 3)}
+        get.reset_mock()
+        start = time.perf_counter()
+        after = trading_bot.value_balances(
+            balances,
+            ticker_snapshot.TICKER.markets(max_age=0),
+            pd.DataFrame(exchange_client.get(market_registry.REGISTRY.url).json()),
+        )
+        results["after"] = {"calls": get.call_count, "seconds": round(time.perf_counter() - start, 3)}
+    columns = ["market", "quantity", "balance", "locked_balance", "max_leverage"]
+    check(
+        before[columns].astype({"balance": float, "locked_balance": float}).reset_index(drop=True).equals(after[columns]),
+        "value_balances values the holdings differently from the legacy loop",
+    )
+    print(f"get_account_balance valuation of {holdings} holdings: {results}")
+    return results
+
+
+class StubAnalysis:
+    """Minimal stand in for tradingview_ta.Analysis."""
+
+    def __init__(self, symbol: str) -> None:
+        self.indicators = {"RSI": float(len(symbol)), "BB.lower": 1.0, "BB.upper": 2.0, "MACD.macd": 0.0, "MACD.signal": 0.0}
+
+
+def stub_tradingview(listed: set, latency: float = 0.05) -> mock.Mock:
+    """Stub get_multiple_analysis so that it knows only the symbols in listed after sleeping latency seconds."""
+
+    def get_multiple_analysis(screener, interval, symbols, timeout=None):
+        time.sleep(latency)
+        return {symbol: StubAnalysis(symbol) if symbol in listed else None for symbol in symbols}
+
+    return mock.Mock(side_effect=get_multiple_analysis)
+
+
+def benchmark_tradingview_scan(number_of_markets: int = 300, latency: float = 0.05) -> dict:
+    """Compare the TradingView request count and latency of a per symbol all coins scan with tradingview_batch.get_indicators.
+
+    Nine markets out of ten are listed on Binance and the rest are only found on the first fallback exchange.
+
+    Args:
+        number_of_markets (int, optional): The number of markets scanned. Defaults to 300.
+        latency (float, optional): The simulated latency of one TradingView request in seconds. Defaults to 0.05.
+
+    Returns:
+        dict: The request count and the seconds taken by each scan.
+    """
+    markets = [f"COIN{index}USDT" for index in range(number_of_markets)]
+    fallback = tradingview_batch.TRADINGVIEW_CONFIG["fallback_exchanges"][0].upper()
+    listed = {f"BINANCE:{market}" if index % 10 else f"{fallback}:{market}" for index, market in enumerate(markets)}
+    results = {}
+    with mock.patch.object(tradingview_batch, "get_multiple_analysis", stub_tradingview(listed, latency)) as tradingview, mock.patch.object(
+        market_registry.REGISTRY, "ecode", return_value=None
+    ):
+        start = time.perf_counter()
+        for market in markets:
+            for exchange in ["BINANCE", fallback]:
+                # TA_Handler.get_analysis makes one request per symbol and exchange tried.
+                if tradingview(screener="crypto", interval="4h", symbols=[f"{exchange}:{market}"])[f"{exchange}:{market}"]:
+                    break
+        results["before"] = {"requests": tradingview.call_count, "seconds": round(time.perf_counter() - start, 3)}
+        tradingview.reset_mock()
+        start = time.perf_counter()
+        found = tradingview_batch.get_indicators(markets)
+        results["after"] = {
+            "requests": tradingview.call_count,
+            "seconds": round(time.perf_counter() - start, 3),
+            "markets": len(found),
+        }
+    print(f"TradingView scan of {number_of_markets} markets: {results}")
+    return results
+
+
+def synthetic_candles(limit: int = 300) -> list:
+    """Build a candles payload of limit 4h candles, latest first like the exchange."""
+    return [
+        {"open": 1.0 + index % 7, "high": 2.0 + index % 7, "low": 0.5, "close": 1.5 + index % 5, "volume": 10.0, "time": 1700000000000 - index * 14400000}
+        for index in range(limit)
+    ]
+
+
+def benchmark_scanner(number_of_markets: int = 100, latency: float = 0.05, workers: int = 8) -> dict:
+    """Compare a serial all coins candle scan with the scanner thread pool on get_local_indicators.
+
+    Args:
+        number_of_markets (int, optional): The number of markets scanned. Defaults to 100.
+        latency (float, optional): The simulated latency of one HTTP call in seconds. Defaults to 0.05.
+        workers (int, optional): The number of scanner threads. Defaults to 8.
+
+    Returns:
+        dict: The seconds taken and the number of markets with indicators for each scan.
+    """
+    payloads = {
+        market_registry.REGISTRY.url: synthetic_markets_details(number_of_markets),
+        constants.URL_DICT["CANDLES_URL"]: synthetic_candles(),
+    }
+    markets = [f"COIN{index}USDT" for index in range(number_of_markets)]
+    results, scans = {}, {}
+    with mock.patch.object(exchange_client.CLIENT, "get", stub_exchange(payloads, latency)):
+        market_registry.REGISTRY.refresh()
+        for name, pool_size in (("serial", 1), ("scanner", workers)):
+            candle_cache.CACHE.invalidate()
+            start = time.perf_counter()
+            found = trading_bot.get_local_indicators(markets, interval="4h", pivots=False, workers=pool_size)
+            results[name] = {"seconds": round(time.perf_counter() - start, 3), "markets": len(found)}
+            scans[name] = found
+    check(scans["serial"].equals(scans["scanner"]), "the scanner pool computes other indicators than the serial scan")
+    # The markets with a short history must not cut the indicators of the others.
+    candles = {market: pd.DataFrame(synthetic_candles(limit)) for market, limit in (("LONGUSDT", 300), ("SHORTUSDT", 8))}
+    many = indicators.compute_indicators_many(candles)
+    single = indicators.compute_indicators(candles["LONGUSDT"])
+    check(
+        all(abs(many.loc["LONGUSDT", name] - single[name]) < 1e-9 for name in ("RSI", "EMA200")),
+        "compute_indicators_many differs from compute_indicators next to a short history",
+    )
+    print(f"Local indicator scan of {number_of_markets} markets: {results}")
+    return results
+
+
+def sqlite_users_engine(users: int = 20) -> sqlalchemy.engine.Engine:
+    """Build a pooled engine over a temporary SQLite users table attached as the trading_bot schema.
+
+    The users are named user0, user1, ... and all have the keys "api_key" and "secret_key", encrypted like in the MySQL database.
+    """
+    directory = tempfile.mkdtemp()
+    users_file = os.path.join(directory, "trading_bot.db")
+    api_key = database_handler.encrypt_data(password="api_key")["password"].decode("utf-8")
+    secret_key = database_handler.encrypt_data(password="secret_key")["password"].decode("utf-8")
+    with sqlite3.connect(users_file) as connection:
+        connection.execute("CREATE TABLE users (username TEXT PRIMARY KEY, api_key TEXT, secret_key TEXT)")
+        connection.executemany(
+            "INSERT INTO users VALUES (?, ?, ?)", [(f"user{index}", api_key, secret_key) for index in range(users)]
+        )
+    engine = database_handler.create_pooled_engine(
+        f"sqlite:///{os.path.join(directory, 'main.db')}", connect_args={"check_same_thread": False}
+    )
+
+    def attach(dbapi_connection, connection_record):
+        dbapi_connection.execute(f"ATTACH DATABASE '{users_file}' AS trading_bot")
+
+    database_handler.event.listen(engine, "connect", attach)
+    return engine
+
+
+def benchmark_database_pool(users: int = 20, lookups: int = 400, threads: int = 16) -> dict:
+    """Stress database_handler.get_user_credentials from many threads and check that the connection count stays flat.
+
+    The users table lives in a temporary SQLite file attached as the trading_bot schema, served through the same pooled engine
+    setup as the MySQL database.
+
+    Args:
+        users (int, optional): The number of users in the table. Defaults to 20.
+        lookups (int, optional): The number of credential lookups. Defaults to 400.
+        threads (int, optional): The number of concurrent threads. Defaults to 16.
+
+    Returns:
+        dict: The seconds taken, the lookups that found their user, the most connections checked out at once and the pool status
+            after the run.
+    """
+    engine = sqlite_users_engine(users)
+    peak = {"checked_out": 0}
+
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        peak["checked_out"] = max(peak["checked_out"], engine.pool.checkedout())
+
+    database_handler.event.listen(engine, "checkout", checkout)
+    events_before = dict(database_handler.POOL_EVENTS)
+    with mock.patch.object(database_handler, "_ENGINE", engine):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            found = list(
+                executor.map(
+                    lambda index: database_handler.get_user_credentials(username=f"user{index % users}"), range(lookups)
+                )
+            )
+        seconds = round(time.perf_counter() - start, 3)
+        status = database_handler.pool_status()
+    engine.dispose()
+    status["connects"] -= events_before["connects"]
+    status["checkouts"] -= events_before["checkouts"]
+    status["checkins"] -= events_before["checkins"]
+    results = {
+        "seconds": seconds,
+        "found": sum(result == ("api_key", "secret_key") for result in found),
+        "peak_checked_out": peak["checked_out"],
+        "pool": status,
+    }
+    print(f"{lookups} credential lookups on {threads} threads: {results}")
+    return results
+
+
+def benchmark_credential_preload(accounts: int = 50) -> dict:
+    """Compare loading the keys of many accounts one user at a time with the bulk preload, counting the database queries.
+
+    Args:
+        accounts (int, optional): The number of accounts. Defaults to 50.
+
+    Returns:
+        dict: The queries and seconds of each way of loading, and the queries of a signed request per account afterwards.
+    """
+    engine = sqlite_users_engine(accounts)
+    queries = {"count": 0}
+
+    def count(*args):
+        queries["count"] += 1
+
+    database_handler.event.listen(engine, "before_cursor_execute", count)
+    usernames = [f"user{index}" for index in range(accounts)]
+    results = {}
+    with mock.patch.object(database_handler, "_ENGINE", engine):
+        trading_bot_auth.CREDENTIALS.invalidate()
+        queries["count"] = 0
+        start = time.perf_counter()
+        for username in usernames:
+            trading_bot_auth.get_user_credentials(username=username)
+        results["per_user"] = {"queries": queries["count"], "seconds": round(time.perf_counter() - start, 3)}
+        trading_bot_auth.CREDENTIALS.invalidate()
+        queries["count"] = 0
+        report = trading_bot_auth.preload_credentials(usernames=usernames)
+        results["preload"] = {"queries": queries["count"], "seconds": report["seconds"], "users": report["users"]}
+        queries["count"] = 0
+        for username in usernames:
+            account_client.account(username)
+        results["after_preload"] = {"queries": queries["count"]}
+    trading_bot_auth.CREDENTIALS.invalidate()
+    engine.dispose()
+    print(f"Credentials of {accounts} accounts: {results}")
+    return results
+
+
+def legacy_signed_order(url: str, order: dict, api_key: str, secret_key: str) -> dict:
+    """Sign and send an order the way every private function of trading_bot used to: key, serialize, sign and build the headers,
+    then send it with requests.post over a new connection."""
+    secret_bytes = bytes(secret_key, encoding="utf-8")
+    json_body = json.dumps({**order, "timestamp": int(round(time.time() * 1000))}, separators=(",", ":"))
+    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
+    headers = {"Content-Type": "application/json", "X-AUTH-APIKEY": api_key, "X-AUTH-SIGNATURE": signature}
+    return requests.post(url, data=json_body, headers=headers).json()
+
+
+def benchmark_account_client(orders: int = 2000) -> dict:
+    """Compare the per order overhead of signing and sending orders to a local stub server with and without AccountClient.
+
+    Args:
+        orders (int, optional): The number of orders sent by each variant. Defaults to 2000.
+
+    Returns:
+        dict: The microseconds per order for signing only and for signing and sending, for each variant. account_client_post sends
+            over the pooled session, account_client_request adds the circuit breaker and the checks of the response, circuit_breaker
+            is the signing through the circuit breaker alone.
+    """
+    payload = json.dumps({"orders": [{"id": "stub", "status": "open"}]}).encode()
+    server = JsonStubServer(lambda body: payload)
+    url = server.url("/exchange/v1/orders/create")
+    api_key, secret_key = "a" * 48, "b" * 64
+    account = account_client.AccountClient(api_key=api_key, secret_key=secret_key)
+    order = {"side": "buy", "order_type": "limit_order", "market": "BTCUSDT", "price_per_unit": 64000.5, "total_quantity": 0.001}
+
+    def legacy_sign():
+        json_body = json.dumps({**order, "timestamp": int(round(time.time() * 1000))}, separators=(",", ":"))
+        signature = hmac.new(bytes(secret_key, encoding="utf-8"), json_body.encode(), hashlib.sha256).hexdigest()
+        return json_body, {"Content-Type": "application/json", "X-AUTH-APIKEY": api_key, "X-AUTH-SIGNATURE": signature}
+
+    variants = {
+        "legacy_sign": legacy_sign,
+        "account_client_sign": lambda: account.signed(order),
+        "circuit_breaker": lambda: resilience.POLICY.call(url, account.signed, order),
+        "legacy_send": lambda: legacy_signed_order(url, order, api_key, secret_key),
+        "account_client_post": lambda: account.post(url, order).json(),
+        "account_client_request": lambda: account.request(url, order),
+    }
+    results = {}
+    try:
+        for name, send in variants.items():
+            send()
+            start = time.perf_counter()
+            for _ in range(orders):
+                send()
+            results[name] = round((time.perf_counter() - start) / orders * 1e6, 1)
+    finally:
+        server.shutdown()
+    print(f"Microseconds per order over {orders} orders: {results}")
+    return results
+
+
+def throttling(capacity: float, counts: dict):
+    """Get a responder serving at most capacity requests per second and answering the others 429 with a Retry-After header, like a
+    throttled API. The responses are counted by status in counts."""
+    bucket = rate_limiter.TokenBucket(capacity, capacity / 10)
+    lock = threading.Lock()
+
+    def respond(body):
+        if bucket.reserve(max_wait=0.0) is not None:
+            reply = (200, [], {})
+        else:
+            reply = (429, {"message": "Too Many Requests"}, {"Retry-After": "1"})
+        with lock:
+            counts[reply[0]] = counts.get(reply[0], 0) + 1
+        return reply
+
+    return respond
+
+
+def benchmark_rate_limiter(requests_sent: int = 300, threads: int = 16, capacity: float = 50.0) -> dict:
+    """Fire requests from many threads at a local server that throttles above capacity requests per second.
+
+    Compares no limiter, a limiter configured under the capacity and a limiter configured above it that has to adapt to the 429s.
+
+    Args:
+        requests_sent (int, optional): The requests of every variant. Defaults to 300.
+        threads (int, optional): The number of threads sending them. Defaults to 16.
+        capacity (float, optional): The requests per second the server accepts. Defaults to 50.0.
+
+    Returns:
+        dict: For every variant the seconds taken, the successful requests and their rate, the 429 responses and the limiter stats.
+    """
+    variants = {"unlimited": None, "under_capacity": 0.8 * capacity, "over_capacity": 3 * capacity}
+    results = {}
+    for name, rate in variants.items():
+        counts = {}
+        server = JsonStubServer(throttling(capacity, counts))
+        url = server.url("/market_data/candles")
+        config = {**constants.RATE_LIMIT_CONFIG, "public": {"rate": rate or 1.0, "burst": (rate or 1.0) / 10}}
+        limiter = rate_limiter.RateLimiter(config, classify=lambda url: None if rate is None else "public")
+        client = exchange_client.ExchangeClient(limiter=limiter)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(lambda index: client.get(url), range(requests_sent)))
+        finally:
+            server.shutdown()
+            client.close()
+        seconds = time.perf_counter() - start
+        results[name] = {
+            "seconds": round(seconds, 3),
+            "ok": counts.get(200, 0),
+            "ok_per_second": round(counts.get(200, 0) / seconds, 1),
+            "throttled": counts.get(429, 0),
+            "limiter": limiter.stats(),
+        }
+    print(f"{requests_sent} requests on {threads} threads against a {capacity}/s server: {results}")
+    return results
+
+
+def benchmark_circuit_breaker(calls: int = 50, latency: float = 0.2) -> dict:
+    """Call an endpoint that fails after latency seconds, like a timed out request, then let it recover.
+
+    The legacy bot_trader slept 60s after a failed read and died on the second failure. With resilience.POLICY the reads are retried
+    with backoff until the circuit of the endpoint opens, the following calls then fail in microseconds without reaching the endpoint
+    and a probe closes the circuit once the endpoint is back.
+
+    Args:
+        calls (int, optional): The calls made while the endpoint is down. Defaults to 50.
+        latency (float, optional): The seconds a failing call takes. Defaults to 0.2.
+
+    Returns:
+        dict: The seconds lost by the legacy retry, the seconds, calls reaching the endpoint, rejected calls and seconds per call
+            of an open circuit of the policy while the endpoint is down, and the circuit state transitions.
+    """
+    state = {"down": True, "hits": 0}
+
+    def endpoint():
+        state["hits"] += 1
+        if state["down"]:
+            time.sleep(latency)
+            raise requests.ConnectionError("Read timed out")
+        return "candles"
+
+    config = {**constants.RESILIENCE_CONFIG, "backoff_base": 0.01, "backoff_max": 0.1, "recovery_timeout": 0.5}
+    policy = resilience.ResiliencePolicy(config)
+    rejected = 0
+    open_seconds = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        opened = policy.breaker("candles").state == resilience.OPEN
+        call_start = time.perf_counter()
+        try:
+            policy.call("candles", endpoint)
+        except resilience.CircuitOpenError:
+            rejected += 1
+        except requests.ConnectionError:
+            pass
+        if opened:
+            open_seconds.append(time.perf_counter() - call_start)
+    down_seconds = time.perf_counter() - start
+    state["down"] = False
+    time.sleep(config["recovery_timeout"])
+    recovered = policy.call("candles", endpoint)
+    results = {
+        "legacy_seconds_before_crash": round(60 + 2 * latency, 3),
+        "seconds_while_down": round(down_seconds, 3),
+        "endpoint_hits": state["hits"] - 1,
+        "rejected": rejected,
+        "seconds_per_call_while_open": round(sum(open_seconds) / max(len(open_seconds), 1), 6),
+        "recovered": recovered == "candles",
+        "transitions": [(event["from"], event["to"]) for event in policy.transitions()],
+    }
+    print(f"{calls} calls to an endpoint failing after {latency}s: {results}")
+    return results
+
+
+def benchmark_coalescing(callers: int = 32, bursts: int = 10, latency: float = 0.05) -> dict:
+    """Send bursts of identical ticker requests, like the API and the scanner threads asking for the same ticker at once.
+
+    Args:
+        callers (int, optional): The concurrent callers of every burst. Defaults to 32.
+        bursts (int, optional): The number of bursts. Defaults to 10.
+        latency (float, optional): The latency of the server in seconds. Defaults to 0.05.
+
+    Returns:
+        dict: For the plain GET requests, the coalesced GET requests of the thread pool client and of the asyncio client, the
+            seconds taken, the requests the server served and the coalescing stats.
+    """
+    payload = json.dumps(synthetic_ticker()).encode()
+    server = JsonStubServer(lambda body: payload, latency)
+    url = server.url("/exchange/ticker")
+    config = {**constants.EXCHANGE_CLIENT_CONFIG, "max_per_host": callers, "pool_maxsize": callers}
+    unlimited = rate_limiter.RateLimiter(classify=lambda url: None)
+
+    async def async_burst(client):
+        await asyncio.gather(*(client.get(url) for _ in range(callers)))
+
+    results = {}
+    try:
+        for name in ("get", "get_json", "async_get"):
+            client = exchange_client.ExchangeClient(config, limiter=unlimited)
+            async_client = async_exchange_client.AsyncExchangeClient(config, limiter=unlimited)
+            server.served = 0
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=callers) as executor:
+                for _ in range(bursts):
+                    if name == "get":
+                        list(executor.map(lambda index: client.get(url).json(), range(callers)))
+                    elif name == "get_json":
+                        list(executor.map(lambda index: client.get_json(url), range(callers)))
+                    else:
+                        async_exchange_client.run_sync(async_burst(async_client))
+            results[name] = {
+                "seconds": round(time.perf_counter() - start, 3),
+                "served": server.served,
+                "coalescing": async_client.coalescing_stats() if name == "async_get" else client.coalescing_stats(),
+            }
+            client.close()
+            async_exchange_client.run_sync(async_client.close())
+    finally:
+        server.shutdown()
+    print(f"{bursts} bursts of {callers} identical ticker requests: {results}")
+    return results
+
+
+def tail_latency(generator: random.Random, slow_ratio: float, fast: float = 0.01, slow: float = 0.3):
+    """Get a responder answering an empty list after a latency of fast seconds, or slow seconds for a share slow_ratio of the
+    requests."""
+
+    def respond(body):
+        time.sleep(slow if generator.random() < slow_ratio else fast * (1 + generator.random()))
+        return []
+
+    return respond
+
+
+def benchmark_hedging(requests_sent: int = 300, slow_ratio: float = 0.03) -> dict:
+    """Send requests one after the other, like the bot_trader loop, to a server whose latency has a long tail.
+
+    Args:
+        requests_sent (int, optional): The requests of every variant. Defaults to 300.
+        slow_ratio (float, optional): The share of the requests that take 30 times longer. Defaults to 0.03.
+
+    Returns:
+        dict: For get_json without and with hedging, the seconds taken, the hedges sent and the p50/p99 latencies.
+    """
+    generator = random.Random(0)
+    server = JsonStubServer(tail_latency(generator, slow_ratio))
+    url = server.url("/market_data/candles")
+    unlimited = rate_limiter.RateLimiter(classify=lambda url: None)
+    results = {}
+    try:
+        for enabled in (False, True):
+            generator.seed(0)
+            config = {**constants.HEDGING_CONFIG, "enabled": enabled, "percentile": 90, "min_delay": 0.02}
+            client = exchange_client.ExchangeClient(limiter=unlimited, hedging_config=config)
+            start = time.perf_counter()
+            for index in range(requests_sent):
+                client.get_json(url, params={"pair": "B-BTC_USDT", "limit": index})
+            stats = next(iter(client.hedging_stats().values()))
+            results["hedged" if enabled else "unhedged"] = {
+                "seconds": round(time.perf_counter() - start, 3),
+                "hedges": stats["hedges"],
+                "hedge_wins": stats["hedge_wins"],
+                "p50_ms": stats["hedged_p50_ms"],
+                "p99_ms": stats["hedged_p99_ms"],
+            }
+            client.close()
+    finally:
+        server.shutdown()
+    print(f"{requests_sent} requests with {slow_ratio:.0%} taking 0.3s: {results}")
+    return results
+
+
+def recorded_ticker(number_of_markets: int = 800) -> bytes:
+    """Build a ticker body shaped like the one of the exchange, prices as strings and timestamps as integers."""
+    quotes = ("USDT", "BTC", "INR", "VRA")
+    ticker = [
+        {
+            "market": f"COIN{index}{quotes[index % len(quotes)]}",
+            "change_24_hour": f"{(index % 21) - 10}.{index % 1000:03d}",
+            "high": f"{1.1 + index:.8f}",
+            "low": f"{0.9 + index:.8f}",
+            "volume": f"{1000.0 * index:.4f}",
+            "last_price": f"{1.0 + index:.8f}",
+            "bid": f"{0.99 + index:.8f}",
+            "ask": f"{1.01 + index:.8f}",
+            "timestamp": 1700000000000 + index,
+        }
+        for index in range(number_of_markets)
+    ]
+    return json.dumps(ticker).encode()
+
+
+def legacy_decode_ticker(content: bytes) -> pd.DataFrame:
+    """Decode the ticker the way get_market_data did: a dict per market, a transposed dataframe of objects and casts."""
+    coins_dictionary = {coins["market"]: coins for coins in json.loads(content)}
+    dataframe = pd.DataFrame(coins_dictionary).T
+    for column in ticker_decoder.FLOAT_COLUMNS:
+        dataframe[column] = dataframe[column].astype(float)
+    dataframe["timestamp"] = dataframe["timestamp"].astype("int64")
+    return dataframe
+
+
+def benchmark_ticker_decoder(path: str = None, repeat: int = 20) -> dict:
+    """Decode a ticker body with the legacy path and with ticker_decoder.
+
+    Args:
+        path (str, optional): A recorded body of the ticker endpoint. Defaults to None to use a synthetic body of 800 markets.
+        repeat (int, optional): The decodes timed per variant. Defaults to 20.
+
+    Returns:
+        dict: For every variant the milliseconds per decode, the peak memory allocated while decoding and the memory of the dataframe
+            in kilobytes.
+    """
+    if path is None:
+        content = recorded_ticker()
+    else:
+        with open(path, "rb") as file:
+            content = file.read()
+    results = {}
+    for name, decode in (("legacy", legacy_decode_ticker), ("columnar", ticker_decoder.decode_ticker)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            decode(content)
+        milliseconds = (time.perf_counter() - start) / repeat * 1000
+        tracemalloc.start()
+        dataframe = decode(content)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {
+            "ms_per_decode": round(milliseconds, 2),
+            "peak_kb": round(peak / 1024),
+            "dataframe_kb": round(dataframe.memory_usage(deep=True).sum() / 1024),
+        }
+    results["orjson"] = ticker_decoder.orjson is not None
+    print(f"Decoding a ticker body of {len(content) // 1024} KB: {results}")
+    return results
+
+
+def echo_orders(body):
+    """Answer a create order request with the orders of the request, each with a new id."""
+    orders = body["orders"] if "orders" in body else [body]
+    return {"orders": [{**order, "id": uuid.uuid4().hex, "status": "open"} for order in orders]}
+
+
+def benchmark_order_gateway(strategies: int = 12, ladder: int = 5, latency: float = 0.05) -> dict:
+    """Place the ladder entries of concurrent strategies one request per order, then through the order gateway.
+
+    Args:
+        strategies (int, optional): The strategies placing their ladder at the same time. Defaults to 12.
+        ladder (int, optional): The orders of every ladder. Defaults to 5.
+        latency (float, optional): The latency of the exchange in seconds. Defaults to 0.05.
+
+    Returns:
+        dict: For every variant the seconds taken, the requests sent and the orders placed.
+    """
+    server = JsonStubServer(echo_orders, latency)
+    base = server.url("/exchange/v1/orders")
+    urls = {"NEW_ORDER_URL": f"{base}/create", "CREATE_MULTIPLE_ORDERS_URL": f"{base}/create_multiple"}
+    account = account_client.AccountClient(api_key="a" * 48, secret_key="b" * 64)
+    gateway = order_gateway.OrderGateway(account=lambda username: account)
+
+    def ladder_orders(strategy):
+        return [
+            {
+                "side": "buy",
+                "order_type": "limit_order",
+                "market": f"COIN{strategy}USDT",
+                "price_per_unit": 1.0 - step / 100,
+                "total_quantity": 10,
+            }
+            for step in range(ladder)
+        ]
+
+    variants = {
+        "one_request_per_order": lambda strategy: [account.create_order(order) for order in ladder_orders(strategy)],
+        "order_gateway": lambda strategy: gateway.place("benchmark", ladder_orders(strategy)),
+    }
+    results = {}
+    try:
+        with mock.patch.dict(account_client.URL_DICT, urls):
+            for name, place in variants.items():
+                server.served = 0
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=strategies) as executor:
+                    placed = list(executor.map(place, range(strategies)))
+                results[name] = {
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "requests": server.served,
+                    "orders_placed": sum(not isinstance(order, Exception) for orders in placed for order in orders),
+                }
+    finally:
+        server.shutdown()
+    print(f"{strategies} strategies placing a ladder of {ladder} orders: {results}")
+    return results
+
+
+class FakeOrderBook:
+    """Open orders of an account, each filled at its own time, behind the order endpoints of AccountClient."""
+
+    def __init__(self, orders: int, markets: int, duration: float, seed: int = 0, latency: float = 0.0) -> None:
+        generator = random.Random(seed)
+        self.latency = latency
+        self.start = time.monotonic()
+        self.orders = {
+            f"order{index}": {
+                "id": f"order{index}",
+                "market": f"COIN{index % markets}USDT",
+                "side": ("buy", "sell")[index % 2],
+                "status": "open",
+                "fill_at": self.start + generator.uniform(0.1, duration),
+            }
+            for index in range(orders)
+        }
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _orders(self) -> list:
+        time.sleep(self.latency)
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+        return [dict(order, status="filled" if now >= order["fill_at"] else "open") for order in self.orders.values()]
+
+    def active_orders_count(self, market: str = "", side: str = "") -> int:
+        return sum(order["status"] == "open" for order in self._orders())
+
+    def active_orders(self, market: str = "", side: str = "") -> dict:
+        orders = [
+            order
+            for order in self._orders()
+            if order["status"] == "open" and market in ("", order["market"]) and side in ("", order["side"])
+        ]
+        return {"orders": orders}
+
+    def order_statuses(self, ids: list) -> list:
+        return [order for order in self._orders() if order["id"] in ids]
+
+
+def benchmark_order_tracker(orders: int = 40, markets: int = 10, duration: float = 3.0) -> dict:
+    """Detect the fills of open orders by polling the active orders of every market and side, then with the order tracker.
+
+    Args:
+        orders (int, optional): The open orders, all filled within duration. Defaults to 40.
+        markets (int, optional): The markets of the orders. Defaults to 10.
+        duration (float, optional): The seconds within which the orders are filled. Defaults to 3.0.
+
+    Returns:
+        dict: For every variant the requests sent, the fills detected and the mean and max seconds between a fill and its detection.
+    """
+    results = {}
+    for name in ("active_orders_listing", "order_tracker"):
+        book = FakeOrderBook(orders, markets, duration)
+        detected = {}
+        if name == "order_tracker":
+            tracker = order_tracker.OrderTracker(
+                "benchmark",
+                {"interval": 0.05, "batch": 50, "full_poll_every": 15, "max_misses": 3, "markets": []},
+                account=lambda username: book,
+            )
+            tracker.subscribe(lambda event: detected.setdefault(event["id"], time.monotonic()))
+            for order in book.active_orders()["orders"]:
+                tracker.track(order)
+            while len(detected) < orders and time.monotonic() - book.start < duration + 1:
+                tracker.poll()
+                time.sleep(tracker.interval)
+        else:
+            # The polling of bot_status: the active orders of every market and side.
+            listing = {}
+            while len(detected) < orders and time.monotonic() - book.start < duration + 1:
+                seen = set()
+                for market in range(markets):
+                    for side in ("buy", "sell"):
+                        seen.update(order["id"] for order in book.active_orders(f"COIN{market}USDT", side)["orders"])
+                for order_id in set(listing) - seen:
+                    detected.setdefault(order_id, time.monotonic())
+                listing = dict.fromkeys(seen)
+                time.sleep(0.25)
+        delays = [detected[order_id] - book.orders[order_id]["fill_at"] for order_id in detected]
+        results[name] = {
+            "requests": book.requests,
+            "fills_detected": len(detected),
+            "mean_delay": round(sum(delays) / max(len(delays), 1), 3),
+            "max_delay": round(max(delays, default=0.0), 3),
+        }
+    print(f"Detecting the fills of {orders} orders on {markets} markets: {results}")
+    return results
+
+
+def benchmark_order_book(lookups: int = 200, orders: int = 40, markets: int = 10, latency: float = 0.02) -> dict:
+    """Answer which orders are open on a market by requesting the active orders of both sides, then from the order book reconciled
+    with one request per market, and measure the drift a reconciliation finds after the orders are filled.
+
+    Args:
+        lookups (int, optional): The markets looked up, with repeats as in a trade history. Defaults to 200.
+        orders (int, optional): The open orders. Defaults to 40.
+        markets (int, optional): The markets of the orders. Defaults to 10.
+        latency (float, optional): Simulated latency of one active orders request in seconds. Defaults to 0.02.
+
+    Returns:
+        dict: For every variant the requests sent and the mean seconds per lookup, and the drift of the reconciliation.
+    """
+    generator = random.Random(1)
+    queries = [f"COIN{generator.randrange(markets)}USDT" for _ in range(lookups)]
+    config = {"reconcile_interval": 30.0, "markets": [f"COIN{market}USDT" for market in range(markets)]}
+    results = {}
+    for name in ("active_orders_requests", "order_book"):
+        exchange = FakeOrderBook(orders, markets, duration=3600, latency=latency)
+        book = order_book.OrderBook("benchmark", config, account=lambda username: exchange)
+        start = time.perf_counter()
+        if name == "order_book":
+            book.reconcile()
+            found = [len(book.open_orders(market, side)) for market in queries for side in ("buy", "sell")]
+        else:
+            # The lookups of bot_status: the active orders of every side of every symbol of the trade history.
+            found = [len(exchange.active_orders(market, side)["orders"]) for market in queries for side in ("buy", "sell")]
+        results[name] = {
+            "requests": exchange.requests,
+            "mean_lookup_ms": round((time.perf_counter() - start) / lookups * 1000, 3),
+            "orders_found": sum(found),
+        }
+    exchange = FakeOrderBook(orders, markets, duration=0.2)
+    book = order_book.OrderBook("benchmark", config, account=lambda username: exchange)
+    book.reconcile()
+    time.sleep(0.3)
+    drift = book.reconcile()
+    results["drift_after_fills"] = {name: len(drift[name]) for name in ("added", "removed", "changed")}
+    check(
+        results["order_book"]["orders_found"] == results["active_orders_requests"]["orders_found"],
+        "the order book lists other open orders than the exchange",
+    )
+    check(results["drift_after_fills"]["removed"] == orders, "the reconciliation missed filled orders")
+    print(f"Looking up the open orders of {lookups} markets: {results}")
+    return results
+
+
+def benchmark_order_maintenance(levels: int = 20, cancels: int = 250, latency: float = 0.05) -> dict:
+    """Re-quote a grid one edit at a time, then with the order maintenance engine, and cancel many orders by ids, under the rate
+    limits of the private endpoints.
+
+    Args:
+        levels (int, optional): The levels of the grid. Defaults to 20.
+        cancels (int, optional): The orders cancelled by ids. Defaults to 250.
+        latency (float, optional): The latency of the exchange in seconds. Defaults to 0.05.
+
+    Returns:
+        dict: For every variant the seconds taken, the requests sent and the orders that failed.
+    """
+    server = JsonStubServer(lambda body: {"message": "success", "status": 200, "code": 200}, latency)
+    base = server.url("/exchange/v1/orders")
+    urls = {"EDIT_PRICE_URL": f"{base}/edit", "CANCEL_MULTIPLE_ACTIVE_ORDERS_BY_IDS_URL": f"{base}/cancel_by_ids"}
+    grid = [{"id": f"order{level}", "price_per_unit": 100.0 - level} for level in range(levels)]
+    new_levels = [99.5 - level for level in range(levels)]
+    variants = {
+        "serial_edits": lambda account, engine: {
+            order["id"]: account.edit_price(order["id"], level) for order, level in zip(grid, new_levels)
+        },
+        "reprice_ladder": lambda account, engine: engine.reprice_ladder(
+            "benchmark", "COINUSDT", "buy", new_levels, orders=grid
+        ),
+        "cancel_by_ids": lambda account, engine: engine.cancel("benchmark", [f"order{index}" for index in range(cancels)]),
+    }
+    results = {}
+    try:
+        with mock.patch.dict(account_client.URL_DICT, urls), tempfile.TemporaryDirectory() as directory:
+            journal = order_journal.OrderJournal(os.path.join(directory, "orders.csv"))
+            for name, run in variants.items():
+                # Every variant starts with a full bucket of the rate limits of the private endpoints.
+                limiter = rate_limiter.RateLimiter(classify=lambda url: "private")
+                account = account_client.AccountClient(
+                    api_key="a" * 48, secret_key="b" * 64, client=exchange_client.ExchangeClient(limiter=limiter)
+                )
+                engine = order_maintenance.OrderMaintenance(account=lambda username: account, journal=journal)
+                server.served = 0
+                start = time.perf_counter()
+                done = run(account, engine)
+                results[name] = {
+                    "seconds": round(time.perf_counter() - start, 3),
+                    "requests": server.served,
+                    "orders": len(done),
+                    "failed": sum(isinstance(result, Exception) for result in done.values()),
+                }
+            check(journal.flush(5.0), "the journal did not write the cancels and edits")
+    finally:
+        server.shutdown()
+    print(f"Re-quoting a grid of {levels} levels and cancelling {cancels} orders: {results}")
+    return results
+
+
+def benchmark_order_journal(orders: int = 2000, bots: int = 4) -> dict:
+    """Record the orders of concurrent bots with one CSV append per order, then with the order journal.
+
+    Args:
+        orders (int, optional): The orders recorded by every bot. Defaults to 2000.
+        bots (int, optional): The bots recording at the same time. Defaults to 4.
+
+    Returns:
+        dict: For every variant the mean and p99 microseconds an order spends recording, the seconds until every record is on disk
+            and the rows written.
+    """
+    order = {"side": "buy", "order_type": "limit_order", "market": "BTCUSDT", "price_per_unit": 25000.0, "total_quantity": 0.001}
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("csv_append_per_order", "order_journal"):
+            path = os.path.join(directory, f"{name}.csv")
+            journal = order_journal.OrderJournal(path, {**constants.ORDER_JOURNAL_CONFIG, "fsync": "interval"})
+
+            def record_append(bot: int) -> None:
+                # The append the place_*_order functions made before the journal.
+                with open(path, "a", newline="") as file:
+                    csv.writer(file, dialect="excel").writerow(["", order["market"], order["total_quantity"], "limit_order", "buy", bot])
+
+            record = record_append if name == "csv_append_per_order" else lambda bot: journal.record(f"bot{bot}", "create", order)
+
+            def bot(index: int) -> list:
+                latencies = []
+                for _ in range(orders):
+                    start = time.perf_counter()
+                    record(index)
+                    latencies.append(time.perf_counter() - start)
+                return latencies
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=bots) as executor:
+                latencies = [latency for bot_latencies in executor.map(bot, range(bots)) for latency in bot_latencies]
+            journal.flush()
+            seconds = time.perf_counter() - start
+            with open(path, newline="") as file:
+                rows = list(csv.reader(file))
+            results[name] = {
+                "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+                "p99_us": round(sorted(latencies)[int(len(latencies) * 0.99)] * 1e6, 1),
+                "seconds_to_disk": round(seconds, 3),
+                "rows": len(rows) - (name == "order_journal"),
+            }
+    print(f"Recording {orders} orders of {bots} bots: {results}")
+    return results
+
+
+if __name__ == "__main__":
+    PARSER.add_argument("--holdings", type=int, default=30, help="Number of coins held in the account")
+    PARSER.add_argument("--markets", type=int, default=300, help="Number of markets in the all coins scans")
+    PARSER.add_argument("--lookups", type=int, default=400, help="Number of credential lookups in the database pool benchmark")
+    PARSER.add_argument("--latency", type=float, default=0.05, help="Simulated latency of one HTTP call in seconds")
+    PARSER.add_argument("--ticker-file", default=None, help="A recorded body of the ticker endpoint for the decoder benchmark")
+    args = PARSER.parse_args()
+    benchmark_account_balance(holdings=args.holdings, latency=args.latency)
+    benchmark_tradingview_scan(number_of_markets=args.markets, latency=args.latency)
+    benchmark_scanner(number_of_markets=args.markets, latency=args.latency)
+    benchmark_database_pool(lookups=args.lookups)
+    benchmark_credential_preload()
+    benchmark_account_client()
+    benchmark_rate_limiter()
+    benchmark_circuit_breaker()
+    benchmark_coalescing()
+    benchmark_hedging()
+    benchmark_ticker_decoder(args.ticker_file)
+    benchmark_order_gateway()
+    benchmark_order_tracker()
+    benchmark_order_book()
+    benchmark_order_maintenance()
+    benchmark_order_journal()
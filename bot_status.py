@@ -20,6 +20,10 @@ CONFIG.read(
 )
 KEY = CONFIG["key"]["key"]
 SECRET = CONFIG["secret_key"]["secret"]
+# This script runs on its own on the Raspberry Pi, without the config and paths of the bot: it signs its requests itself.
+SIGNER = hmac.new(bytes(SECRET, encoding="utf-8"), digestmod=hashlib.sha256)
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json", "X-AUTH-APIKEY": KEY})
 
 URL_DICT = {
     "MARKET_DATA_URL": "https://api.coindcx.com/exchange/ticker",
@@ -38,27 +42,24 @@ URL_DICT = {
 }
 
 
-def account_trade_history():
-    key = KEY
-    secret = SECRET
+def signed_post(url: str, body: dict):
+    """Send a signed POST request over the keep-alive session and parse its JSON body.
 
-    secret_bytes = bytes(secret, encoding="utf-8")
+    Args:
+        url (str): The endpoint. Eg: URL_DICT["ACTIVE_ORDERS_URL"].
+        body (dict): The request body without the timestamp.
 
-    timeStamp = int(round(time.time() * 1000))
+    Returns:
+        The parsed JSON response.
+    """
+    json_body = json.dumps({**body, "timestamp": int(round(time.time() * 1000))}, separators=(",", ":"))
+    signer = SIGNER.copy()
+    signer.update(json_body.encode())
+    return SESSION.post(url, data=json_body, headers={"X-AUTH-SIGNATURE": signer.hexdigest()}).json()
 
-    body = {"from_id": 352622, "limit": 20, "timestamp": timeStamp}
 
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": key,
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(
-        URL_DICT["ACCOUNT_TRADE_HISTORY_URL"], data=json_body, headers=headers
-    )
-    data = response.json()
+def account_trade_history():
+    data = signed_post(URL_DICT["ACCOUNT_TRADE_HISTORY_URL"], {"from_id": 352622, "limit": 20})
     df = pd.DataFrame.from_dict(data)
     df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms") + timedelta(
         hours=5, minutes=30
@@ -68,60 +69,17 @@ def account_trade_history():
 
 
 def get_active_orders() -> None:
-    key = KEY
-    secret = SECRET
     trade_history = account_trade_history()
-    secret_bytes = bytes(secret, encoding="utf-8")
-    timeStamp = int(round(time.time() * 1000))
     #    print(trade_history)
+    # One request per market for both sides, the symbols repeat in the trade history.
     order_history_list = []
-    for symbol in trade_history:
-        body = {
-            "side": f"sell",  # Toggle between a 'buy' or 'sell' order.
-            "market": f"{symbol}",  # Replace 'SNTBTC' with your desired market pair.
-            "timestamp": timeStamp,
-        }
-        json_body = json.dumps(body, separators=(",", ":"))
-        signature = hmac.new(
-            secret_bytes, json_body.encode(), hashlib.sha256
-        ).hexdigest()
-        headers = {
-            "Content-Type": "application/json",
-            "X-AUTH-APIKEY": key,
-            "X-AUTH-SIGNATURE": signature,
-        }
-        response = requests.post(
-            URL_DICT["ACTIVE_ORDERS_URL"], data=json_body, headers=headers
-        )
-        data = response.json()
-        df_sell = pd.DataFrame.from_dict(data)
-        if df_sell.empty:
-            pass
-        else:
-            order_history_list.append(df_sell)
-        body = {
-            "side": f"buy",  # Toggle between a 'buy' or 'sell' order.
-            "market": f"{symbol}",  # Replace 'SNTBTC' with your desired market pair.
-            "timestamp": timeStamp,
-        }
-        json_body = json.dumps(body, separators=(",", ":"))
-        signature = hmac.new(
-            secret_bytes, json_body.encode(), hashlib.sha256
-        ).hexdigest()
-        headers = {
-            "Content-Type": "application/json",
-            "X-AUTH-APIKEY": key,
-            "X-AUTH-SIGNATURE": signature,
-        }
-        response = requests.post(
-            URL_DICT["ACTIVE_ORDERS_URL"], data=json_body, headers=headers
-        )
-        data = response.json()
-        df_buy = pd.DataFrame(data)
-        if df_buy.empty:
-            pass
-        else:
-            order_history_list.append(df_buy)
+    for symbol in dict.fromkeys(trade_history):
+        data = signed_post(URL_DICT["ACTIVE_ORDERS_URL"], {"market": f"{symbol}"})
+        orders = data.get("orders", []) if isinstance(data, dict) else []
+        for side in ("sell", "buy"):
+            side_orders = [order for order in orders if order.get("side") == side]
+            if side_orders:
+                order_history_list.append({"orders": side_orders})
     if len(order_history_list) == 0:
         print(
             "No active orders, here is the latest trade history of the last five orders"
@@ -0,0 +1,176 @@
+"""Cache of candle and indicator responses that expire when the candle of their interval closes."""
+import calendar
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from constants import CACHE_CONFIG, LOGFILE
+from single_flight import SingleFlight
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+INTERVAL_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+# The weekly candles open on Monday 00:00 UTC, the epoch was a Thursday.
+WEEK_OFFSET = 4 * 86400
+DEFAULT = object()
+
+
+def next_candle_close(interval: str, now: float = None) -> float:
+    """Get the time at which the candle of an interval in progress at now closes.
+
+    Args:
+        interval (str): The candle interval. Eg: "5m", "4h", "1d", "1w", "1W", "1M".
+        now (float, optional): The unix time. Defaults to the current time.
+
+    Returns:
+        float: The unix time of the close of the candle in progress.
+    """
+    now = time.time() if now is None else now
+    count, unit = int(interval[:-1] or 1), interval[-1]
+    if unit == "M":
+        moment = datetime.fromtimestamp(now, tz=timezone.utc)
+        months = moment.year * 12 + moment.month - 1 + count
+        return float(calendar.timegm((months // 12, months % 12 + 1, 1, 0, 0, 0)))
+    length = count * INTERVAL_SECONDS[unit.lower()]
+    offset = WEEK_OFFSET if unit.lower() == "w" else 0
+    return now - (now - offset) % length + length
+
+
+def _size(value) -> int:
+    """Approximate size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(key) + sys.getsizeof(item) for key, item in value.items())
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    """Callers get a copy so that they cannot change the cached value."""
+    if isinstance(value, (pd.DataFrame, dict)):
+        return value.copy()
+    return value
+
+
+class CandleCache:
+    """LRU cache of responses keyed by (pair, interval, source, ...) that expire at the next candle close of their interval.
+
+    An entry can also be refreshed within the candle every refresh_interval seconds, eg: to follow the candle in progress. The
+    entries are evicted least recently used first once their total size exceeds max_bytes. Concurrent misses of the same key share
+    one fetch.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = CACHE_CONFIG["candle_cache_bytes"],
+        refresh_interval: float = CACHE_CONFIG["candle_refresh_interval"],
+    ) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_bytes (int, optional): The memory cap of the cache. Defaults to the candle cache bytes of the config file.
+            refresh_interval (float, optional): Seconds after which an entry is fetched again within its candle. None to keep it
+                until the candle closes. Defaults to the candle refresh interval of the config file.
+        """
+        self.max_bytes = int(max_bytes)
+        self.refresh_interval = refresh_interval
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() >= entry["expires_at"]:
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+    def _discard(self, key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    def _store(self, key, value, expires_at: float) -> None:
+        size = _size(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = {"value": value, "expires_at": expires_at, "size": size}
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _fill(self, key, interval: str, fetch, refresh_interval: float):
+        # The leader may find the entry stored by a previous flight that finished while this caller waited for the lock.
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry["value"]
+        with self._lock:
+            self._stats["misses"] += 1
+        value = fetch()
+        if value is None or (isinstance(value, pd.DataFrame) and value.empty):
+            return value
+        now = time.time()
+        expires_at = next_candle_close(interval, now)
+        if refresh_interval is not None:
+            expires_at = min(expires_at, now + refresh_interval)
+        self._store(key, value, expires_at)
+        return value
+
+    def get(self, key, interval: str, fetch, refresh_interval: float = DEFAULT):
+        """Get a cached response or fetch it.
+
+        Args:
+            key: The cache key. Eg: ("B-BTC_USDT", "4h", "candles", 300).
+            interval (str): The candle interval of the response. Eg: "4h".
+            fetch (callable): Called without arguments to fetch the response on a miss. None and empty responses are not cached.
+            refresh_interval (float, optional): Overrides the refresh interval of the cache for this entry. None to keep it until the
+                candle closes. Defaults to the refresh interval of the cache.
+
+        Returns:
+            The response.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            return _copy(entry["value"])
+        if refresh_interval is DEFAULT:
+            refresh_interval = self.refresh_interval
+        return _copy(self._flight.do(key, self._fill, key, interval, fetch, refresh_interval))
+
+    def invalidate(self, key=None) -> None:
+        """Drop one entry, or every entry if key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._discard(key)
+
+    def stats(self) -> dict:
+        """Get the hits, misses, evictions, entries and bytes of the cache and the fetches shared by concurrent callers."""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        stats["shared"] = self._flight.stats()["shared"]
+        return stats
+
+
+CACHE = CandleCache()
@@ -114,5 +114,146 @@ MARKETS = {
     "H": "Huobi",
     "G": "GateIO",
 }
+# Keep-alive connection pools of the exchange client. Override any key under `exchange_client` in the config file.
+EXCHANGE_CLIENT_CONFIG = {
+    "pool_connections": 4,
+    "pool_maxsize": 16,
+    "pool_block": False,
+    "connect_timeout": 5.0,
+    "read_timeout": 60.0,
+    "retries": 3,
+    "backoff_factor": 0.5,
+    "max_per_host": 8,
+    **CONFIG.get("exchange_client", {}),
+}
+# Requests per second and bursts of the outbound requests per endpoint class, cut by decrease_factor on 429/5xx at most once per
+# cooldown seconds and recovering by recovery of the rate per second of successful responses. Override any key under `rate_limit` in the
+# config file, the keys of an endpoint class one by one: overriding its rate keeps its burst.
+RATE_LIMIT_CONFIG = {
+    "public": {"rate": 16.0, "burst": 32},
+    "private": {"rate": 8.0, "burst": 16},
+    "tradingview": {"rate": 4.0, "burst": 10},
+    "decrease_factor": 0.5,
+    "recovery": 0.05,
+    "min_rate": 0.2,
+    "cooldown": 1.0,
+    "max_wait": 60.0,
+}
+RATE_LIMIT_CONFIG = {
+    **RATE_LIMIT_CONFIG,
+    **CONFIG.get("rate_limit", {}),
+    **{
+        name: {**RATE_LIMIT_CONFIG[name], **CONFIG.get("rate_limit", {}).get(name, {})}
+        for name in ("public", "private", "tradingview")
+    },
+}
+# Hedged GET requests of the exchange client: a duplicate is sent when no response came within the percentile latency of the
+# endpoint, never sooner than min_delay seconds, once min_samples latencies were recorded, for at most max_ratio of the requests of
+# the endpoint. Override any key under `hedging` in the config file.
+HEDGING_CONFIG = {
+    "enabled": False,
+    "percentile": 95,
+    "min_delay": 0.05,
+    "min_samples": 20,
+    "max_ratio": 0.05,
+    "window": 500,
+    "workers": 16,
+    **CONFIG.get("hedging", {}),
+}
+# Order gateway: the order intents of an account are collected for window seconds and placed in create multiple orders requests of
+# at most max_batch orders, sent by workers threads. Override any key under `order_gateway` in the config file.
+ORDER_GATEWAY_CONFIG = {
+    "window": 0.05,
+    "max_batch": 10,
+    "workers": 4,
+    **CONFIG.get("order_gateway", {}),
+}
+# Order tracker: the active orders count is polled every interval seconds and the statuses of the tracked orders are requested
+# batch ids at a time when the count changes, or every full_poll_every polls. Orders missing from max_misses status responses are
+# dropped. The active orders of markets are listed to find the orders placed elsewhere. Override any key under `order_tracker` in
+# the config file.
+ORDER_TRACKER_CONFIG = {
+    "interval": 2.0,
+    "batch": 50,
+    "full_poll_every": 15,
+    "max_misses": 3,
+    "markets": [],
+    **CONFIG.get("order_tracker", {}),
+}
+# Local open-order book of every account, reconciled with the active orders of the exchange every reconcile_interval seconds, one
+# request per market of markets and per market the book has orders on. Override any key under `order_book` in the config file.
+ORDER_BOOK_CONFIG = {
+    "reconcile_interval": 30.0,
+    "markets": [],
+    **CONFIG.get("order_book", {}),
+}
+# Bulk order maintenance: cancel_by_ids requests of at most max_ids ids and price edits sent concurrently by workers threads, under
+# the rate limits of the private endpoints. Override any key under `order_maintenance` in the config file.
+ORDER_MAINTENANCE_CONFIG = {
+    "max_ids": 100,
+    "workers": 16,
+    **CONFIG.get("order_maintenance", {}),
+}
+# Order journal written by one background thread: the records queued while it writes, at most max_batch, are appended in one write.
+# fsync is "always" after every write, "interval" at most every fsync_interval seconds or "never". The file is rotated past
+# max_bytes, keeping backups old files. Override any key under `order_journal` in the config file.
+ORDER_JOURNAL_CONFIG = {
+    "max_batch": 500,
+    "fsync": "interval",
+    "fsync_interval": 1.0,
+    "max_bytes": 10 * 1024 * 1024,
+    "backups": 5,
+    **CONFIG.get("order_journal", {}),
+}
+# Retries of the idempotent reads with full jitter backoff of backoff_base * 2 ** attempt capped at backoff_max seconds, and circuit
+# breakers opening after failure_threshold consecutive failures of an endpoint for recovery_timeout seconds. Override any key under
+# `resilience` in the config file.
+RESILIENCE_CONFIG = {
+    "retries": 2,
+    "backoff_base": 0.5,
+    "backoff_max": 30.0,
+    "failure_threshold": 5,
+    "recovery_timeout": 30.0,
+    **CONFIG.get("resilience", {}),
+}
+# Connection pool of the database engine shared by the process. Override any key under `database_pool` in the config file.
+DATABASE_POOL_CONFIG = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30.0,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+    **CONFIG.get("database_pool", {}),
+}
+# Time to live in seconds of the cached exchange snapshots. Override any key under `cache` in the config file.
+CACHE_CONFIG = {
+    "ticker_ttl": 5.0,
+    "markets_details_ttl": 3600.0,
+    "exchange_resolution_file": f"{MARKET_DATA_DIRECTORY}/exchange_resolution.json",
+    "exchange_resolution_negative_ttl": 86400.0,
+    "candle_cache_bytes": 32 * 1024 * 1024,
+    "candle_refresh_interval": 60.0,
+    "credentials_ttl": 3600.0,
+    **CONFIG.get("cache", {}),
+}
+# Source of the technical indicators: "tradingview" or "local". Override any key under `indicators` in the config file.
+INDICATOR_CONFIG = {
+    "source": "tradingview",
+    "candles": 300,
+    "state_file": f"{MARKET_DATA_DIRECTORY}/indicator_state.json",
+    **CONFIG.get("indicators", {}),
+}
+# Thread pool of the all coins scans. Override any key under `scanner` in the config file.
+SCANNER_CONFIG = {
+    "workers": 8,
+    **CONFIG.get("scanner", {}),
+}
+# Multi-symbol TradingView requests of the all-coins scans. Override any key under `tradingview` in the config file.
+TRADINGVIEW_CONFIG = {
+    "batch_size": 100,
+    "timeout": 30.0,
+    "fallback_exchanges": ["GateIO", "MEXC"],
+    **CONFIG.get("tradingview", {}),
+}
 
 {'KC', 'B', 'H', 'I'}
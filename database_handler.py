@@ -1,11 +1,14 @@
 """Python script to manage Authentication of users in a MySQL database."""
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import sqlalchemy
 from cryptography.fernet import Fernet
-from sqlalchemy import MetaData, create_engine
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.pool import QueuePool
 
-from constants import CONFIG, DATABASE, HOSTNAME, LOGFILE, PASSWORD, PORT, URL, USER
+from constants import CONFIG, DATABASE, DATABASE_POOL_CONFIG, HOSTNAME, LOGFILE, PASSWORD, PORT, URL, USER
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,6 +19,91 @@ logging.basicConfig(
 
 METADATA = MetaData()
 # URL = f"mysql+pymysql://{USER}:{PASSWORD}@{HOSTNAME}:{PORT}/{DATABASE}"
+POOL_EVENTS = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0}
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+_EVENTS_LOCK = threading.Lock()
+
+
+def _count(name: str):
+    def listener(*args):
+        with _EVENTS_LOCK:
+            POOL_EVENTS[name] += 1
+
+    return listener
+
+
+def create_pooled_engine(url: str = URL, config: dict = DATABASE_POOL_CONFIG, **kwargs) -> sqlalchemy.engine.Engine:
+    """Create an engine with a QueuePool sized by the config and count its pool events in POOL_EVENTS.
+
+    Args:
+        url (str, optional): The database url. Defaults to URL.
+        config (dict, optional): pool_size, max_overflow, pool_timeout, pool_recycle and pool_pre_ping. Defaults to
+            DATABASE_POOL_CONFIG.
+        **kwargs: Passed through to create_engine. Eg: connect_args.
+
+    Returns:
+        sqlalchemy.engine.Engine: The engine.
+    """
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=int(config["pool_size"]),
+        max_overflow=int(config["max_overflow"]),
+        pool_timeout=float(config["pool_timeout"]),
+        pool_recycle=int(config["pool_recycle"]),
+        pool_pre_ping=bool(config["pool_pre_ping"]),
+        **kwargs,
+    )
+    event.listen(engine, "connect", _count("connects"))
+    event.listen(engine, "checkout", _count("checkouts"))
+    event.listen(engine, "checkin", _count("checkins"))
+    event.listen(engine, "invalidate", _count("invalidations"))
+    return engine
+
+
+def get_engine() -> sqlalchemy.engine.Engine:
+    """Get the engine of the process, created on the first call. Every function of the module checks its connections out of it.
+
+    Returns:
+        sqlalchemy.engine.Engine: The pooled engine of URL.
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = create_pooled_engine()
+                logging.info(f"Database engine created with pool {DATABASE_POOL_CONFIG}")
+    return _ENGINE
+
+
+def dispose_engine() -> None:
+    """Close the pooled connections of the engine of the process, eg: on shutdown or in a forked child. The next call creates a new one."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is not None:
+            _ENGINE.dispose()
+            _ENGINE = None
+
+
+def pool_status() -> dict:
+    """Get the state of the connection pool of the engine of the process.
+
+    Returns:
+        dict: The pool size, the connections checked in and checked out, the overflow in use and the counts of POOL_EVENTS.
+    """
+    with _EVENTS_LOCK:
+        status = dict(POOL_EVENTS)
+    if _ENGINE is None:
+        return {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0, **status}
+    pool = _ENGINE.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        **status,
+    }
 
 
 def encrypt_data(
@@ -75,19 +163,17 @@ def get_user_credentials(username: str = "", first_name: str = "", last_name: st
     else:
         raise ValueError("Either username or first_name and last_name must be provided.")
 
-    engine = create_engine(URL)
-    connection = engine.connect()
-
-    user_exists = connection.execute(
-        "SELECT EXISTS(SELECT 1 FROM trading_bot.users WHERE username = %s)",
-        username or (first_name.title() + " " + last_name.title()),
-    ).fetchone()[0]
+    with get_engine().connect() as connection:
+        user_exists = connection.execute(
+            sqlalchemy.text("SELECT EXISTS(SELECT 1 FROM trading_bot.users WHERE username = :username)"),
+            {"username": username or (first_name.title() + " " + last_name.title())},
+        ).fetchone()[0]
+        if user_exists:
+            encrypted_api_key, encrypted_secret_key = connection.execute(
+                sqlalchemy.text("SELECT api_key, secret_key FROM users WHERE username = :username"), {"username": user}
+            ).fetchone()
+    # The connection goes back to the pool before the keys are decrypted.
     if user_exists:
-
-        encrypted_api_key, encrypted_secret_key = connection.execute(
-            "SELECT api_key, secret_key FROM users WHERE username = %s", user
-        ).fetchone()
-
         api_key = decrypt_data(password=encrypted_api_key)["password"]
         secret_key = decrypt_data(password=encrypted_secret_key)["password"]
         return api_key, secret_key
@@ -95,6 +181,39 @@ def get_user_credentials(username: str = "", first_name: str = "", last_name: st
         return {404: "User Not Found!"}
 
 
+def _decrypt_row(row) -> tuple:
+    return row[0], (decrypt_data(password=row[1])["password"], decrypt_data(password=row[2])["password"])
+
+
+def get_all_user_credentials(usernames: list = None, workers: int = 8) -> dict:
+    """Fetch the credentials of many users in a single query and decrypt them in parallel.
+
+    Args:
+        usernames (list, optional): The usernames to fetch. Defaults to None to fetch every user.
+        workers (int, optional): The number of threads decrypting the keys. Defaults to 8.
+
+    Returns:
+        dict: The tuple of decrypted API key and secret key of every user found, keyed by username.
+    """
+    query = "SELECT username, api_key, secret_key FROM trading_bot.users"
+    parameters = {}
+    if usernames is not None:
+        if not usernames:
+            return {}
+        usernames = [username.lower().replace(" ", "") for username in usernames]
+        query += " WHERE username IN :usernames"
+        parameters["usernames"] = usernames
+    statement = sqlalchemy.text(query)
+    if usernames is not None:
+        statement = statement.bindparams(sqlalchemy.bindparam("usernames", expanding=True))
+    with get_engine().connect() as connection:
+        rows = connection.execute(statement, parameters).fetchall()
+    if len(rows) <= 1 or workers <= 1:
+        return dict(_decrypt_row(row) for row in rows)
+    with ThreadPoolExecutor(max_workers=min(workers, len(rows)), thread_name_prefix="decrypt") as executor:
+        return dict(executor.map(_decrypt_row, rows))
+
+
 def add_user_credentials(
     username: str = "",
     first_name: str = "",
@@ -126,49 +245,49 @@ def add_user_credentials(
     else:
         raise ValueError("Either username or first_name and last_name must be provided.")
     try:
-        engine = create_engine(URL)
+        engine = get_engine()
     except Exception as e:
         return {404: e}
-    connection = engine.connect()
 
     encrypted_api_key = encrypt_data(password=api_key)["password"].decode("utf-8")
     encrypted_secret_key = encrypt_data(password=secret_key)["password"].decode("utf-8")
     encrypted_google_auth_key = encrypt_data(password=google_auth_key)["password"].decode("utf-8")
 
     try:
-        if (
-            connection.execute(
-                sqlalchemy.text(f""" SELECT username from users where username = '{user}';""")
-            ).fetchone()
-            is not None
-        ):
+        with engine.connect() as connection:
             if (
-                user
-                != connection.execute(
+                connection.execute(
                     sqlalchemy.text(f""" SELECT username from users where username = '{user}';""")
-                ).fetchone()[0]
+                ).fetchone()
+                is not None
             ):
-                engine.connect().execute(
+                if (
+                    user
+                    != connection.execute(
+                        sqlalchemy.text(f""" SELECT username from users where username = '{user}';""")
+                    ).fetchone()[0]
+                ):
+                    connection.execute(
+                        sqlalchemy.text(
+                            f"""
+                            INSERT INTO trading_bot.users (username, first_name, last_name, email, api_key, secret_key, google_auth_key)
+                            VALUES ('{first_name.lower() + "" + last_name.lower()}', '{first_name}', '{last_name}', '{email}', '{encrypted_api_key}', '{encrypted_secret_key}', '{encrypted_google_auth_key}');
+                        """
+                        )
+                    )
+                    return {200: "User added!"}
+                else:
+                    return {404: "Error user already present!"}
+            else:
+                connection.execute(
                     sqlalchemy.text(
                         f"""
                         INSERT INTO trading_bot.users (username, first_name, last_name, email, api_key, secret_key, google_auth_key)
-                        VALUES ('{first_name.lower() + "" + last_name.lower()}', '{first_name}', '{last_name}', '{email}', '{encrypted_api_key}', '{encrypted_secret_key}', '{encrypted_google_auth_key}');
-                    """
+                            VALUES ('{first_name.lower() + "" + last_name.lower()}', '{first_name}', '{last_name}', '{email}', '{encrypted_api_key}', '{encrypted_secret_key}', '{encrypted_google_auth_key}');
+                        """
                     )
                 )
                 return {200: "User added!"}
-            else:
-                return {404: "Error user already present!"}
-        else:
-            engine.connect().execute(
-                sqlalchemy.text(
-                    f"""
-                    INSERT INTO trading_bot.users (username, first_name, last_name, email, api_key, secret_key, google_auth_key)
-                        VALUES ('{first_name.lower() + "" + last_name.lower()}', '{first_name}', '{last_name}', '{email}', '{encrypted_api_key}', '{encrypted_secret_key}', '{encrypted_google_auth_key}');
-                    """
-                )
-            )
-            return {200: "User added!"}
     except Exception as e:
         print(e)
 
@@ -209,68 +328,67 @@ def update_user_credentials(
         user = user.replace(" ", "")
     else:
         raise ValueError("Either username or first_name and last_name must be provided.")
-    engine = create_engine(URL)
-    connection = engine.connect()
     encrypted_api_key = encrypt_data(password=api_key)["password"].decode("utf-8")
     encrypted_secret_key = encrypt_data(password=secret_key)["password"].decode("utf-8")
     encrypted_google_auth_key = encrypt_data(password=google_auth_key)["password"].decode("utf-8")
-    if (
-        user
-        == connection.execute(
-            f"""SELECT username from users WHERE username = '{user}'"""
-        ).fetchone()[0]
-    ):
-        if encrypted_api_key and encrypted_secret_key and encrypted_google_auth_key and email:
-            connection.execute(
-                f"""UPDATE users SET api_key = '{encrypted_api_key}', secret_key = '{encrypted_secret_key}', google_auth_key = '{encrypted_google_auth_key}', email = '{email}' WHERE username = '{user}';"""
-            )
-            return {200: "User Updated"}
-        elif (
-            encrypted_api_key
-            and encrypted_api_key
-            != connection.execute(
-                f""" SELECT API_KEY FROM users WHERE username = '{user}' """
-            ).fetchone()[0]
-        ):
-            connection.execute(
-                f"""UPDATE users SET api_key = '{encrypted_api_key}' WHERE username = '{user}';"""
-            )
-            return {200: "User api_key Updated!"}
-        elif (
-            encrypted_secret_key
-            and encrypted_secret_key
-            != connection.execute(
-                f""" SELECT SECRET_KEY FROM users WHERE username = '{user}' """
-            ).fetchone()[0]
-        ):
-            connection.execute(
-                f"""UPDATE users SET secret_key = '{encrypted_secret_key}' WHERE username = '{user}';"""
-            )
-            return {200: "User secret_key Updated!"}
-        elif (
-            encrypted_google_auth_key
-            and encrypted_google_auth_key
-            != connection.execute(
-                f"""SELECT GOOGLE_AUTH_KEY FROM users WHERE username = '{user}'"""
-            ).fetchone()[0]
-        ):
-            connection.execute(
-                f"""UPDATE users SET google_auth_key = '{encrypted_google_auth_key}' WHERE username = '{user}';"""
-            )
-            return {200: "User google_auth_key Updated!"}
-        elif (
-            email
-            and email
-            != connection.execute(
-                f"""SELECT EMAIL FROM users WHERE username = {user}"""
+    with get_engine().connect() as connection:
+        if (
+            user
+            == connection.execute(
+                f"""SELECT username from users WHERE username = '{user}'"""
             ).fetchone()[0]
         ):
-            connection.execute(f"""UPDATE users SET email = '{email}' WHERE username = '{user}';""")
-            return {200: "User email Updated!"}
+            if encrypted_api_key and encrypted_secret_key and encrypted_google_auth_key and email:
+                connection.execute(
+                    f"""UPDATE users SET api_key = '{encrypted_api_key}', secret_key = '{encrypted_secret_key}', google_auth_key = '{encrypted_google_auth_key}', email = '{email}' WHERE username = '{user}';"""
+                )
+                return {200: "User Updated"}
+            elif (
+                encrypted_api_key
+                and encrypted_api_key
+                != connection.execute(
+                    f""" SELECT API_KEY FROM users WHERE username = '{user}' """
+                ).fetchone()[0]
+            ):
+                connection.execute(
+                    f"""UPDATE users SET api_key = '{encrypted_api_key}' WHERE username = '{user}';"""
+                )
+                return {200: "User api_key Updated!"}
+            elif (
+                encrypted_secret_key
+                and encrypted_secret_key
+                != connection.execute(
+                    f""" SELECT SECRET_KEY FROM users WHERE username = '{user}' """
+                ).fetchone()[0]
+            ):
+                connection.execute(
+                    f"""UPDATE users SET secret_key = '{encrypted_secret_key}' WHERE username = '{user}';"""
+                )
+                return {200: "User secret_key Updated!"}
+            elif (
+                encrypted_google_auth_key
+                and encrypted_google_auth_key
+                != connection.execute(
+                    f"""SELECT GOOGLE_AUTH_KEY FROM users WHERE username = '{user}'"""
+                ).fetchone()[0]
+            ):
+                connection.execute(
+                    f"""UPDATE users SET google_auth_key = '{encrypted_google_auth_key}' WHERE username = '{user}';"""
+                )
+                return {200: "User google_auth_key Updated!"}
+            elif (
+                email
+                and email
+                != connection.execute(
+                    f"""SELECT EMAIL FROM users WHERE username = {user}"""
+                ).fetchone()[0]
+            ):
+                connection.execute(f"""UPDATE users SET email = '{email}' WHERE username = '{user}';""")
+                return {200: "User email Updated!"}
+            else:
+                return {400: "User Already Present!"}
         else:
-            return {400: "User Already Present!"}
-    else:
-        return {404: "User not Found!"}
+            return {404: "User not Found!"}
 
 
 def delete_user_credentials(username: str = "", first_name: str = "", last_name: str = "") -> dict:
@@ -292,25 +410,24 @@ def delete_user_credentials(username: str = "", first_name: str = "", last_name:
     else:
         raise ValueError("Either username or first_name and last_name must be provided.")
 
-    engine = create_engine(URL)
-    connection = engine.connect()
     try:
-        user_exsists = connection.execute(
-            f"SELECT * FROM users WHERE username = '{user}'"
-        ).fetchone()
-        if user_exsists:
-            id = connection.execute(f"SELECT id FROM users WHERE username = '{user}';").fetchone()[
-                0
-            ]
-            connection.execute(f"DELETE FROM users WHERE id = '{id}';")
-            max_id = connection.execute("SELECT MAX(Id) FROM users;").fetchone()[0]
-            if max_id is not None:
-                connection.execute(f"ALTER TABLE users AUTO_INCREMENT={max_id};")
+        with get_engine().connect() as connection:
+            user_exsists = connection.execute(
+                f"SELECT * FROM users WHERE username = '{user}'"
+            ).fetchone()
+            if user_exsists:
+                id = connection.execute(f"SELECT id FROM users WHERE username = '{user}';").fetchone()[
+                    0
+                ]
+                connection.execute(f"DELETE FROM users WHERE id = '{id}';")
+                max_id = connection.execute("SELECT MAX(Id) FROM users;").fetchone()[0]
+                if max_id is not None:
+                    connection.execute(f"ALTER TABLE users AUTO_INCREMENT={max_id};")
+                else:
+                    connection.execute("ALTER TABLE users AUTO_INCREMENT=1;")
+                return {200: "User Deleted"}
             else:
-                connection.execute("ALTER TABLE users AUTO_INCREMENT=1;")
-            return {200: "User Deleted"}
-        else:
-            return {404: "User Not Found"}
+                return {404: "User Not Found"}
     except Exception as e:
         return {404: e}
 
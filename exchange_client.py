@@ -0,0 +1,272 @@
+"""Pooled HTTP client shared by every exchange call in the project."""
+import logging
+import threading
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import hedging
+import rate_limiter
+from constants import EXCHANGE_CLIENT_CONFIG, HEDGING_CONFIG, LOGFILE
+from single_flight import SingleFlight
+from ticker_decoder import loads
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+def request_key(url: str, params: dict = None) -> tuple:
+    """Get the key identifying a GET request, the same whatever the order of its query parameters or where they are given.
+
+    Args:
+        url (str): The url, with or without a query string. Eg: "https://public.coindcx.com/market_data/candles?pair=B-BTC_USDT".
+        params (dict, optional): The query parameters passed to requests. Defaults to None.
+
+    Returns:
+        tuple: The lower case scheme and host, the path and the sorted query parameters as strings.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(str(key), str(value)) for key, value in (params or {}).items() if value is not None]
+    return parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", tuple(sorted(query))
+
+
+class ExchangeClient:
+    """Keep-alive HTTP client that owns one pooled requests.Session per host.
+
+    Every session mounts an HTTPAdapter sized by the `exchange_client` section of the config file so that consecutive calls to
+    api.coindcx.com and public.coindcx.com reuse the already open TCP+TLS connections instead of doing a new handshake per call.
+    """
+
+    def __init__(
+        self,
+        config: dict = EXCHANGE_CLIENT_CONFIG,
+        limiter: rate_limiter.RateLimiter = None,
+        hedging_config: dict = HEDGING_CONFIG,
+    ) -> None:
+        """Create the client. Sessions are created lazily on the first request to a host.
+
+        Args:
+            config (dict, optional): Pool size, timeouts and retries. Defaults to EXCHANGE_CLIENT_CONFIG.
+            limiter (rate_limiter.RateLimiter, optional): The rate limits of the requests. Defaults to the shared limiter.
+            hedging_config (dict, optional): Whether and when the GET requests of get_json are hedged. Defaults to HEDGING_CONFIG.
+        """
+        self.config = config
+        self.limiter = rate_limiter.LIMITER if limiter is None else limiter
+        self.hedger = hedging.Hedger(hedging_config)
+        self.timeout = (float(config["connect_timeout"]), float(config["read_timeout"]))
+        self._sessions = {}
+        self._host_limits = {}
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    def _new_session(self, retry: bool = True) -> requests.Session:
+        """Build a session with a keep-alive connection pool.
+
+        Only idempotent GET requests are retried on server errors. Order creation and the other signed POST calls are never
+        replayed by the transport. Throttled (429) responses are left to request, which waits for the rate limiter before retrying.
+
+        Args:
+            retry (bool, optional): Whether the transport retries the failed GET requests. Defaults to True.
+
+        Returns:
+            requests.Session: The pooled session.
+        """
+        retries = Retry(
+            total=int(self.config["retries"]) if retry else 0,
+            backoff_factor=float(self.config["backoff_factor"]),
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=int(self.config["pool_connections"]),
+            pool_maxsize=int(self.config["pool_maxsize"]),
+            pool_block=bool(self.config["pool_block"]),
+            max_retries=retries,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def session(self, url: str, retry: bool = True) -> requests.Session:
+        """Get the pooled session of the host of the url.
+
+        Args:
+            url (str): The url that is going to be requested.
+            retry (bool, optional): Whether the session retries the failed GET requests. Defaults to True.
+
+        Returns:
+            requests.Session: The session of the host.
+        """
+        key = (urlsplit(url).netloc, retry)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    logging.info(f"Opening a pooled session for {key[0]}{'' if retry else ' without retries'}")
+                    session = self._new_session(retry)
+                    self._sessions[key] = session
+        return session
+
+    def host_limit(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore capping the requests in flight to the host of the url at max_per_host.
+
+        Args:
+            url (str): The url that is going to be requested.
+
+        Returns:
+            threading.BoundedSemaphore: The semaphore of the host.
+        """
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            with self._lock:
+                limit = self._host_limits.setdefault(host, threading.BoundedSemaphore(int(self.config["max_per_host"])))
+        return limit
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs) -> requests.Response:
+        """Send a request through the pooled session of the host. The request first waits for the rate limit of its host and
+        endpoint class, then at most max_per_host requests per host are in flight at once, extra threads wait for a slot. Throttled
+        GET requests are sent again once the limiter allows it.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The url to request.
+            retry (bool, optional): Whether the failed and throttled GET requests are sent again. False for the calls already
+                retried by resilience.POLICY, so that one layer retries them and the circuit breaker sees every failure. Defaults
+                to True.
+            **kwargs: Passed through to requests. The configured timeout is used if no timeout is given.
+
+        Returns:
+            requests.Response: The response of the exchange.
+
+        Raises:
+            rate_limiter.RateLimitExceeded: If the host is throttled for longer than the max wait of the limiter.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        retries = int(self.config["retries"]) if method == "GET" and retry else 0
+        for attempt in range(retries + 1):
+            self.limiter.acquire(url)
+            with self.host_limit(url):
+                response = self.session(url, retry).request(method, url, **kwargs)
+            self.limiter.record(url, response.status_code, response.headers)
+            if response.status_code != 429:
+                break
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request. Same arguments as requests.get."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request. Same arguments as requests.post."""
+        return self.request("POST", url, **kwargs)
+
+    def _get_json(self, url: str, params: dict, **kwargs):
+        parts = urlsplit(url)
+        response = self.hedger.call((parts.netloc, parts.path), self.get, url, params=params, **kwargs)
+        response.raise_for_status()
+        return loads(response.content)
+
+    def get_json(self, url: str, params: dict = None, **kwargs):
+        """Send a GET request and parse its JSON body, sharing one request between the concurrent callers of the same url and params.
+
+        The callers arriving while the request is in flight get the same parsed body, or the same exception, and must not modify it.
+        With hedging enabled, a duplicate request is sent when no response came within the percentile latency of the endpoint.
+
+        Args:
+            url (str): The url to request.
+            params (dict, optional): The query parameters. Defaults to None.
+            **kwargs: Passed through to requests by the caller that sends the request. Eg: timeout.
+
+        Returns:
+            The parsed JSON body of the response.
+
+        Raises:
+            requests.HTTPError: If the response has an error status.
+        """
+        return self._flight.do(request_key(url, params), self._get_json, url, params, **kwargs)
+
+    def coalescing_stats(self) -> dict:
+        """Get the GET requests sent by get_json, the callers that shared one and the share of the callers coalesced."""
+        return self._flight.stats()
+
+    def hedging_stats(self) -> dict:
+        """Get the requests, hedges and p50/p99 latencies with and without hedging of every endpoint requested by get_json."""
+        return self.hedger.stats()
+
+    def connection_stats(self) -> dict:
+        """Get the per host connection reuse counters.
+
+        Returns:
+            dict: For every host the number of requests sent, connections opened and requests that reused an open connection.
+        """
+        stats = {}
+        for (host, _), session in list(self._sessions.items()):
+            adapter = session.get_adapter(f"https://{host}")
+            host_stats = stats.setdefault(host, {"requests": 0, "connections_opened": 0})
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host_stats["requests"] += pool.num_requests
+                host_stats["connections_opened"] += pool.num_connections
+        for host_stats in stats.values():
+            host_stats["connections_reused"] = max(host_stats["requests"] - host_stats["connections_opened"], 0)
+        return stats
+
+    def close(self) -> None:
+        """Close every pooled session."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+CLIENT = ExchangeClient()
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Send a GET request through the shared exchange client."""
+    return CLIENT.get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Send a POST request through the shared exchange client."""
+    return CLIENT.post(url, **kwargs)
+
+
+def get_json(url: str, params: dict = None, **kwargs):
+    """Send a GET request through the shared exchange client, coalesced with the identical requests in flight, and parse its body."""
+    return CLIENT.get_json(url, params=params, **kwargs)
+
+
+def coalescing_stats() -> dict:
+    """Get the coalescing counters of the GET requests of the shared exchange client."""
+    return CLIENT.coalescing_stats()
+
+
+def hedging_stats() -> dict:
+    """Get the hedging counters and latencies of the GET requests of the shared exchange client."""
+    return CLIENT.hedging_stats()
+
+
+def connection_stats() -> dict:
+    """Get the per host connection reuse counters of the shared exchange client."""
+    return CLIENT.connection_stats()
+
+
+def rate_limit_stats() -> dict:
+    """Get the requests, queued requests, throttled responses and current rate of every rate limited endpoint class."""
+    return CLIENT.limiter.stats()
@@ -0,0 +1,163 @@
+"""Persistent cache of the TradingView exchange that serves each symbol."""
+import json
+import logging
+import os
+import threading
+import time
+
+import market_registry
+from constants import CACHE_CONFIG, LOGFILE, MARKETS, TRADINGVIEW_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+# The error of tradingview_ta when the exchange does not list the symbol, the only error that is a miss.
+NOT_FOUND = "Exchange or symbol not found."
+
+
+def exchange_chain(market: str, exchange: str = "Binance", fallback_exchanges: list = None) -> list:
+    """Get the exchanges to look a market up on, in order: the requested one, the one it is listed on at CoinDCX, then the fallbacks.
+
+    Args:
+        market (str): The market. Eg: BTCUSDT.
+        exchange (str, optional): The exchange to try first. Defaults to "Binance".
+        fallback_exchanges (list, optional): The exchanges to try last. Defaults to the tradingview fallback exchanges of the config file.
+
+    Returns:
+        list: The exchanges without duplicates.
+    """
+    if fallback_exchanges is None:
+        fallback_exchanges = TRADINGVIEW_CONFIG["fallback_exchanges"]
+    chain = []
+    for candidate in [exchange, MARKETS.get(market_registry.REGISTRY.ecode(market)), *fallback_exchanges]:
+        if candidate and candidate not in chain:
+            chain.append(candidate)
+    return chain
+
+
+class ExchangeResolutionCache:
+    """The exchange that served each (symbol, screener) on TradingView, and the symbols no exchange served.
+
+    A resolved symbol goes straight to its exchange instead of walking the fallback chain again. A symbol no exchange served is
+    remembered for negative_ttl seconds and skipped until then. The cache is saved to a JSON file so that it survives restarts.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_CONFIG["exchange_resolution_file"],
+        negative_ttl: float = CACHE_CONFIG["exchange_resolution_negative_ttl"],
+    ) -> None:
+        """Create the cache. The saved resolutions are loaded on the first lookup.
+
+        Args:
+            path (str, optional): The JSON file of the cache. Defaults to the exchange resolution file of the config file.
+            negative_ttl (float, optional): Seconds a symbol no exchange served is skipped. Defaults to a day.
+        """
+        self.path = path
+        self.negative_ttl = float(negative_ttl)
+        self._resolved = {}
+        self._missing = {}
+        self._loaded = False
+        self._dirty = False
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "requests_avoided": 0}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(symbol: str, screener_name: str) -> str:
+        return f"{screener_name.lower()}:{symbol.upper()}"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as file:
+                saved = json.load(file)
+            self._resolved = saved.get("resolved", {})
+            self._missing = saved.get("missing", {})
+        except (OSError, ValueError) as e:
+            logging.info(f"Could not load the exchange resolution cache {self.path}: {e}")
+
+    def lookup(self, symbol: str, screener_name: str = "Crypto", chain: list = None) -> tuple:
+        """Look up how to resolve a symbol.
+
+        Args:
+            symbol (str): The symbol. Eg: BTCUSDT.
+            screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
+            chain (list, optional): The exchanges that would be tried without the cache, to count the requests avoided. Defaults to None.
+
+        Returns:
+            tuple: Whether the symbol is known to be missing everywhere and the exchange that served it, None if unknown.
+        """
+        key = self._key(symbol, screener_name)
+        with self._lock:
+            self._load()
+            resolved = self._resolved.get(key)
+            if resolved is not None:
+                self._stats["hits"] += 1
+                self._stats["requests_avoided"] += resolved["attempts"] - 1
+                return False, resolved["exchange"]
+            missing_since = self._missing.get(key)
+            if missing_since is not None and time.time() - missing_since < self.negative_ttl:
+                self._stats["negative_hits"] += 1
+                self._stats["requests_avoided"] += len(chain) if chain else 1
+                return True, None
+            self._stats["misses"] += 1
+            return False, None
+
+    def record(self, symbol: str, screener_name: str, exchange: str, attempts: int = 1) -> None:
+        """Remember the exchange that served a symbol after attempts requests."""
+        key = self._key(symbol, screener_name)
+        with self._lock:
+            self._load()
+            if self._resolved.get(key, {}).get("exchange") != exchange:
+                self._resolved[key] = {"exchange": exchange, "attempts": attempts}
+                self._dirty = True
+            if self._missing.pop(key, None) is not None:
+                self._dirty = True
+
+    def record_missing(self, symbol: str, screener_name: str) -> None:
+        """Remember that no exchange served a symbol."""
+        key = self._key(symbol, screener_name)
+        with self._lock:
+            self._load()
+            self._resolved.pop(key, None)
+            self._missing[key] = time.time()
+            self._dirty = True
+
+    def forget(self, symbol: str, screener_name: str) -> None:
+        """Forget the exchange of a symbol, eg: after the exchange stopped serving it."""
+        key = self._key(symbol, screener_name)
+        with self._lock:
+            self._load()
+            if self._resolved.pop(key, None) is not None:
+                self._dirty = True
+
+    def save(self) -> None:
+        """Save the cache to its JSON file if it changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            missing = {key: since for key, since in self._missing.items() if now - since < self.negative_ttl}
+            try:
+                with open(self.path, "w") as file:
+                    json.dump({"resolved": self._resolved, "missing": missing}, file)
+                self._missing = missing
+                self._dirty = False
+            except OSError as e:
+                logging.info(f"Could not save the exchange resolution cache {self.path}: {e}")
+
+    def stats(self) -> dict:
+        """Get the hits, negative hits, misses and the number of TradingView requests the cache avoided."""
+        with self._lock:
+            return dict(self._stats, resolved=len(self._resolved), missing=len(self._missing))
+
+
+RESOLUTIONS = ExchangeResolutionCache()
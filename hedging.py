@@ -0,0 +1,195 @@
+"""Hedged requests: a duplicate of a slow idempotent request is sent and the first response is used."""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from constants import HEDGING_CONFIG, LOGFILE
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+def percentile(samples: list, percent: float) -> float:
+    """Get the nearest rank percentile of samples.
+
+    Args:
+        samples (list): The samples, sorted.
+        percent (float): The percentile. Eg: 99.
+
+    Returns:
+        float: The percentile. None if there are no samples.
+    """
+    if not samples:
+        return None
+    rank = math.ceil(percent / 100 * len(samples))
+    return samples[min(max(rank, 1), len(samples)) - 1]
+
+
+class LatencyTracker:
+    """Latencies of the last window requests of one endpoint."""
+
+    def __init__(self, window: int = HEDGING_CONFIG["window"]) -> None:
+        self._samples = deque(maxlen=int(window))
+        self._sorted = []
+        self._stale = False
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a request."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._stale = True
+
+    def percentile(self, percent: float) -> float:
+        """Get a percentile of the recent latencies. None if no request was recorded."""
+        with self._lock:
+            if self._stale:
+                self._sorted = sorted(self._samples)
+                self._stale = False
+            return percentile(self._sorted, percent)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+def _close(future) -> None:
+    # The losing request cannot be interrupted once sent, its response is released to the pool as soon as it arrives.
+    if not future.cancelled() and future.exception() is None and hasattr(future.result(), "close"):
+        future.result().close()
+
+
+class Hedger:
+    """Send a duplicate of the requests still waiting for a response after the percentile latency of their endpoint.
+
+    The caller gets the first successful response and the other request is cancelled if it has not started yet, or its response is
+    closed on arrival. At most max_ratio of the requests of an endpoint are hedged, so a slow endpoint gets at most that much extra
+    load. The latencies of the first requests sent are recorded apart from the latencies seen by the callers, which gives the
+    latency percentiles with and without hedging.
+    """
+
+    def __init__(self, config: dict = HEDGING_CONFIG) -> None:
+        """Create the hedger. The threads sending the requests are started on the first hedged endpoint.
+
+        Args:
+            config (dict, optional): The percentile, min_delay, min_samples, max_ratio, window and workers. Defaults to
+                HEDGING_CONFIG.
+        """
+        self.config = config
+        self._endpoints = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _endpoint(self, key) -> dict:
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            with self._lock:
+                endpoint = self._endpoints.setdefault(
+                    key,
+                    {
+                        "sent": LatencyTracker(self.config["window"]),
+                        "seen": LatencyTracker(self.config["window"]),
+                        "requests": 0,
+                        "hedges": 0,
+                        "hedge_wins": 0,
+                    },
+                )
+        return endpoint
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=int(self.config["workers"]), thread_name_prefix="hedging")
+        return self._executor
+
+    def delay(self, key) -> float:
+        """Get the seconds to wait for a response of the endpoint before hedging. None while too few requests were recorded."""
+        sent = self._endpoint(key)["sent"]
+        if len(sent) < int(self.config["min_samples"]):
+            return None
+        return max(sent.percentile(float(self.config["percentile"])), float(self.config["min_delay"]))
+
+    def _take_hedge(self, endpoint: dict) -> bool:
+        with self._lock:
+            if endpoint["hedges"] + 1 > float(self.config["max_ratio"]) * endpoint["requests"]:
+                return False
+            endpoint["hedges"] += 1
+            return True
+
+    @staticmethod
+    def _timed(tracker: LatencyTracker, function, args: tuple, kwargs: dict):
+        start = time.monotonic()
+        result = function(*args, **kwargs)
+        tracker.record(time.monotonic() - start)
+        return result
+
+    def call(self, key, function, *args, **kwargs):
+        """Call an idempotent function sending one request, hedged if hedging is enabled and no response comes within the delay of
+        its endpoint. The latencies are recorded either way.
+
+        Args:
+            key: The endpoint of the request, whose latencies decide the delay. Eg: ("api.coindcx.com", "/exchange/ticker").
+            function (callable): The function sending the request. It is called twice when the request is hedged.
+
+        Returns:
+            The result of the first call that succeeds.
+        """
+        endpoint = self._endpoint(key)
+        with self._lock:
+            endpoint["requests"] += 1
+        delay = self.delay(key) if self.config["enabled"] else None
+        start = time.monotonic()
+        if delay is None:
+            result = self._timed(endpoint["sent"], function, args, kwargs)
+            endpoint["seen"].record(time.monotonic() - start)
+            return result
+        primary = self._pool().submit(self._timed, endpoint["sent"], function, args, kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge(endpoint):
+            result = primary.result()
+            endpoint["seen"].record(time.monotonic() - start)
+            return result
+        hedge = self._pool().submit(function, *args, **kwargs)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                for loser in pending:
+                    if not loser.cancel():
+                        loser.add_done_callback(_close)
+                if future is hedge:
+                    with self._lock:
+                        endpoint["hedge_wins"] += 1
+                endpoint["seen"].record(time.monotonic() - start)
+                return future.result()
+        raise error
+
+    def stats(self) -> dict:
+        """Get for every endpoint the requests, hedges, hedges that answered first and the p50 and p99 latencies in milliseconds
+        of the first requests sent (without hedging) and seen by the callers (with hedging)."""
+        stats = {}
+        for key, endpoint in list(self._endpoints.items()):
+            stats[" ".join(str(part) for part in key) if isinstance(key, tuple) else str(key)] = {
+                "requests": endpoint["requests"],
+                "hedges": endpoint["hedges"],
+                "hedge_wins": endpoint["hedge_wins"],
+                **{
+                    f"{name}_p{percent}_ms": round(endpoint[tracker].percentile(percent) * 1000, 1)
+                    if len(endpoint[tracker])
+                    else None
+                    for name, tracker in (("unhedged", "sent"), ("hedged", "seen"))
+                    for percent in (50, 99)
+                },
+            }
+        return stats
@@ -0,0 +1,244 @@
+"""Technical indicators computed locally with NumPy from the candles of the exchange.
+
+The indicators use the same keys as the TradingView analysis (`RSI`, `EMA10`, `MACD.macd`, `Pivot.M.Fibonacci.R1`...) so that the
+output of compute_indicators can be used wherever the output of get_indicator_data is used. Every function works on 2D arrays of
+shape (number of markets, number of candles) with the oldest candle first, so that many markets are evaluated in one vectorized pass.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+RSI_PERIOD = 14
+STOCHASTIC_PERIODS = (14, 3, 3)
+MACD_PERIODS = (12, 26, 9)
+BOLLINGER_PERIOD = 20
+BOLLINGER_DEVIATIONS = 2.0
+EMA_PERIODS = (10, 20, 30, 50, 100, 200)
+SMA_PERIODS = (10, 20, 30, 50, 100, 200)
+FIBONACCI_LEVELS = (0.382, 0.618, 1.0)
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average of every row. The first period - 1 values are NaN."""
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] >= period:
+        result[:, period - 1 :] = sliding_window_view(values, period, axis=1).mean(axis=2)
+    return result
+
+
+def _recursive_average(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """Exponentially weighted average of every row seeded with the simple average of the first period values."""
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] < period:
+        return result
+    result[:, period - 1] = values[:, :period].mean(axis=1)
+    for index in range(period, values.shape[1]):
+        result[:, index] = alpha * values[:, index] + (1.0 - alpha) * result[:, index - 1]
+    return result
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average of every row."""
+    return _recursive_average(values, period, 2.0 / (period + 1.0))
+
+
+def rma(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's moving average of every row, as used by the RSI."""
+    return _recursive_average(values, period, 1.0 / period)
+
+
+def rsi(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder's relative strength index of every row."""
+    change = np.diff(close, axis=1)
+    average_gain = rma(np.clip(change, 0.0, None), period)
+    average_loss = rma(np.clip(-change, 0.0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+    result = np.where(average_loss == 0.0, 100.0, result)
+    result = np.where(np.isnan(average_gain), np.nan, result)
+    # The first close has no change, keep the output aligned with the candles.
+    return np.concatenate([np.full((close.shape[0], 1), np.nan), result], axis=1)
+
+
+def macd(close: np.ndarray, periods: tuple = MACD_PERIODS) -> tuple:
+    """MACD line and signal line of every row."""
+    fast, slow, signal = periods
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = np.full(close.shape, np.nan)
+    valid = slow - 1
+    if close.shape[1] > valid:
+        signal_line[:, valid:] = ema(macd_line[:, valid:], signal)
+    return macd_line, signal_line
+
+
+def stochastic(high: np.ndarray, low: np.ndarray, close: np.ndarray, periods: tuple = STOCHASTIC_PERIODS) -> tuple:
+    """Slow stochastic %K and %D of every row."""
+    period, smooth_k, smooth_d = periods
+    raw_k = np.full(close.shape, np.nan)
+    if close.shape[1] >= period:
+        highest = sliding_window_view(high, period, axis=1).max(axis=2)
+        lowest = sliding_window_view(low, period, axis=1).min(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw_k[:, period - 1 :] = 100.0 * (close[:, period - 1 :] - lowest) / (highest - lowest)
+    # A window containing a NaN averages to NaN, so the smoothing starts once the raw %K is defined.
+    k_line = sma(raw_k, smooth_k)
+    return k_line, sma(k_line, smooth_d)
+
+
+def bollinger_bands(close: np.ndarray, period: int = BOLLINGER_PERIOD, deviations: float = BOLLINGER_DEVIATIONS) -> tuple:
+    """Upper band, basis and lower band of every row. The standard deviation is the population one, as on TradingView."""
+    basis = sma(close, period)
+    deviation = np.full(close.shape, np.nan)
+    if close.shape[1] >= period:
+        deviation[:, period - 1 :] = sliding_window_view(close, period, axis=1).std(axis=2)
+    return basis + deviations * deviation, basis, basis - deviations * deviation
+
+
+def fibonacci_pivots(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> dict:
+    """Fibonacci pivot points from the high, low and close of the previous period of every row."""
+    pivot = (high + low + close) / 3.0
+    spread = high - low
+    levels = {"Pivot.M.Fibonacci.Middle": pivot}
+    for number, level in enumerate(FIBONACCI_LEVELS, start=1):
+        levels[f"Pivot.M.Fibonacci.R{number}"] = pivot + level * spread
+        levels[f"Pivot.M.Fibonacci.S{number}"] = pivot - level * spread
+    return levels
+
+
+def _sorted_candles(candles: pd.DataFrame) -> pd.DataFrame:
+    """Sort the candles oldest first. The exchange returns the latest candle first."""
+    if "time" in candles:
+        return candles.sort_values("time")
+    return candles
+
+
+def ohlc_matrix(candles_list: list) -> tuple:
+    """Stack the candles of many markets with the same number of candles into open, high, low and close arrays.
+
+    Args:
+        candles_list (list): The candle dataframes as returned by get_candles, all of the same length.
+
+    Returns:
+        tuple: The open, high, low and close arrays of shape (number of markets, number of candles).
+
+    Raises:
+        ValueError: If the histories are not of the same length. Trimming them would leave the indicators of long periods
+            undefined for every market.
+    """
+    frames = [_sorted_candles(candles) for candles in candles_list]
+    if len({len(frame) for frame in frames}) > 1:
+        raise ValueError("The candles of every market must be of the same length, group the markets by history length")
+    columns = []
+    for column in ("open", "high", "low", "close"):
+        columns.append(np.vstack([frame[column].to_numpy(dtype=float) for frame in frames]))
+    return tuple(columns)
+
+
+def _last(values: np.ndarray) -> np.ndarray:
+    return values[:, -1]
+
+
+def compute_indicator_arrays(
+    open_price: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    pivot_ohlc: tuple = None,
+) -> dict:
+    """Compute the latest value of every indicator for every row of the price arrays.
+
+    Args:
+        open_price (np.ndarray): Open prices of shape (markets, candles), oldest first.
+        high (np.ndarray): High prices of the same shape.
+        low (np.ndarray): Low prices of the same shape.
+        close (np.ndarray): Close prices of the same shape.
+        pivot_ohlc (tuple, optional): High, low and close arrays of shape (markets,) of the previous month for the pivots. Defaults to None.
+
+    Returns:
+        dict: The indicator keys mapped to arrays of shape (markets,).
+    """
+    rsi_series = rsi(close)
+    result = {
+        "open": _last(open_price),
+        "high": _last(high),
+        "low": _last(low),
+        "close": _last(close),
+        "RSI": _last(rsi_series),
+    }
+    result["RSI[1]"] = rsi_series[:, -2] if close.shape[1] > 1 else np.full(close.shape[0], np.nan)
+    for period in EMA_PERIODS:
+        result[f"EMA{period}"] = _last(ema(close, period))
+    for period in SMA_PERIODS:
+        result[f"SMA{period}"] = _last(sma(close, period))
+    macd_line, signal_line = macd(close)
+    result["MACD.macd"] = _last(macd_line)
+    result["MACD.signal"] = _last(signal_line)
+    k_line, d_line = stochastic(high, low, close)
+    result["Stoch.K"] = _last(k_line)
+    result["Stoch.D"] = _last(d_line)
+    upper, basis, lower = bollinger_bands(close)
+    result["BB.upper"] = _last(upper)
+    result["BB.lower"] = _last(lower)
+    if pivot_ohlc is not None:
+        result.update(fibonacci_pivots(*pivot_ohlc))
+    return result
+
+
+def _previous_period(candles: pd.DataFrame) -> tuple:
+    """High, low and close of the last completed period: the second latest candle, or the latest if there is only one."""
+    frame = _sorted_candles(candles)
+    row = frame.iloc[-2] if len(frame) > 1 else frame.iloc[-1]
+    return float(row["high"]), float(row["low"]), float(row["close"])
+
+
+def compute_indicators(candles: pd.DataFrame, pivot_candles: pd.DataFrame = None) -> dict:
+    """Compute the indicators of one market.
+
+    Args:
+        candles (pd.DataFrame): The candles of the market as returned by get_candles.
+        pivot_candles (pd.DataFrame, optional): The monthly candles of the market for the Fibonacci pivots. Defaults to None.
+
+    Returns:
+        dict: The indicators with the same keys as the TradingView analysis.
+    """
+    pivot_ohlc = None
+    if pivot_candles is not None and not pivot_candles.empty:
+        pivot_ohlc = tuple(np.array([value]) for value in _previous_period(pivot_candles))
+    arrays = compute_indicator_arrays(*ohlc_matrix([candles]), pivot_ohlc=pivot_ohlc)
+    return {key: float(values[0]) for key, values in arrays.items()}
+
+
+def compute_indicators_many(candles: dict, pivot_candles: dict = None) -> pd.DataFrame:
+    """Compute the indicators of many markets in one vectorized pass per history length.
+
+    Args:
+        candles (dict): The candles of every market keyed by market.
+        pivot_candles (dict, optional): The monthly candles of every market keyed by market for the Fibonacci pivots. Defaults to None.
+
+    Returns:
+        pd.DataFrame: The indicators indexed by market.
+    """
+    markets = [market for market, frame in candles.items() if frame is not None and not frame.empty]
+    if not markets:
+        return pd.DataFrame()
+    pivot_ohlc = None
+    if pivot_candles:
+        previous = [
+            _previous_period(pivot_candles[market])
+            if pivot_candles.get(market) is not None and not pivot_candles[market].empty
+            else (np.nan, np.nan, np.nan)
+            for market in markets
+        ]
+        pivot_ohlc = tuple(np.array(column, dtype=float) for column in zip(*previous))
+    # The markets are evaluated in one pass per history length, a short history never shortens the others.
+    groups = {}
+    for position, market in enumerate(markets):
+        groups.setdefault(len(candles[market]), []).append(position)
+    frames = []
+    for positions in groups.values():
+        group_pivots = None if pivot_ohlc is None else tuple(column[positions] for column in pivot_ohlc)
+        arrays = compute_indicator_arrays(
+            *ohlc_matrix([candles[markets[position]] for position in positions]), pivot_ohlc=group_pivots
+        )
+        frames.append(pd.DataFrame(arrays, index=pd.Index([markets[position] for position in positions], name="market")))
+    return pd.concat(frames).reindex(pd.Index(markets, name="market"))
@@ -1,3 +1,6 @@
+import async_exchange_client
+import database_handler
+import resilience
 import trading_bot
 import uvicorn
 import yaml
@@ -15,6 +18,59 @@ def welcome():
     return "Welcome master Vishal. I am trading bot."
 
 
+@app.get("/database/pool_status", tags=["database"])
+def pool_status():
+    return database_handler.pool_status()
+
+
+@app.get("/resilience/circuits", tags=["resilience"])
+def circuits():
+    return {"circuits": resilience.POLICY.stats(), "transitions": resilience.POLICY.transitions()}
+
+
+@app.get("/exchange/coalescing", tags=["exchange"])
+def coalescing():
+    return {
+        "sync": trading_bot.exchange_client.coalescing_stats(),
+        "async": async_exchange_client.CLIENT.coalescing_stats(),
+    }
+
+
+@app.get("/exchange/hedging", tags=["exchange"])
+def hedging():
+    return trading_bot.exchange_client.hedging_stats()
+
+
+@app.get("/orders/gateway", tags=["orders"])
+def order_gateway_stats():
+    return trading_bot.order_gateway.GATEWAY.stats()
+
+
+@app.get("/orders/tracker", tags=["orders"])
+def order_tracker_stats():
+    return trading_bot.order_tracker.stats()
+
+
+@app.get("/orders/book", tags=["orders"])
+def order_book_stats():
+    return trading_bot.order_book.stats()
+
+
+@app.get("/orders/maintenance", tags=["orders"])
+def order_maintenance_stats():
+    return trading_bot.order_maintenance.MAINTENANCE.stats()
+
+
+@app.get("/orders/journal", tags=["orders"])
+def order_journal_stats():
+    return trading_bot.order_journal.JOURNAL.stats()
+
+
+@app.on_event("shutdown")
+def dispose_database_engine():
+    database_handler.dispose_engine()
+
+
 # @app.get("/get_keys", tags=["trading_bot"])
 # def get_keys(first_name: str = "", last_name: str = "", user: str = ""):
 #     return trading_bot.get_keys(first_name=first_name, last_name=last_name, user=user)
@@ -33,7 +89,22 @@ def welcome():
 
 @app.post("/trading_bot/get_ticker", tags=["trading_bot"])
 def get_ticker(coin_1: str = "BTC", coin_2: str = "USDT", coins_list: list = []):
-    return trading_bot.get_ticker(coin_1=coin_1, coin_2=coin_2, coins_list=coins_list)
+    # Served from the ticker snapshot, downloaded at most once per ttl whatever the number of requests.
+    if coins_list:
+        markets = trading_bot.ticker_snapshot.TICKER.markets()
+        return [markets[market] for market in coins_list if market in markets]
+    ticker = trading_bot.get_ticker(coin_1=coin_1, coin_2=coin_2)
+    return [] if ticker is None else ticker.to_dict("records")
+
+
+@app.post("/trading_bot/get_candles", tags=["trading_bot"])
+async def get_candles(coin_1: str = "BTC", coin_2: str = "USDT", limit: int = 100, interval: str = "4h", coins_list: list = []):
+    # Fetched by the async exchange client on the event loop, the candles of many markets concurrently.
+    if coins_list:
+        candles = await async_exchange_client.get_candles_many(coins_list, limit=limit, interval=interval)
+        return {market: None if data is None else data.to_dict("records") for market, data in candles.items()}
+    candles = await async_exchange_client.get_candles(coin_1=coin_1, coin_2=coin_2, limit=limit, interval=interval)
+    return candles.to_dict("records")
 
 
 # @app.get("/trading_bot/get_markets_details", tags=["trading_bot"])
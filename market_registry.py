@@ -0,0 +1,201 @@
+"""Registry of the markets listed on the exchange built from the markets_details endpoint."""
+import logging
+import threading
+import time
+
+import pandas as pd
+
+import exchange_client
+from constants import CACHE_CONFIG, LOGFILE, URL_DICT
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+class MarketRegistry:
+    """The market universe of the exchange, loaded once and refreshed every refresh_interval seconds.
+
+    The markets are indexed by `coindcx_name`, `symbol` and `pair` so that resolving a candle pair, splitting a market into its base
+    and quote currencies or reading the leverage, precision, min quantity and ecode of a market are O(1) lookups without a download.
+    CoinDCX calls the quote currency `base_currency_short_name` and the traded coin `target_currency_short_name`. This registry uses
+    the usual convention: BTCUSDT has BTC as the base and USDT as the quote.
+    """
+
+    def __init__(
+        self,
+        url: str = URL_DICT["MARKET_DETAILS_URL"],
+        refresh_interval: float = CACHE_CONFIG["markets_details_ttl"],
+    ) -> None:
+        """Create an empty registry. The markets are downloaded on the first lookup.
+
+        Args:
+            url (str, optional): The markets details url. Defaults to URL_DICT["MARKET_DETAILS_URL"].
+            refresh_interval (float, optional): Seconds after which the markets are downloaded again. Defaults to CACHE_CONFIG["markets_details_ttl"].
+        """
+        self.url = url
+        self.refresh_interval = float(refresh_interval)
+        self._records = []
+        self._by_name = {}
+        self._by_symbol = {}
+        self._by_pair = {}
+        self._quotes = ()
+        self._dataframe = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def age(self) -> float:
+        """Get the age of the registry in seconds. Infinite if the markets were never downloaded."""
+        if self._fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self._fetched_at
+
+    def refresh(self) -> list:
+        """Download the markets details now and rebuild the indexes.
+
+        Returns:
+            list: The markets details of every market.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> list:
+        records = exchange_client.get_json(self.url)
+        by_name, by_symbol, by_pair, quotes = {}, {}, {}, set()
+        for market in records:
+            by_name[market.get("coindcx_name")] = market
+            by_symbol[market.get("symbol")] = market
+            by_pair[market.get("pair")] = market
+            if market.get("base_currency_short_name"):
+                quotes.add(market["base_currency_short_name"])
+        self._records = records
+        self._by_name, self._by_symbol, self._by_pair = by_name, by_symbol, by_pair
+        # Longest quote first so that BTCUSDT is split on USDT and not on a shorter suffix.
+        self._quotes = tuple(sorted(quotes, key=len, reverse=True))
+        self._dataframe = None
+        self._fetched_at = time.monotonic()
+        logging.info(f"Market registry refreshed with {len(records)} markets")
+        return records
+
+    def _ensure_fresh(self) -> None:
+        if self.age() > self.refresh_interval:
+            with self._lock:
+                if self.age() > self.refresh_interval:
+                    self._refresh()
+
+    def records(self) -> list:
+        """Get the markets details of every market.
+
+        Returns:
+            list: The markets details as returned by the exchange.
+        """
+        self._ensure_fresh()
+        return self._records
+
+    def dataframe(self) -> pd.DataFrame:
+        """Get the markets details of every market as a dataframe. The dataframe is built once per refresh.
+
+        Returns:
+            pd.DataFrame: The markets details.
+        """
+        self._ensure_fresh()
+        if self._dataframe is None:
+            self._dataframe = pd.DataFrame.from_dict(self._records)
+        return self._dataframe
+
+    def get(self, market: str) -> dict:
+        """Get the details of a market by its coindcx_name, symbol or pair.
+
+        Args:
+            market (str): Eg: BTCUSDT or B-BTC_USDT.
+
+        Returns:
+            dict: The market details. None if the market is not listed.
+        """
+        self._ensure_fresh()
+        return self._by_name.get(market) or self._by_symbol.get(market) or self._by_pair.get(market)
+
+    def pair(self, coin_1: str, coin_2: str = "USDT") -> str:
+        """Get the exchange pair used by the candles endpoint.
+
+        Args:
+            coin_1 (str): The base coin. Eg: BTC.
+            coin_2 (str, optional): The quote coin. Defaults to "USDT".
+
+        Returns:
+            str: The pair. Eg: B-BTC_USDT. None if the market is not listed.
+        """
+        market = self.get(coin_1.upper() + coin_2.upper())
+        return market["pair"] if market else None
+
+    def split(self, market: str) -> tuple:
+        """Split a market into its base and quote currencies.
+
+        Args:
+            market (str): Eg: BTCUSDT.
+
+        Returns:
+            tuple: The base and the quote currency. Eg: ("BTC", "USDT").
+        """
+        details = self.get(market)
+        if details and details.get("target_currency_short_name") and details.get("base_currency_short_name"):
+            return details["target_currency_short_name"], details["base_currency_short_name"]
+        for quote in self._quotes:
+            if market.endswith(quote) and market != quote:
+                return market[: -len(quote)], quote
+        return market, ""
+
+    def ecode(self, market: str) -> str:
+        """Get the exchange code of a market. Eg: B for Binance, I for CoinDCX."""
+        details = self.get(market)
+        return details.get("ecode") if details else None
+
+    def precision(self, market: str) -> tuple:
+        """Get the precision of the base and the quote currency of a market.
+
+        Returns:
+            tuple: The base precision and the quote precision. None if the market is not listed.
+        """
+        details = self.get(market)
+        if not details:
+            return None
+        return details.get("target_currency_precision"), details.get("base_currency_precision")
+
+    def min_quantity(self, market: str) -> float:
+        """Get the minimum quantity of an order in a market. 0.0 if the market is not listed."""
+        details = self.get(market)
+        return float(details.get("min_quantity") or 0.0) if details else 0.0
+
+    def max_leverage(self, market: str, short: bool = False) -> float:
+        """Get the maximum long leverage, or short leverage if short is True, of a market. 0.0 if the market is not listed."""
+        details = self.get(market)
+        if not details:
+            return 0.0
+        return float(details.get("max_leverage_short" if short else "max_leverage") or 0.0)
+
+    def leveraged_markets(self, min_leverage: float = 1.0, short: bool = False, quote: str = "") -> list:
+        """Get the markets whose maximum leverage is above min_leverage.
+
+        Args:
+            min_leverage (float, optional): The leverage to exceed. Defaults to 1.0.
+            short (bool, optional): Use the short leverage instead of the long leverage. Defaults to False.
+            quote (str, optional): Only keep the markets quoted in this currency. Eg: USDT. Defaults to "" for every quote.
+
+        Returns:
+            list: The coindcx_name of the markets sorted by leverage, highest first.
+        """
+        self._ensure_fresh()
+        markets = [
+            name
+            for name in self._by_name
+            if name
+            and self.max_leverage(name, short=short) > min_leverage
+            and (not quote or self.split(name)[1] == quote)
+        ]
+        return sorted(markets, key=lambda name: self.max_leverage(name, short=short), reverse=True)
+
+
+REGISTRY = MarketRegistry()
@@ -9,10 +9,15 @@ import time
 from datetime import datetime, timedelta
 
 import pandas as pd
-import requests
 from tradingview_ta import TA_Handler
 
-from constants import INTERVAL_DICT, LOGFILE, REMOVE_CURRENCIES, URL_DICT
+import exchange_client
+import market_registry
+import rate_limiter
+import ticker_decoder
+import trading_bot
+import tradingview_batch
+from constants import INDICATOR_CONFIG, INTERVAL_DICT, LOGFILE, REMOVE_CURRENCIES, SCANNER_CONFIG, URL_DICT
 
 logging.basicConfig(
     level=logging.INFO,
@@ -41,8 +46,7 @@ def get_market_data(
             else:
                 pass
     # TODO: Add the currency list to get the info about the specified currencies only.
-    data = requests.get(URL_DICT["MARKET_DATA_URL"]).json()
-    df = pd.DataFrame.from_dict(data)
+    df = ticker_decoder.decode(exchange_client.get_json(URL_DICT["MARKET_DATA_URL"]))
     df = df.sort_values("market")
     COLS = df.columns.tolist()
     COLS = [
@@ -70,19 +74,27 @@ def get_market_data(
 
 
 def indicator_data(
-    symbol: str, market: str, screener_name: str = "Crypto", interval: str = "4h"
+    symbol: str,
+    market: str,
+    screener_name: str = "Crypto",
+    interval: str = "4h",
+    source: str = INDICATOR_CONFIG["source"],
 ) -> list:
-    """Get complete indicator data from Trading View.
+    """Get complete indicator data from Trading View or compute it locally from the candles of the exchange.
 
     Args:
         symbol (str): Ticker Ex: "CIPLA", "TATAMOTORS", "XVGBTC", "BTCUSDT"
         market (str): Exchange ("NSE", "BSE", "Binance")
         screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
         interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        source (str, optional): "tradingview" or "local". Defaults to the indicators source of the config file.
 
     Returns:
         list: The indicator data for the market pair in an exchange.
     """
+    if source == "local":
+        coin_1, coin_2 = market_registry.REGISTRY.split(symbol)
+        return trading_bot.get_local_indicator_data(coin_1=coin_1, coin_2=coin_2, interval=interval)
 
     trading_pair = TA_Handler(
         symbol=f"{symbol}",
@@ -90,7 +102,7 @@ def indicator_data(
         exchange=f"{market}",
         interval=INTERVAL_DICT[str(interval)],
     )
-    return trading_pair.get_analysis().indicators
+    return rate_limiter.LIMITER.call(rate_limiter.TRADINGVIEW_URL, trading_pair.get_analysis).indicators
 
 
 def market_tracker(
@@ -99,6 +111,8 @@ def market_tracker(
     market: str = "Binance",
     interval: str = "4h",
     limit: int = 100,
+    source: str = INDICATOR_CONFIG["source"],
+    workers: int = SCANNER_CONFIG["workers"],
 ):
     """
     Retrieves market data for a given coin and performs various analyses based on the data.
@@ -109,6 +123,9 @@ def market_tracker(
         market (str): The market to track. Defaults to "Binance".
         interval (str): The time interval for tracking. Defaults to "4h".
         limit (int): The maximum number of data points to retrieve. Defaults to 100.
+        source (str): "tradingview" or "local". Defaults to the indicators source of the config file.
+        workers (int): The number of markets whose candles are fetched concurrently with the local source. Defaults to the scanner
+            workers of the config file.
 
     Returns:
         None
@@ -121,24 +138,18 @@ def market_tracker(
         ...
     """
     if coin_1 == "":
-        pass
-
-        for coin in get_market_data(remove_currency=["BTC"])["market"]:
-            try:
-
-                indicator_data_ = indicator_data(coin, market=market, interval=interval)
-                rsi = indicator_data_["RSI"]
-                if rsi < 40:
-                    print(coin, rsi)
-
-            except:
-                indicator_data_ = indicator_data(coin, market="Huobi", interval=interval)
-                rsi = indicator_data_["RSI"]
-                print(coin)
-                if rsi < 40:
-                    print(coin, rsi)
+        markets = get_market_data(remove_currency=["BTC"])["market"].tolist()
+        if source == "local":
+            indicator_dataframe = trading_bot.get_local_indicators(markets, interval=interval, pivots=False, workers=workers)
+        else:
+            indicator_dataframe = tradingview_batch.get_indicators(
+                markets, exchange=market, interval=interval, fallback_exchanges=["Huobi"]
+            )
+        for coin, rsi in indicator_dataframe["RSI"].items():
+            if rsi < 40:
+                print(coin, rsi)
     else:
-        indicator_data_ = indicator_data(symbol=coin_1 + coin_2, interval=interval, market=market)
+        indicator_data_ = indicator_data(symbol=coin_1 + coin_2, interval=interval, market=market, source=source)
         rsi = indicator_data_["RSI"]
         print(rsi)
         ema50 = indicator_data_["EMA50"]
@@ -0,0 +1,269 @@
+"""Local book of the open orders of every account, kept in sync with the exchange without asking it for every read."""
+import logging
+import threading
+import time
+from collections import deque
+
+import account_client
+from constants import LOGFILE, ORDER_BOOK_CONFIG
+from order_tracker import CLOSED_STATUSES
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+SIDES = ("buy", "sell")
+COMPARED_FIELDS = ("status", "price_per_unit", "total_quantity", "remaining_quantity")
+
+
+def _orders(data) -> list:
+    try:
+        return account_client.listed_orders(data, "orders")
+    except Exception:
+        return []
+
+
+class OrderBook:
+    """The open orders of one account, indexed by id and by market and side.
+
+    The book is updated from the responses of the orders the account places, cancels and edits, and reconciled with the active
+    orders of the exchange: the orders missing locally are added, the orders the exchange no longer lists are removed and the
+    orders that changed are replaced. What a reconciliation had to fix is the drift of the book, eg: the fills and the orders placed
+    or cancelled elsewhere. The orders updated locally while a reconciliation waits for the exchange are left as they are.
+    """
+
+    def __init__(self, username: str, config: dict = ORDER_BOOK_CONFIG, account=account_client.account) -> None:
+        """Create an empty book. Reconciling starts with start.
+
+        Args:
+            username (str): The username of the account.
+            config (dict, optional): The reconcile_interval in seconds and the markets always reconciled. Defaults to
+                ORDER_BOOK_CONFIG.
+            account (callable, optional): Returns the account_client.AccountClient of a username. Defaults to account_client.account.
+        """
+        self.username = username
+        self.interval = float(config["reconcile_interval"])
+        self.markets = list(config["markets"])
+        self.account = account
+        self.reconciled_at = None
+        self.drift = deque(maxlen=100)
+        self._orders = {}
+        self._index = {}
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {
+            "reconciliations": 0,
+            "requests": 0,
+            "updates": 0,
+            "added": 0,
+            "removed": 0,
+            "changed": 0,
+            "errors": 0,
+        }
+
+    def _put(self, order: dict) -> None:
+        self._remove(order["id"])
+        if order.get("status") in CLOSED_STATUSES:
+            return
+        self._orders[order["id"]] = order
+        self._index.setdefault((order.get("market"), order.get("side")), {})[order["id"]] = order
+
+    def _remove(self, order_id: str) -> None:
+        order = self._orders.pop(order_id, None)
+        if order is not None:
+            key = (order.get("market"), order.get("side"))
+            self._index[key].pop(order_id, None)
+            if not self._index[key]:
+                del self._index[key]
+
+    def apply(self, action: str, body: dict, data) -> None:
+        """Update the book from an order the exchange accepted. See account_client.add_listener.
+
+        Args:
+            action (str): "create", "cancel", "cancel_all", "cancel_by_ids" or "edit_price".
+            body (dict): The body of the request.
+            data: The parsed response.
+        """
+        if account_client.rejected(data):
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._stats["updates"] += 1
+            if action == "create":
+                for order in _orders(data):
+                    # Market orders fill on arrival, they are never open long enough to be read from the book.
+                    if order.get("order_type") != "market_order":
+                        self._put(dict(order))
+                        self._touched[order["id"]] = now
+            elif action in ("cancel", "cancel_by_ids"):
+                for order_id in body.get("ids", [body.get("id")]):
+                    self._remove(str(order_id))
+                    self._touched[str(order_id)] = now
+            elif action == "cancel_all":
+                for order in self._select(body.get("market"), body.get("side")):
+                    self._remove(order["id"])
+                    self._touched[order["id"]] = now
+            elif action == "edit_price" and body.get("id") in self._orders:
+                self._put({**self._orders[body["id"]], "price_per_unit": float(body["price_per_unit"])})
+                self._touched[body["id"]] = now
+
+    def _select(self, market: str = None, side: str = None) -> list:
+        if market and side:
+            return list(self._index.get((market, side), {}).values())
+        if market:
+            return [order for side in SIDES for order in self._index.get((market, side), {}).values()]
+        return [order for order in self._orders.values() if not side or order.get("side") == side]
+
+    def open_orders(self, market: str = None, side: str = None) -> list:
+        """Get the open orders of a market and side from the book, without a request.
+
+        Args:
+            market (str, optional): The market. Eg: "BTCUSDT". Defaults to None for every market.
+            side (str, optional): "buy" or "sell". Defaults to None for both sides.
+
+        Returns:
+            list: The orders as last returned by the exchange.
+        """
+        with self._lock:
+            return self._select(market, side)
+
+    def get(self, order_id: str) -> dict:
+        """Get an open order by id. None if the order is not open."""
+        with self._lock:
+            return self._orders.get(order_id)
+
+    def reconciled_markets(self) -> list:
+        """Get the markets of the config and the markets of the orders in the book."""
+        with self._lock:
+            return list(dict.fromkeys(self.markets + [market for market, _ in self._index]))
+
+    def reconcile(self, markets: list = None) -> dict:
+        """Compare the book with the active orders of the exchange on some markets and fix it.
+
+        The exchange lists the active orders of one market per request. The orders placed elsewhere are found on the markets of the
+        config and on the markets the book already has orders on.
+
+        Args:
+            markets (list, optional): The markets to reconcile, one request each. Defaults to None for reconciled_markets.
+
+        Returns:
+            dict: The drift: the time and the ids of the orders added, removed and changed.
+
+        Raises:
+            Exception: If a listing was rejected by the exchange. The book is left as it is.
+        """
+        markets = self.reconciled_markets() if markets is None else list(markets)
+        client = self.account(self.username)
+        started = time.monotonic()
+        remote = {
+            order["id"]: order
+            for market in markets
+            for order in account_client.listed_orders(client.active_orders(market=market), f"active orders of {market}")
+        }
+        with self._lock:
+            local = {order["id"]: order for market in markets for order in self._select(market)}
+            fresh = {order_id for order_id, touched in self._touched.items() if touched >= started}
+            drift = {
+                "time": time.time(),
+                "added": [order_id for order_id in remote if order_id not in self._orders and order_id not in fresh],
+                "removed": [order_id for order_id in local if order_id not in remote and order_id not in fresh],
+                "changed": [
+                    order_id
+                    for order_id, order in remote.items()
+                    if order_id in self._orders
+                    and order_id not in fresh
+                    and any(str(self._orders[order_id].get(name)) != str(order.get(name)) for name in COMPARED_FIELDS)
+                ],
+            }
+            for order_id in drift["removed"]:
+                self._remove(order_id)
+            for order_id in drift["added"] + drift["changed"]:
+                self._put(dict(remote[order_id]))
+            self._touched = {order_id: self._touched[order_id] for order_id in fresh}
+            self._stats["reconciliations"] += 1
+            self._stats["requests"] += len(markets)
+            for name in ("added", "removed", "changed"):
+                self._stats[name] += len(drift[name])
+            self.reconciled_at = time.time()
+            self.drift.append(drift)
+        if drift["added"] or drift["removed"] or drift["changed"]:
+            logging.warning(
+                f"Order book of {self.username} drifted: {len(drift['added'])} added, {len(drift['removed'])} removed, "
+                f"{len(drift['changed'])} changed"
+            )
+        return drift
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                with self._lock:
+                    self._stats["errors"] += 1
+                logging.info(f"Order book reconciliation of {self.username} failed: {e}")
+
+    def start(self) -> None:
+        """Reconcile every reconcile_interval seconds on a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"order_book_{self.username}", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop reconciling."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """Get the reconciliations, their requests, the updates from our own orders, the drift found, the failed reconciliations,
+        the open orders and the seconds since the last reconciliation."""
+        with self._lock:
+            return dict(
+                self._stats,
+                open_orders=len(self._orders),
+                markets=len({market for market, _ in self._index}),
+                last_reconciled_s=round(time.time() - self.reconciled_at, 1) if self.reconciled_at else None,
+            )
+
+
+_BOOKS = {}
+_BOOKS_LOCK = threading.Lock()
+
+
+def book(username: str) -> OrderBook:
+    """Get the book of an account, reconciled on the first call and then on a background thread.
+
+    Args:
+        username (str): The username of the account.
+
+    Returns:
+        OrderBook: The book of the account.
+    """
+    order_book = _BOOKS.get(username)
+    if order_book is None:
+        with _BOOKS_LOCK:
+            order_book = _BOOKS.get(username)
+            if order_book is None:
+                order_book = _BOOKS[username] = OrderBook(username)
+                order_book.start()
+    if order_book.reconciled_at is None:
+        order_book.reconcile()
+    return order_book
+
+
+def _on_order(client: account_client.AccountClient, action: str, body: dict, data) -> None:
+    order_book = _BOOKS.get(client.username)
+    if order_book is not None:
+        order_book.apply(action, body, data)
+
+
+account_client.add_listener(_on_order)
+
+
+def stats() -> dict:
+    """Get the stats of the book of every account keyed by username."""
+    return {username: order_book.stats() for username, order_book in list(_BOOKS.items())}
@@ -0,0 +1,188 @@
+"""Gateway coalescing the orders of every strategy and account into create multiple orders requests."""
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import account_client
+from constants import LOGFILE, ORDER_GATEWAY_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+class OrderGateway:
+    """Collect order intents for window seconds and place the intents of an account in one request.
+
+    The first intent of an account opens its batch and the batch is sent window seconds later, or as soon as it holds max_batch
+    intents. A batch of one order goes to the create order endpoint, larger batches to the create multiple orders endpoint in chunks
+    of max_batch. Every intent gets a client_order_id, used to give each caller its own order of the response. Orders are never
+    retried: when a request fails, every intent of the request gets its error.
+    """
+
+    def __init__(self, config: dict = ORDER_GATEWAY_CONFIG, account=account_client.account) -> None:
+        """Create the gateway. Its thread is started on the first intent.
+
+        Args:
+            config (dict, optional): The window in seconds, max_batch and the workers sending the requests. Defaults to
+                ORDER_GATEWAY_CONFIG.
+            account (callable, optional): Returns the account_client.AccountClient of a username. Defaults to account_client.account.
+        """
+        self.window = float(config["window"])
+        self.max_batch = int(config["max_batch"])
+        self.account = account
+        self._workers = int(config["workers"])
+        self._batches = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self._stats = {"intents": 0, "requests": 0, "orders_placed": 0, "errors": 0}
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="order_gateway")
+            self._thread = threading.Thread(target=self._run, name="order_gateway", daemon=True)
+            self._thread.start()
+
+    def submit(self, username: str, order: dict) -> Future:
+        """Queue an order intent.
+
+        Args:
+            username (str): The username of the account placing the order.
+            order (dict): The body of the create order endpoint without the timestamp. Eg: {"side": "buy", "order_type":
+                "limit_order", "market": "BTCUSDT", "price_per_unit": 25000, "total_quantity": 0.001}.
+
+        Returns:
+            Future: Resolves to the order placed by the exchange, or to the error of its request.
+        """
+        order = dict(order)
+        order.setdefault("client_order_id", uuid.uuid4().hex)
+        future = Future()
+        with self._condition:
+            self._start()
+            batch = self._batches.get(username)
+            if batch is None:
+                batch = self._batches[username] = {"deadline": time.monotonic() + self.window, "intents": []}
+            batch["intents"].append((order, future))
+            self._stats["intents"] += 1
+            if len(batch["intents"]) >= self.max_batch:
+                batch["deadline"] = 0.0
+            self._condition.notify()
+        return future
+
+    def place(self, username: str, orders: list, timeout: float = None) -> list:
+        """Place several orders of an account and wait for them.
+
+        Args:
+            username (str): The username of the account placing the orders.
+            orders (list): The bodies of the create order endpoint without the timestamp.
+            timeout (float, optional): Seconds to wait for every order. Defaults to None to wait until they are placed.
+
+        Returns:
+            list: The order placed by the exchange, or the error of its request, for every order in the order of orders.
+        """
+        futures = [self.submit(username, order) for order in orders]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def flush(self) -> None:
+        """Send every open batch now."""
+        with self._condition:
+            for batch in self._batches.values():
+                batch["deadline"] = 0.0
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                now = time.monotonic()
+                due = [username for username, batch in self._batches.items() if batch["deadline"] <= now]
+                if not due:
+                    deadlines = [batch["deadline"] for batch in self._batches.values()]
+                    self._condition.wait(min(deadlines) - now if deadlines else None)
+                    continue
+                batches = [(username, self._batches.pop(username)["intents"]) for username in due]
+            for username, intents in batches:
+                for start in range(0, len(intents), self.max_batch):
+                    self._executor.submit(self._send, username, intents[start : start + self.max_batch])
+
+    def _send(self, username: str, intents: list) -> None:
+        orders = [order for order, _ in intents]
+        with self._condition:
+            self._stats["requests"] += 1
+        try:
+            client = self.account(username)
+            data = client.create_order(orders[0]) if len(orders) == 1 else client.create_multiple_orders(orders)
+            placed = _split(data, orders)
+        except Exception as e:
+            logging.info(f"Order gateway request of {len(orders)} orders for {username} failed: {e}")
+            with self._condition:
+                self._stats["errors"] += 1
+            for _, future in intents:
+                future.set_exception(e)
+            return
+        logging.info(f"Order gateway placed {len(orders)} orders for {username} in one request")
+        with self._condition:
+            self._stats["orders_placed"] += sum(not isinstance(result, Exception) for result in placed)
+        for (_, future), result in zip(intents, placed):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        """Get the intents received, requests sent, orders placed, failed requests and intents per request."""
+        with self._condition:
+            stats = dict(self._stats, open_batches=len(self._batches))
+        stats["intents_per_request"] = round(stats["intents"] / stats["requests"], 2) if stats["requests"] else 0.0
+        return stats
+
+
+def _split(data, orders: list) -> list:
+    """Match the orders of a create order response to the orders of the request.
+
+    Args:
+        data: The parsed response. Eg: {"orders": [{"id": "...", "client_order_id": "...", ...}]}.
+        orders (list): The orders of the request.
+
+    Returns:
+        list: The placed order, or an Exception if the exchange did not return it, for every order of the request.
+
+    Raises:
+        Exception: If the response is an error of the whole request.
+    """
+    placed = data.get("orders") if isinstance(data, dict) else data
+    if not isinstance(placed, list):
+        raise Exception(f"Orders not placed: {data}")
+    by_client_id = {order.get("client_order_id"): order for order in placed if isinstance(order, dict)}
+    results = []
+    for index, order in enumerate(orders):
+        result = by_client_id.get(order["client_order_id"])
+        if result is None and len(placed) == len(orders):
+            # The exchange answers the orders in the order of the request.
+            result = placed[index]
+        results.append(result if result is not None else Exception(f"Order not placed: {order}"))
+    return results
+
+
+GATEWAY = OrderGateway()
+
+
+def submit(username: str, order: dict) -> Future:
+    """Queue an order intent on the shared gateway."""
+    return GATEWAY.submit(username, order)
+
+
+def place(username: str, orders: list, timeout: float = None) -> list:
+    """Place several orders of an account through the shared gateway and wait for them."""
+    return GATEWAY.place(username, orders, timeout=timeout)
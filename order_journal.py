@@ -0,0 +1,298 @@
+"""Append-only journal of the orders placed, cancelled and edited, written by a single background thread."""
+import atexit
+import csv
+import fcntl
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import account_client
+from constants import LOGFILE, ORDER_HISTORY_FILE, ORDER_JOURNAL_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+# The first six columns are the columns of the rows written before the journal, the details of the order follow.
+COLUMNS = (
+    "id",
+    "market",
+    "total_quantity",
+    "order_type",
+    "side",
+    "time",
+    "username",
+    "event",
+    "price_per_unit",
+    "status",
+    "client_order_id",
+)
+
+
+def _csv(rows: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, dialect="excel").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+HEADER_BYTES = len(_csv([COLUMNS]))
+
+
+def _row(record: tuple) -> list:
+    timestamp, username, event, order, status = record
+    return [
+        order.get("id", ""),
+        order.get("market", ""),
+        order.get("total_quantity", ""),
+        order.get("order_type", ""),
+        order.get("side", ""),
+        datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3],
+        username,
+        event,
+        order.get("price_per_unit", ""),
+        status or order.get("status", ""),
+        order.get("client_order_id", ""),
+    ]
+
+
+class OrderJournal:
+    """Journal of the order events of every account of the process.
+
+    record only puts the event on a queue, with the time it happened, so placing an order does no disk I/O. One thread takes the
+    records queued while it was writing, at most max_batch, formats them as CSV rows and appends them in one write of a file
+    opened with O_APPEND, which keeps the batches of several bots writing to the same file whole. The file is synced to the
+    disk according to the fsync policy and rotated past max_bytes.
+
+    The bots sharing the file append under a shared lock of a lock file next to it and rotate it under the exclusive lock. A bot
+    whose file was rotated by another reopens the path before its next write instead of appending to the backup.
+    """
+
+    def __init__(self, path: str = ORDER_HISTORY_FILE, config: dict = ORDER_JOURNAL_CONFIG) -> None:
+        """Create the journal. Its thread is started on the first record.
+
+        Args:
+            path (str, optional): The journal file. Defaults to ORDER_HISTORY_FILE.
+            config (dict, optional): The max_batch, fsync policy, fsync_interval, max_bytes and backups. Defaults to
+                ORDER_JOURNAL_CONFIG.
+        """
+        if config["fsync"] not in ("always", "interval", "never"):
+            raise Exception(f"Unknown fsync policy: {config['fsync']}")
+        self.path = path
+        self.config = config
+        self._queue = queue.SimpleQueue()
+        self._fd = None
+        self._lock_fd = None
+        self._synced_at = 0.0
+        self._dirty = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"records": 0, "writes": 0, "bytes": 0, "fsyncs": 0, "rotations": 0, "errors": 0, "dropped": 0}
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="order_journal", daemon=True)
+                    self._thread.start()
+
+    def record(self, username: str, event: str, order: dict, status: str = None) -> None:
+        """Queue an order event.
+
+        Args:
+            username (str): The username of the account.
+            event (str): The event. Eg: "create", "cancel", "edit_price".
+            order (dict): The order returned by the exchange, or the body of the request.
+            status (str, optional): The status to journal instead of the status of the order. Defaults to None.
+        """
+        self._start()
+        self._queue.put((time.time(), username, event, dict(order), status))
+
+    def record_response(self, username: str, event: str, body: dict, data) -> None:
+        """Queue the events of a request to place, cancel or edit orders.
+
+        Args:
+            username (str): The username of the account.
+            event (str): "create", "cancel", "cancel_all", "cancel_by_ids" or "edit_price".
+            body (dict): The body of the request, an order or {"orders": [...]} for create.
+            data: The parsed response, or the error of the request.
+        """
+        failed = isinstance(data, Exception) or account_client.rejected(data)
+        status = "error" if isinstance(data, Exception) else "rejected" if failed else None
+        if event == "create":
+            placed = None if failed or not isinstance(data, dict) else data.get("orders")
+            for order in placed if isinstance(placed, list) else body.get("orders", [body]):
+                self.record(username, event, order, status)
+        elif event == "cancel_by_ids":
+            for order_id in body.get("ids", []):
+                self.record(username, event, {"id": order_id}, status or "accepted")
+        else:
+            self.record(username, event, body, status or "accepted")
+
+    def _count(self, **counts) -> None:
+        # The writer thread counts while stats reads from the other threads.
+        with self._lock:
+            for name, count in counts.items():
+                self._stats[name] += count
+
+    def _open(self) -> None:
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            self._append(_csv([COLUMNS]))
+
+    def _close(self) -> None:
+        if self._dirty and self.config["fsync"] != "never":
+            os.fsync(self._fd)
+            self._count(fsyncs=1)
+        os.close(self._fd)
+        self._fd = None
+        self._dirty = False
+
+    def _moved(self) -> bool:
+        # The path is a new file, or no file, once another process rotated it.
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._fd).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _append(self, data: bytes) -> None:
+        written = os.write(self._fd, data)
+        while written < len(data):
+            written += os.write(self._fd, data[written:])
+
+    def _rotate(self) -> None:
+        self._close()
+        backups = int(self.config["backups"])
+        for index in range(backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._count(rotations=1)
+        self._open()
+
+    def _full(self, data: bytes) -> bool:
+        size = os.fstat(self._fd).st_size
+        # A batch larger than max_bytes goes to a new file whole, never to a file of its own after the header.
+        return size > HEADER_BYTES and size + len(data) > int(self.config["max_bytes"])
+
+    def _reopen(self) -> None:
+        if self._fd is not None and self._moved():
+            self._close()
+        if self._fd is None:
+            self._open()
+
+    def _write(self, records: list, sync: bool) -> None:
+        data = _csv([_row(record) for record in records])
+        if self._lock_fd is None:
+            self._lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_SH)
+        try:
+            self._reopen()
+            if self._full(data):
+                # Another bot may rotate the file between the two locks, it is checked again under the exclusive lock.
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+                self._reopen()
+                if self._full(data):
+                    self._rotate()
+            self._append(data)
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+        self._count(records=len(records), writes=1, bytes=len(data))
+        self._dirty = True
+        self._sync(force=sync)
+
+    def _sync(self, force: bool = False) -> None:
+        policy = self.config["fsync"]
+        now = time.monotonic()
+        due = policy == "always" or (policy == "interval" and now - self._synced_at >= float(self.config["fsync_interval"]))
+        if self._dirty and (force or due):
+            os.fsync(self._fd)
+            self._dirty = False
+            self._synced_at = now
+            self._count(fsyncs=1)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=float(self.config["fsync_interval"]))
+            except queue.Empty:
+                # The last records of a burst are synced once the writer is idle.
+                try:
+                    self._sync()
+                except OSError as e:
+                    self._count(errors=1)
+                    logging.error(f"Order journal could not sync {self.path}: {e}")
+                continue
+            records, waiters = [], []
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    records.append(item)
+                if len(records) >= int(self.config["max_batch"]):
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if records:
+                    self._write(records, sync=bool(waiters) and self.config["fsync"] != "never")
+            except OSError as e:
+                self._count(errors=1, dropped=len(records))
+                logging.error(f"Order journal could not write {len(records)} records to {self.path}: {e}")
+                if self._fd is not None:
+                    try:
+                        os.close(self._fd)
+                    except OSError:
+                        pass
+                    self._fd = None
+                    self._dirty = False
+            for waiter in waiters:
+                waiter.set()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until the records queued so far are written, and synced unless the fsync policy is "never".
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to None to wait until they are written.
+
+        Returns:
+            bool: Whether the records were written within the timeout. False if records were dropped by a failed write meanwhile.
+        """
+        if self._thread is None:
+            return True
+        dropped = self.stats()["dropped"]
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout) and self.stats()["dropped"] == dropped
+
+    def stats(self) -> dict:
+        """Get the records written, the writes, bytes, fsyncs and rotations, the failed writes, the records dropped by them and
+        the records still queued."""
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+
+JOURNAL = OrderJournal()
+# The records still queued when the program exits are written, the writer is a daemon thread.
+atexit.register(JOURNAL.flush, 5.0)
+
+
+def record(username: str, event: str, order: dict, status: str = None) -> None:
+    """Queue an order event in the shared journal."""
+    JOURNAL.record(username, event, order, status)
+
+
+def record_response(username: str, event: str, body: dict, data) -> None:
+    """Queue the events of a request to place, cancel or edit orders in the shared journal."""
+    JOURNAL.record_response(username, event, body, data)
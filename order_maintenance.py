@@ -0,0 +1,202 @@
+"""Bulk cancels and price edits of the open orders of an account, with a result per order."""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import account_client
+import order_book
+import order_journal
+from constants import LOGFILE, ORDER_MAINTENANCE_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+def _result(call, *args):
+    try:
+        data = call(*args)
+    except Exception as e:
+        return e
+    return Exception(f"Rejected by the exchange: {data}") if account_client.rejected(data) else data
+
+
+def ladder(side: str, levels: list, orders: list) -> tuple:
+    """Match the orders of a ladder with new price levels from the best price on: the highest buy or the lowest sell order gets the
+    best level.
+
+    Args:
+        side (str): "buy" or "sell".
+        levels (list): The new prices.
+        orders (list): The open orders of the ladder.
+
+    Returns:
+        tuple: The new price of the orders to edit keyed by id, the orders already at their level keyed by id and the ids of the
+            orders beyond the last level.
+
+    Raises:
+        Exception: If there are more levels than orders.
+    """
+    if len(levels) > len(orders):
+        raise Exception(f"{len(levels)} levels for {len(orders)} open {side} orders")
+    best_first = side == "buy"
+    orders = sorted(orders, key=lambda order: float(order["price_per_unit"]), reverse=best_first)
+    levels = sorted((float(level) for level in levels), reverse=best_first)
+    prices = {order["id"]: level for order, level in zip(orders, levels) if float(order["price_per_unit"]) != level}
+    unchanged = {order["id"]: order for order, level in zip(orders, levels) if order["id"] not in prices}
+    return prices, unchanged, [order["id"] for order in orders[len(levels) :]]
+
+
+class OrderMaintenance:
+    """Cancel and reprice many orders of an account at once.
+
+    Cancels are sent in cancel_by_ids requests of at most max_ids ids. The exchange has no bulk edit, so the price edits are sent
+    concurrently, one request per order, and the rate limiter of the exchange client spaces them within the limits of the private
+    endpoints. The result of every order is its response, or the error of its request, so a failed order never hides the others.
+    Every request is journaled with its result, the orders left at their level by a reprice are not.
+    """
+
+    def __init__(
+        self,
+        config: dict = ORDER_MAINTENANCE_CONFIG,
+        account=account_client.account,
+        journal: order_journal.OrderJournal = order_journal.JOURNAL,
+    ) -> None:
+        """Create the engine. Its threads are started on the first bulk operation.
+
+        Args:
+            config (dict, optional): The max_ids of a cancel request and the workers sending the requests. Defaults to
+                ORDER_MAINTENANCE_CONFIG.
+            account (callable, optional): Returns the account_client.AccountClient of a username. Defaults to
+                account_client.account.
+            journal (order_journal.OrderJournal, optional): The journal of the cancels and edits. Defaults to
+                order_journal.JOURNAL.
+        """
+        self.max_ids = int(config["max_ids"])
+        self.account = account
+        self.journal = journal
+        self._workers = int(config["workers"])
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {"cancelled": 0, "cancel_requests": 0, "edited": 0, "edit_requests": 0, "errors": 0}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="order_maintenance")
+        return self._executor
+
+    def _count(self, done: str, requests: str, sent: int, results: list) -> None:
+        errors = sum(isinstance(result, Exception) for result in results)
+        with self._lock:
+            self._stats[requests] += sent
+            self._stats[done] += len(results) - errors
+            self._stats["errors"] += errors
+
+    def cancel(self, username: str, ids: list) -> dict:
+        """Cancel orders in concurrent requests of at most max_ids ids.
+
+        Args:
+            username (str): The username of the account.
+            ids (list): The ids of the orders to cancel.
+
+        Returns:
+            dict: The response of its request, or the error of the request, for every id.
+        """
+        ids = list(dict.fromkeys(str(order_id) for order_id in ids))
+        if not ids:
+            return {}
+        client = self.account(username)
+        chunks = [ids[start : start + self.max_ids] for start in range(0, len(ids), self.max_ids)]
+        responses = list(self._pool().map(lambda chunk: _result(client.cancel_multiple_by_ids, chunk), chunks))
+        for chunk, response in zip(chunks, responses):
+            self.journal.record_response(username, "cancel_by_ids", {"ids": chunk}, response)
+        results = {order_id: response for chunk, response in zip(chunks, responses) for order_id in chunk}
+        self._count("cancelled", "cancel_requests", len(chunks), list(results.values()))
+        logging.info(f"Cancelled {len(ids)} orders of {username} in {len(chunks)} requests")
+        return results
+
+    def _submit_edits(self, username: str, prices: dict) -> dict:
+        client = self.account(username)
+        return {order_id: self._pool().submit(_result, client.edit_price, order_id, price) for order_id, price in prices.items()}
+
+    def _edited(self, username: str, prices: dict, futures: dict) -> dict:
+        results = {order_id: future.result() for order_id, future in futures.items()}
+        for order_id, result in results.items():
+            self.journal.record_response(username, "edit_price", {"id": order_id, "price_per_unit": prices[order_id]}, result)
+        self._count("edited", "edit_requests", len(results), list(results.values()))
+        if results:
+            logging.info(f"Edited the price of {len(results)} orders of {username}")
+        return results
+
+    def edit_prices(self, username: str, prices: dict) -> dict:
+        """Change the price of orders concurrently.
+
+        Args:
+            username (str): The username of the account.
+            prices (dict): The new price of every order keyed by id.
+
+        Returns:
+            dict: The response of its edit, or the error of the edit, for every id.
+        """
+        return self._edited(username, prices, self._submit_edits(username, prices))
+
+    def reprice_ladder(self, username: str, market: str, side: str, levels: list, orders: list = None) -> dict:
+        """Move the open orders of a market and side to new price levels.
+
+        The orders and the levels are matched by ladder. The orders already at their level are left as they are and the orders
+        beyond the last level are cancelled.
+
+        Args:
+            username (str): The username of the account.
+            market (str): The market. Eg: "BTCUSDT".
+            side (str): "buy" or "sell".
+            levels (list): The new prices.
+            orders (list, optional): The orders of the ladder. Defaults to None for the open orders of the order book.
+
+        Returns:
+            dict: For every order, the response of its edit or cancel, the error of its request, or the order if it was left as
+                it is.
+
+        Raises:
+            Exception: If there are more levels than orders.
+        """
+        if orders is None:
+            orders = order_book.book(username).open_orders(market=market, side=side)
+        prices, unchanged, surplus = ladder(side, levels, orders)
+        # The surplus is cancelled while the edits are in flight.
+        edits = self._submit_edits(username, prices)
+        cancelled = self.cancel(username, surplus)
+        results = {**unchanged, **self._edited(username, prices, edits), **cancelled}
+        logging.info(
+            f"Repriced the {side} ladder of {market} for {username}: {len(prices)} edited, {len(unchanged)} unchanged, "
+            f"{len(surplus)} cancelled"
+        )
+        return results
+
+    def stats(self) -> dict:
+        """Get the orders cancelled and edited, the requests sent for them and the orders that failed."""
+        with self._lock:
+            return dict(self._stats)
+
+
+MAINTENANCE = OrderMaintenance()
+
+
+def cancel(username: str, ids: list) -> dict:
+    """Cancel orders of an account with the shared engine."""
+    return MAINTENANCE.cancel(username, ids)
+
+
+def edit_prices(username: str, prices: dict) -> dict:
+    """Change the price of orders of an account with the shared engine."""
+    return MAINTENANCE.edit_prices(username, prices)
+
+
+def reprice_ladder(username: str, market: str, side: str, levels: list, orders: list = None) -> dict:
+    """Move the open orders of a market and side of an account to new price levels with the shared engine."""
+    return MAINTENANCE.reprice_ladder(username, market, side, levels, orders=orders)
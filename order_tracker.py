@@ -0,0 +1,239 @@
+"""Tracking of the open orders of an account with batched status requests and fill and cancel events."""
+import logging
+import threading
+import time
+
+import account_client
+from constants import LOGFILE, ORDER_TRACKER_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+CLOSED_STATUSES = ("filled", "cancelled", "rejected", "partially_cancelled")
+
+
+class OrderTracker:
+    """The open orders of one account, whose status changes are sent to the subscribers.
+
+    Every poll asks the exchange for the active orders count. The statuses of the tracked orders are only requested, in batched
+    status_multiple requests, when the count changed since the last poll or every full_poll_every polls, which also catches the partial
+    fills and the fill of an order hidden by a new order. An order missing from max_misses status responses is no longer
+    tracked. The active orders of the configured markets and of the markets of the tracked orders are only listed when the count
+    exceeds the tracked orders, to track the orders placed elsewhere.
+    """
+
+    def __init__(self, username: str, config: dict = ORDER_TRACKER_CONFIG, account=account_client.account) -> None:
+        """Create a tracker without orders. Polling starts with start.
+
+        Args:
+            username (str): The username of the account.
+            config (dict, optional): The poll interval in seconds, the ids per status request, full_poll_every, max_misses and the
+                markets listed to find the orders placed elsewhere. Defaults to ORDER_TRACKER_CONFIG.
+            account (callable, optional): Returns the account_client.AccountClient of a username. Defaults to account_client.account.
+        """
+        self.username = username
+        self.interval = float(config["interval"])
+        self.batch = int(config["batch"])
+        self.full_poll_every = int(config["full_poll_every"])
+        self.max_misses = int(config["max_misses"])
+        self.markets = list(config["markets"])
+        self.account = account
+        self._orders = {}
+        self._misses = {}
+        self._subscribers = []
+        self._count = None
+        self._polls_since_status = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {
+            "polls": 0,
+            "count_requests": 0,
+            "status_requests": 0,
+            "listing_requests": 0,
+            "events": 0,
+            "expired": 0,
+            "errors": 0,
+        }
+
+    def track(self, order) -> None:
+        """Track an order.
+
+        Args:
+            order (dict | str): The order returned by the exchange, or its id.
+        """
+        order = {"id": order} if isinstance(order, str) else dict(order)
+        if order.get("status") in CLOSED_STATUSES:
+            return
+        with self._lock:
+            self._orders.setdefault(order["id"], order)
+
+    def untrack(self, order_id: str) -> None:
+        """Stop tracking an order."""
+        with self._lock:
+            self._orders.pop(order_id, None)
+            self._misses.pop(order_id, None)
+
+    def subscribe(self, callback) -> None:
+        """Call callback(event) on every status change of a tracked order.
+
+        The event is a dict with the username, the order id, the type, which is the new status (Eg: "partially_filled", "filled",
+        "cancelled"), the previous status, the order returned by the exchange and the time it was seen.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def open_orders(self) -> dict:
+        """Get the last known state of every tracked order keyed by id."""
+        with self._lock:
+            return dict(self._orders)
+
+    def _update(self, order: dict, events: list) -> None:
+        with self._lock:
+            previous = self._orders.get(order.get("id"))
+            if previous is None:
+                return
+            changed = previous.get("status") != order.get("status") or previous.get("remaining_quantity") != order.get(
+                "remaining_quantity"
+            )
+            self._misses.pop(order["id"], None)
+            if order.get("status") in CLOSED_STATUSES:
+                del self._orders[order["id"]]
+            else:
+                self._orders[order["id"]] = order
+        if changed and "status" in order:
+            events.append(
+                {
+                    "username": self.username,
+                    "id": order["id"],
+                    "type": order["status"],
+                    "previous": previous.get("status"),
+                    "order": order,
+                    "time": time.time(),
+                }
+            )
+
+    def _emit(self, events: list) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._stats["events"] += len(events)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logging.info(f"Order event subscriber of {self.username} failed: {e}")
+
+    def _expire(self, requested: list, returned: set) -> None:
+        with self._lock:
+            for order_id in requested:
+                if order_id in returned or order_id not in self._orders:
+                    continue
+                self._misses[order_id] = self._misses.get(order_id, 0) + 1
+                if self._misses[order_id] >= self.max_misses:
+                    # Purged by the exchange or of a market it does not report, it would be requested on every poll.
+                    del self._orders[order_id]
+                    del self._misses[order_id]
+                    self._stats["expired"] += 1
+                    logging.info(
+                        f"Order tracker of {self.username} stopped tracking {order_id}, missing from {self.max_misses} status responses"
+                    )
+
+    def _count_request(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def poll(self) -> list:
+        """Check the tracked orders once.
+
+        Returns:
+            list: The events of the status changes found.
+        """
+        client = self.account(self.username)
+        count = client.active_orders_count()
+        self._count_request("count_requests")
+        self._polls_since_status += 1
+        with self._lock:
+            self._stats["polls"] += 1
+            tracked = len(self._orders)
+        if count > tracked:
+            # The exchange lists the active orders of one market per request.
+            with self._lock:
+                tracked_markets = [order.get("market") for order in self._orders.values() if order.get("market")]
+            markets = list(dict.fromkeys(self.markets + tracked_markets))
+            for market in markets:
+                listing = client.active_orders(market=market)
+                self._count_request("listing_requests")
+                for order in account_client.listed_orders(listing, f"active orders of {market}"):
+                    self.track(order)
+        events = []
+        if count != self._count or self._polls_since_status >= self.full_poll_every:
+            ids = list(self.open_orders())
+            for start in range(0, len(ids), self.batch):
+                requested = ids[start : start + self.batch]
+                statuses = account_client.listed_orders(client.order_statuses(requested), "order statuses")
+                for order in statuses:
+                    self._update(order, events)
+                self._expire(requested, {order["id"] for order in statuses})
+                self._count_request("status_requests")
+            self._polls_since_status = 0
+        # Set last, so that a failed poll checks the statuses again.
+        self._count = count
+        self._emit(events)
+        return events
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self._count_request("errors")
+                logging.info(f"Order tracker poll of {self.username} failed: {e}")
+
+    def start(self) -> None:
+        """Poll every interval seconds on a background thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"order_tracker_{self.username}", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        """Get the polls, requests by kind, events, failed polls and tracked orders."""
+        with self._lock:
+            return dict(self._stats, tracked=len(self._orders))
+
+
+_TRACKERS = {}
+_TRACKERS_LOCK = threading.Lock()
+
+
+def tracker(username: str) -> OrderTracker:
+    """Get the tracker of an account, created and started on the first call.
+
+    Args:
+        username (str): The username of the account.
+
+    Returns:
+        OrderTracker: The tracker of the account.
+    """
+    order_tracker = _TRACKERS.get(username)
+    if order_tracker is None:
+        with _TRACKERS_LOCK:
+            order_tracker = _TRACKERS.get(username)
+            if order_tracker is None:
+                order_tracker = _TRACKERS[username] = OrderTracker(username)
+                order_tracker.start()
+    return order_tracker
+
+
+def stats() -> dict:
+    """Get the stats of the tracker of every account keyed by username."""
+    return {username: order_tracker.stats() for username, order_tracker in list(_TRACKERS.items())}
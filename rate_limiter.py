@@ -0,0 +1,284 @@
+"""Token bucket rate limits of the outbound requests per host and endpoint class, adapted to the throttling of the servers."""
+import asyncio
+import logging
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from constants import LOGFILE, RATE_LIMIT_CONFIG, URL_DICT
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+TRADINGVIEW_URL = "https://scanner.tradingview.com/"
+STATUS_PATTERN = re.compile(r"status code: (\d{3})")
+# The unsigned market data endpoints of api.coindcx.com, the other /exchange/v1/ endpoints are signed.
+PUBLIC_PATHS = frozenset(
+    [urlsplit(URL_DICT[name]).path for name in ("MARKET_DATA_URL", "MARKET_DETAILS_URL")] + ["/exchange/v1/markets"]
+)
+
+
+class RateLimitExceeded(Exception):
+    """Raised instead of sending a request that would have to wait longer than the max wait of the limiter."""
+
+
+def endpoint_class(url: str) -> str:
+    """Get the endpoint class of a url.
+
+    Args:
+        url (str): The url. Eg: "https://api.coindcx.com/exchange/v1/orders/create".
+
+    Returns:
+        str: "private" for the signed endpoints of the exchange, "public" for its unsigned market data, "tradingview" for the
+            TradingView scanner. None for the other hosts, which are not limited.
+    """
+    parts = urlsplit(url)
+    if parts.netloc == "scanner.tradingview.com":
+        return "tradingview"
+    if parts.netloc.endswith("coindcx.com"):
+        return "private" if parts.path.startswith("/exchange/v1/") and parts.path not in PUBLIC_PATHS else "public"
+    return None
+
+
+def error_status(error: Exception) -> int:
+    """Get the HTTP status given in the message of an error, eg: "Can't access TradingView's API. HTTP status code: 429". None if
+    the message has no status."""
+    match = STATUS_PATTERN.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def retry_after(headers) -> float:
+    """Get the seconds to wait of a Retry-After header, given in seconds or as an HTTP date. None if there is no usable header."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket that lets requests borrow the tokens of the near future.
+
+    Every request takes a token and waits until the bucket would have refilled it, so concurrent callers are spaced at the rate of
+    the bucket. The rate is cut by the decrease factor on a throttled or failed response and, while the responses succeed, grows
+    back by the recovery fraction of the configured rate per second. The responses of the requests already in flight when the rate was cut do not cut it
+    again for a cooldown. A Retry-After header empties the bucket until it expires, the requests waiting for a token then take a
+    new one so that they are spaced at the rate after the block instead of all being sent when it ends.
+    """
+
+    def __init__(self, rate: float, burst: float, config: dict = RATE_LIMIT_CONFIG) -> None:
+        """Create a full bucket.
+
+        Args:
+            rate (float): The requests per second.
+            burst (float): The requests that can be sent at once after an idle period.
+            config (dict, optional): decrease_factor, recovery, min_rate and cooldown. Defaults to RATE_LIMIT_CONFIG.
+        """
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.decrease_factor = float(config["decrease_factor"])
+        self.recovery = float(config["recovery"])
+        self.min_rate = float(config["min_rate"])
+        self.cooldown = float(config["cooldown"])
+        self.cut_at = None
+        self.increased_at = None
+        self.tokens = float(burst)
+        # Tokens are refilled from updated on, which is in the future while the bucket is blocked.
+        self.updated = time.monotonic()
+        self.blocks = 0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "queued": 0, "waited": 0.0, "rejected": 0, "throttled": 0, "errors": 0}
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, max_wait: float = None) -> float:
+        """Take a token.
+
+        Args:
+            max_wait (float, optional): The longest accepted wait in seconds. Defaults to None to accept any wait.
+
+        Returns:
+            float: The seconds to wait before sending the request. None if the wait would exceed max_wait, no token is taken then.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self.updated - now, 0.0) + max((1.0 - self.tokens) / self.rate, 0.0)
+            if max_wait is not None and wait > max_wait:
+                self._stats["rejected"] += 1
+                return None
+            self.tokens -= 1.0
+            self._stats["requests"] += 1
+            if wait > 0:
+                self._stats["queued"] += 1
+                self._stats["waited"] += wait
+            return wait
+
+    def penalize(self, throttled: bool, delay: float = None) -> None:
+        """Cut the rate after a throttled (429) or failed (5xx) response and block the bucket for delay seconds if given."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.cut_at is None or now - self.cut_at >= self.cooldown:
+                self.rate = max(self.rate * self.decrease_factor, self.min_rate)
+                self.cut_at = now
+            if delay is not None and now + delay > self.updated:
+                self.tokens = min(self.tokens, 0.0)
+                self.updated = now + delay
+                self.blocks += 1
+            self._stats["throttled" if throttled else "errors"] += 1
+
+    def reward(self) -> None:
+        """Grow the rate back towards the configured rate after a successful response."""
+        if self.rate >= self.base_rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            # The successes of the requests sent before the cut say nothing about the new rate.
+            if self.cut_at is not None and now - self.cut_at < self.cooldown:
+                return
+            self._refill(now)
+            since = max(self.increased_at or 0.0, self.cut_at + self.cooldown if self.cut_at is not None else now)
+            self.rate = min(self.rate + self.base_rate * self.recovery * max(now - since, 0.0), self.base_rate)
+            self.increased_at = now
+
+    def stats(self) -> dict:
+        """Get the requests, queued requests, seconds waited, rejected requests, throttled and failed responses and current rate."""
+        with self._lock:
+            return dict(self._stats, waited=round(self._stats["waited"], 3), rate=round(self.rate, 3))
+
+
+class RateLimiter:
+    """One token bucket per (host, endpoint class), sized by the `rate_limit` section of the config file."""
+
+    def __init__(self, config: dict = RATE_LIMIT_CONFIG, classify=endpoint_class) -> None:
+        """Create the limiter. The buckets are created on the first request to a host.
+
+        Args:
+            config (dict, optional): The rate and burst of every endpoint class, the adaptation and the max wait. Defaults to
+                RATE_LIMIT_CONFIG.
+            classify (callable, optional): Maps a url to its endpoint class, or None to leave it unlimited. Defaults to
+                endpoint_class.
+        """
+        self.config = config
+        self.classify = classify
+        self.max_wait = config["max_wait"]
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Get the bucket of the url. None if its host is not limited."""
+        name = self.classify(url)
+        if name is None or name not in self.config:
+            return None
+        key = (urlsplit(url).netloc, name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    limits = self.config[name]
+                    bucket = self._buckets[key] = TokenBucket(limits["rate"], limits["burst"], self.config)
+        return bucket
+
+    def _reserve(self, bucket: TokenBucket, url: str) -> float:
+        wait = bucket.reserve(self.max_wait)
+        if wait is None:
+            raise RateLimitExceeded(f"{urlsplit(url).netloc} is throttled for more than {self.max_wait}s")
+        return wait
+
+    def acquire(self, url: str) -> None:
+        """Block until a request to the url may be sent.
+
+        Raises:
+            RateLimitExceeded: If the request would have to wait longer than max_wait.
+        """
+        bucket = self.bucket(url)
+        if bucket is None:
+            return
+        while True:
+            blocks = bucket.blocks
+            wait = self._reserve(bucket, url)
+            if wait > 0:
+                time.sleep(wait)
+            if bucket.blocks == blocks:
+                return
+
+    async def acquire_async(self, url: str) -> None:
+        """Wait without blocking the event loop until a request to the url may be sent.
+
+        Raises:
+            RateLimitExceeded: If the request would have to wait longer than max_wait.
+        """
+        bucket = self.bucket(url)
+        if bucket is None:
+            return
+        while True:
+            blocks = bucket.blocks
+            wait = self._reserve(bucket, url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if bucket.blocks == blocks:
+                return
+
+    def record(self, url: str, status: int, headers=None) -> None:
+        """Adapt the rate of the url to the status of its response.
+
+        Args:
+            url (str): The url requested.
+            status (int): The HTTP status of the response.
+            headers (dict, optional): The response headers, for Retry-After. Defaults to None.
+        """
+        bucket = self.bucket(url)
+        if bucket is None:
+            return
+        if status == 429 or status >= 500:
+            delay = retry_after(headers)
+            bucket.penalize(status == 429, delay)
+            logging.info(f"{urlsplit(url).netloc} answered {status}, retry after {delay}s, rate {bucket.rate:.2f}/s")
+        elif status < 400:
+            bucket.reward()
+
+    def record_error(self, url: str, error: Exception) -> None:
+        """Adapt the rate to an exception whose message carries the HTTP status, eg: the errors of tradingview_ta."""
+        status = error_status(error)
+        if status is not None:
+            self.record(url, status)
+
+    def call(self, url: str, function, *args, **kwargs):
+        """Call a function sending one request to url, eg: a TradingView analysis, within the limits of the url.
+
+        Returns:
+            The result of the function.
+        """
+        self.acquire(url)
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            self.record_error(url, e)
+            raise
+        self.record(url, 200)
+        return result
+
+    def stats(self) -> dict:
+        """Get the stats of every bucket keyed by "host endpoint_class"."""
+        return {f"{host} {name}": bucket.stats() for (host, name), bucket in list(self._buckets.items())}
+
+
+LIMITER = RateLimiter()
@@ -0,0 +1,238 @@
+"""Retries with jittered exponential backoff and per endpoint circuit breakers around the calls to the exchange and TradingView."""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import rate_limiter
+from constants import LOGFILE, RESILIENCE_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        super().__init__(f"Circuit of {endpoint} is open, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def transient(error: Exception) -> bool:
+    """Check whether an error is a failure of the endpoint rather than of the request.
+
+    Args:
+        error (Exception): The error raised by the call.
+
+    Returns:
+        bool: True for the network errors, timeouts, unparsable bodies and the 5xx, 408 and 429 responses, also when the status is
+            only given in the message of the error, eg: by tradingview_ta. False for the other HTTP errors, eg: a 400 for an unknown
+            pair, and for the other errors.
+    """
+    # The decode errors of json and orjson are ValueErrors: a truncated or HTML error page from a failing endpoint.
+    if isinstance(error, json.JSONDecodeError):
+        return True
+    if isinstance(error, OSError):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        if status is None:
+            return True
+    else:
+        status = rate_limiter.error_status(error)
+        if status is None:
+            return False
+    return status >= 500 or status in (408, 429)
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = RESILIENCE_CONFIG["backoff_base"],
+    maximum: float = RESILIENCE_CONFIG["backoff_max"],
+) -> float:
+    """Get the delay before the retry following a failed attempt, with full jitter.
+
+    Args:
+        attempt (int): The number of the failed attempt, starting at 0.
+        base (float, optional): The delay cap of the first retry in seconds. Defaults to the backoff base of the config file.
+        maximum (float, optional): The largest delay cap in seconds. Defaults to the backoff max of the config file.
+
+    Returns:
+        float: A random delay between 0 and min(maximum, base * 2 ** attempt), so that callers failing together retry apart.
+    """
+    return random.uniform(0.0, min(maximum, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Circuit breaker of one endpoint.
+
+    The circuit opens after failure_threshold consecutive failures and then rejects the calls without making them. After
+    recovery_timeout seconds one probe call is let through: its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = RESILIENCE_CONFIG["failure_threshold"],
+        recovery_timeout: float = RESILIENCE_CONFIG["recovery_timeout"],
+    ) -> None:
+        """Create a closed circuit.
+
+        Args:
+            endpoint (str): The name of the endpoint in the logs.
+            failure_threshold (int, optional): Consecutive failures that open the circuit. Defaults to the config file.
+            recovery_timeout (float, optional): Seconds the circuit stays open before a probe. Defaults to the config file.
+        """
+        self.endpoint = endpoint
+        self.failure_threshold = int(failure_threshold)
+        self.recovery_timeout = float(recovery_timeout)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.transitions = deque(maxlen=100)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0}
+
+    def _transition(self, state: str) -> None:
+        logging.warning(f"Circuit of {self.endpoint}: {self.state} -> {state} after {self.failures} consecutive failures")
+        self.transitions.append({"time": time.time(), "from": self.state, "to": state, "failures": self.failures})
+        self.state = state
+
+    def retry_in(self) -> float:
+        """Get the seconds until an open circuit lets a probe through. 0 if the circuit is not open."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.opened_at + self.recovery_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """Check whether a call may be made now. An open circuit past its recovery timeout lets one probe through."""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() == 0.0:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self.probing):
+                self.probing = self.state == HALF_OPEN
+                self._stats["calls"] += 1
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Close the circuit and reset the failures."""
+        with self._lock:
+            self.failures = 0
+            self.probing = False
+            if self.state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a failure and open the circuit on the threshold or on a failed probe."""
+        with self._lock:
+            self.failures += 1
+            self._stats["failures"] += 1
+            self.probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self._transition(OPEN)
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        """Get the state, consecutive failures, calls, failures, rejected calls and number of transitions of the circuit."""
+        with self._lock:
+            return dict(self._stats, state=self.state, consecutive_failures=self.failures, transitions=len(self.transitions))
+
+
+class ResiliencePolicy:
+    """Retry and circuit breaker policy shared by the calls to every endpoint.
+
+    Only idempotent calls, eg: market data, indicators and balances, are retried. Order creation and the other calls that change the
+    account are made once. Only the transient errors count against the circuit of the endpoint and are retried, the other errors,
+    eg: a symbol TradingView does not know, are raised as they are.
+    """
+
+    def __init__(self, config: dict = RESILIENCE_CONFIG) -> None:
+        """Create the policy. The circuit breaker of an endpoint is created on its first call.
+
+        Args:
+            config (dict, optional): Retries, backoff and circuit breaker settings. Defaults to RESILIENCE_CONFIG.
+        """
+        self.config = config
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get the circuit breaker of an endpoint."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(endpoint)
+                if breaker is None:
+                    breaker = self._breakers[endpoint] = CircuitBreaker(
+                        endpoint, self.config["failure_threshold"], self.config["recovery_timeout"]
+                    )
+        return breaker
+
+    def call(self, endpoint: str, function, *args, idempotent: bool = True, **kwargs):
+        """Call a function that requests an endpoint, retrying it with backoff if it is idempotent.
+
+        Args:
+            endpoint (str): The endpoint, which names its circuit breaker. Eg: URL_DICT["CANDLES_URL"].
+            function (callable): The function.
+            idempotent (bool, optional): Whether the call may be repeated safely. Defaults to True.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            CircuitOpenError: If the circuit of the endpoint is open.
+        """
+        breaker = self.breaker(endpoint)
+        retries = int(self.config["retries"]) if idempotent else 0
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                raise CircuitOpenError(endpoint, breaker.retry_in())
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if not transient(e):
+                    # The endpoint answered, the error is about the request.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt == retries:
+                    raise
+                delay = backoff_delay(attempt, self.config["backoff_base"], self.config["backoff_max"])
+                logging.info(f"Attempt {attempt + 1} of {endpoint} failed: {e}. Retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def retry_in(self, endpoints: list) -> float:
+        """Get the seconds until every open circuit of endpoints lets a probe through."""
+        return max((self.breaker(endpoint).retry_in() for endpoint in endpoints), default=0.0)
+
+    def stats(self) -> dict:
+        """Get the stats of the circuit breaker of every endpoint called."""
+        return {endpoint: breaker.stats() for endpoint, breaker in list(self._breakers.items())}
+
+    def transitions(self) -> list:
+        """Get the recent state transitions of every circuit breaker, oldest first."""
+        events = [
+            {"endpoint": endpoint, **transition}
+            for endpoint, breaker in list(self._breakers.items())
+            for transition in list(breaker.transitions)
+        ]
+        return sorted(events, key=lambda event: event["time"])
+
+
+POLICY = ResiliencePolicy()
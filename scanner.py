@@ -0,0 +1,112 @@
+"""Run per market work of the all coins scans concurrently on a bounded thread pool."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from constants import LOGFILE, SCANNER_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+def _report(description: str, done: int, total: int, errors: int, start: float, progress) -> None:
+    if progress is not None:
+        progress(done, total, errors)
+    step = max(total // 10, 1)
+    if done % step == 0 or done == total:
+        logging.info(f"{description}: {done}/{total} markets in {time.perf_counter() - start:.1f}s, {errors} errors")
+
+
+def map_markets(
+    markets: list,
+    work,
+    workers: int = SCANNER_CONFIG["workers"],
+    description: str = "Scan",
+    progress=None,
+) -> list:
+    """Call work(market) for every market on a pool of workers threads.
+
+    The HTTP calls of the workers go through exchange_client, which caps the requests in flight per host, so the pool size only
+    bounds the number of markets in progress.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        work (callable): Called with a market. Its exceptions are captured per market instead of stopping the scan.
+        workers (int, optional): The number of threads. 1 runs the markets one after the other in the calling thread. Defaults to the
+            scanner workers of the config file.
+        description (str, optional): The name of the scan in the progress logs. Defaults to "Scan".
+        progress (callable, optional): Called with the number of markets done, the total and the number of errors after every
+            market. Defaults to None.
+
+    Returns:
+        list: A (market, result, error) tuple for every market in the order of markets. error is None when work succeeded.
+    """
+    markets = list(markets)
+    total = len(markets)
+    outcomes = [None] * total
+    errors = 0
+    start = time.perf_counter()
+
+    def run(market):
+        try:
+            return work(market), None
+        except Exception as e:
+            logging.info(f"{description} failed for {market}: {e}")
+            return None, f"{type(e).__name__}: {e}"
+
+    if workers <= 1:
+        for index, market in enumerate(markets):
+            result, error = run(market)
+            outcomes[index] = (market, result, error)
+            errors += error is not None
+            _report(description, index + 1, total, errors, start, progress)
+        return outcomes
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scanner") as executor:
+        futures = {executor.submit(run, market): index for index, market in enumerate(markets)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            result, error = future.result()
+            outcomes[index] = (markets[index], result, error)
+            errors += error is not None
+            _report(description, done, total, errors, start, progress)
+    return outcomes
+
+
+def scan(
+    markets: list,
+    work,
+    workers: int = SCANNER_CONFIG["workers"],
+    description: str = "Scan",
+    progress=None,
+    errors: bool = True,
+) -> pd.DataFrame:
+    """Scan markets concurrently and collect the rows returned by work into one dataframe.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        work (callable): Called with a market. Returns a dict row, or None to leave the market out of the dataframe.
+        workers (int, optional): The number of threads. Defaults to the scanner workers of the config file.
+        description (str, optional): The name of the scan in the progress logs. Defaults to "Scan".
+        progress (callable, optional): Called with the number of markets done, the total and the number of errors. Defaults to None.
+        errors (bool, optional): Keep a row with the error of every market whose work raised. Defaults to True.
+
+    Returns:
+        pd.DataFrame: The rows in the order of markets with a market column and an error column.
+    """
+    rows = []
+    for market, result, error in map_markets(markets, work, workers=workers, description=description, progress=progress):
+        if error is not None:
+            if errors:
+                rows.append({"market": market, "error": error})
+        elif result is not None:
+            rows.append({"market": market, **result, "error": None})
+    if not rows:
+        return pd.DataFrame(columns=["market", "error"])
+    dataframe = pd.DataFrame(rows)
+    return dataframe[[column for column in dataframe.columns if column != "error"] + ["error"]]
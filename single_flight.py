@@ -0,0 +1,105 @@
+"""Single flight execution: concurrent calls with the same key share one call of the function."""
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Run a function once per key at a time.
+
+    The first caller of a key runs the function. Callers arriving with the same key while it runs wait for it and get the same result,
+    or the same exception. Once the call returns, the next caller of the key runs the function again.
+    """
+
+    def __init__(self) -> None:
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function, *args, **kwargs):
+        """Run function(*args, **kwargs), or wait for the call already running for key.
+
+        Args:
+            key: A hashable key identifying the call.
+            function (callable): The function to run.
+
+        Returns:
+            The result of the function.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        """Get the number of calls run, the number of callers that shared a running call and the share of the callers coalesced."""
+        with self._lock:
+            return _stats(self.calls, self.shared, len(self._calls))
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of SingleFlight for the coroutines of one event loop.
+
+    The call of a key runs in its own task, so a caller that is cancelled does not cancel the call the other callers wait for.
+    """
+
+    def __init__(self) -> None:
+        self._tasks = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, function, *args, **kwargs):
+        """Await function(*args, **kwargs), or the call already running for key.
+
+        Args:
+            key: A hashable key identifying the call.
+            function (callable): The coroutine function to run.
+
+        Returns:
+            The result of the coroutine.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(function(*args, **kwargs))
+            task.add_done_callback(lambda done: self._tasks.pop(key, None) if self._tasks.get(key) is done else None)
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """Get the number of calls run, the number of callers that shared a running call and the share of the callers coalesced."""
+        return _stats(self.calls, self.shared, len(self._tasks))
+
+
+def _stats(calls: int, shared: int, in_flight: int) -> dict:
+    callers = calls + shared
+    return {"calls": calls, "shared": shared, "in_flight": in_flight, "coalescing_ratio": round(shared / callers, 4) if callers else 0.0}
@@ -0,0 +1,393 @@
+"""Streaming technical indicators updated in constant time and memory per candle.
+
+The indicators are seeded once from historical candles and then updated with every new candle. An update with closed=False
+evaluates the indicators for a tick of the candle still in progress without changing the state, so the bot can read live values at
+tick frequency and commit the candle once it closes. The values match the ones of indicators.compute_indicators on the same candles
+and the state serializes to JSON so that a restart does not need to download the history again.
+"""
+import json
+import math
+from collections import deque
+
+import pandas as pd
+
+import indicators
+
+
+class ExponentialAverage:
+    """Exponentially weighted average seeded with the simple average of the first period values."""
+
+    def __init__(self, period: int, alpha: float = None) -> None:
+        self.period = period
+        self.alpha = 2.0 / (period + 1.0) if alpha is None else alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = None
+
+    def update(self, value: float, commit: bool = True) -> float:
+        """Add a value and get the new average. None until period values were added."""
+        count, total, average = self.count + 1, self.total, self.value
+        if average is not None:
+            average = self.alpha * value + (1.0 - self.alpha) * average
+        else:
+            total += value
+            if count == self.period:
+                average = total / self.period
+        if commit:
+            self.count, self.total, self.value = count, total, average
+        return average
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "alpha": self.alpha, "count": self.count, "total": self.total, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ExponentialAverage":
+        average = cls(state["period"], alpha=state["alpha"])
+        average.count, average.total, average.value = state["count"], state["total"], state["value"]
+        return average
+
+
+class RollingWindow:
+    """The last period values with their running sum and running sum of squares."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.values = deque(maxlen=period)
+        self.total = 0.0
+        self.squares = 0.0
+
+    def _step(self, value: float) -> tuple:
+        dropped = self.values[0] if len(self.values) == self.period else 0.0
+        total = self.total + value - dropped
+        squares = self.squares + value * value - dropped * dropped
+        if not (math.isfinite(total) and math.isfinite(squares)):
+            # A NaN or an infinite value left the window: the running sums are rebuilt from the window instead of staying NaN.
+            window = list(self.values)[len(self.values) == self.period :] + [value]
+            total = sum(window)
+            squares = sum(item * item for item in window)
+        return total, squares
+
+    def update(self, value: float, commit: bool = True) -> tuple:
+        """Add a value and get the running sum and running sum of squares of the window. None until the window is full."""
+        total, squares = self._step(value)
+        full = len(self.values) + 1 >= self.period
+        if commit:
+            self.values.append(value)
+            self.total, self.squares = total, squares
+        return (total, squares) if full else None
+
+    def mean(self, value: float, commit: bool = True) -> float:
+        """Add a value and get the simple average of the window. None until the window is full."""
+        sums = self.update(value, commit=commit)
+        return sums[0] / self.period if sums else None
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "values": list(self.values), "total": self.total, "squares": self.squares}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RollingWindow":
+        window = cls(state["period"])
+        window.values.extend(state["values"])
+        window.total, window.squares = state["total"], state["squares"]
+        return window
+
+
+class StreamingRSI:
+    """Wilder's relative strength index."""
+
+    def __init__(self, period: int = indicators.RSI_PERIOD) -> None:
+        self.period = period
+        self.gain = ExponentialAverage(period, alpha=1.0 / period)
+        self.loss = ExponentialAverage(period, alpha=1.0 / period)
+        self.previous_close = None
+
+    def update(self, close: float, commit: bool = True) -> float:
+        """Add a close and get the RSI. None until period changes were added."""
+        if self.previous_close is None:
+            if commit:
+                self.previous_close = close
+            return None
+        change = close - self.previous_close
+        average_gain = self.gain.update(max(change, 0.0), commit=commit)
+        average_loss = self.loss.update(max(-change, 0.0), commit=commit)
+        if commit:
+            self.previous_close = close
+        if average_gain is None:
+            return None
+        if average_loss == 0.0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+
+    def to_dict(self) -> dict:
+        return {
+            "period": self.period,
+            "gain": self.gain.to_dict(),
+            "loss": self.loss.to_dict(),
+            "previous_close": self.previous_close,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StreamingRSI":
+        rsi = cls(state["period"])
+        rsi.gain = ExponentialAverage.from_dict(state["gain"])
+        rsi.loss = ExponentialAverage.from_dict(state["loss"])
+        rsi.previous_close = state["previous_close"]
+        return rsi
+
+
+class StreamingMACD:
+    """MACD line and signal line."""
+
+    def __init__(self, periods: tuple = indicators.MACD_PERIODS) -> None:
+        self.periods = tuple(periods)
+        fast, slow, signal = self.periods
+        self.fast = ExponentialAverage(fast)
+        self.slow = ExponentialAverage(slow)
+        self.signal = ExponentialAverage(signal)
+
+    def update(self, close: float, commit: bool = True) -> tuple:
+        """Add a close and get the MACD line and the signal line. Each is None until it has enough closes."""
+        fast = self.fast.update(close, commit=commit)
+        slow = self.slow.update(close, commit=commit)
+        if fast is None or slow is None:
+            return None, None
+        macd_line = fast - slow
+        return macd_line, self.signal.update(macd_line, commit=commit)
+
+    def to_dict(self) -> dict:
+        return {
+            "periods": list(self.periods),
+            "fast": self.fast.to_dict(),
+            "slow": self.slow.to_dict(),
+            "signal": self.signal.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StreamingMACD":
+        macd = cls(state["periods"])
+        macd.fast = ExponentialAverage.from_dict(state["fast"])
+        macd.slow = ExponentialAverage.from_dict(state["slow"])
+        macd.signal = ExponentialAverage.from_dict(state["signal"])
+        return macd
+
+
+class StreamingStochastic:
+    """Slow stochastic %K and %D."""
+
+    def __init__(self, periods: tuple = indicators.STOCHASTIC_PERIODS) -> None:
+        self.periods = tuple(periods)
+        period, smooth_k, smooth_d = self.periods
+        self.highs = deque(maxlen=period)
+        self.lows = deque(maxlen=period)
+        self.raw_k = RollingWindow(smooth_k)
+        self.k_line = RollingWindow(smooth_d)
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> tuple:
+        """Add a candle and get %K and %D. Each is None until it has enough candles."""
+        period = self.periods[0]
+        highs = list(self.highs)[len(self.highs) == period :] + [high]
+        lows = list(self.lows)[len(self.lows) == period :] + [low]
+        if commit:
+            self.highs.append(high)
+            self.lows.append(low)
+        if len(highs) < period:
+            return None, None
+        highest, lowest = max(highs), min(lows)
+        raw_k = 100.0 * (close - lowest) / (highest - lowest) if highest != lowest else math.nan
+        k_value = self.raw_k.mean(raw_k, commit=commit)
+        if k_value is None:
+            return None, None
+        return k_value, self.k_line.mean(k_value, commit=commit)
+
+    def to_dict(self) -> dict:
+        return {
+            "periods": list(self.periods),
+            "highs": list(self.highs),
+            "lows": list(self.lows),
+            "raw_k": self.raw_k.to_dict(),
+            "k_line": self.k_line.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StreamingStochastic":
+        stochastic = cls(state["periods"])
+        stochastic.highs.extend(state["highs"])
+        stochastic.lows.extend(state["lows"])
+        stochastic.raw_k = RollingWindow.from_dict(state["raw_k"])
+        stochastic.k_line = RollingWindow.from_dict(state["k_line"])
+        return stochastic
+
+
+class StreamingBollinger:
+    """Bollinger bands from the running sum and running sum of squares of the closes. The standard deviation is the population one."""
+
+    def __init__(self, period: int = indicators.BOLLINGER_PERIOD, deviations: float = indicators.BOLLINGER_DEVIATIONS) -> None:
+        self.period = period
+        self.deviations = deviations
+        self.window = RollingWindow(period)
+
+    def update(self, close: float, commit: bool = True) -> tuple:
+        """Add a close and get the upper band, the basis and the lower band. None until period closes were added."""
+        sums = self.window.update(close, commit=commit)
+        if sums is None:
+            return None, None, None
+        basis = sums[0] / self.period
+        deviation = math.sqrt(max(sums[1] / self.period - basis * basis, 0.0))
+        return basis + self.deviations * deviation, basis, basis - self.deviations * deviation
+
+    def to_dict(self) -> dict:
+        return {"period": self.period, "deviations": self.deviations, "window": self.window.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StreamingBollinger":
+        bollinger = cls(state["period"], state["deviations"])
+        bollinger.window = RollingWindow.from_dict(state["window"])
+        return bollinger
+
+
+def _milliseconds(value) -> int:
+    """Convert a candle time (milliseconds or a timestamp) to milliseconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def _value(value) -> float:
+    return math.nan if value is None else value
+
+
+class IndicatorState:
+    """The streaming indicators of one market and interval, with the keys of the Trading View analysis."""
+
+    def __init__(self, market: str = "", interval: str = "4h") -> None:
+        self.market = market
+        self.interval = interval
+        self.rsi = StreamingRSI()
+        self.emas = {period: ExponentialAverage(period) for period in indicators.EMA_PERIODS}
+        self.smas = {period: RollingWindow(period) for period in indicators.SMA_PERIODS}
+        self.macd = StreamingMACD()
+        self.stochastic = StreamingStochastic()
+        self.bollinger = StreamingBollinger()
+        self.pivots = {}
+        self.last_rsi = None
+        self.last_time = None
+        self.candles = 0
+
+    def update(self, candle: dict, closed: bool = True) -> dict:
+        """Update the indicators with a candle.
+
+        Args:
+            candle (dict): The candle with the open, high, low, close and optionally time keys. A row of get_candles works.
+            closed (bool, optional): Whether the candle is closed. A candle still in progress is evaluated without changing the state.
+                Defaults to True.
+
+        Returns:
+            dict: The indicator data with the same keys as indicators.compute_indicators.
+        """
+        open_price, high, low, close = (float(candle[key]) for key in ("open", "high", "low", "close"))
+        rsi = self.rsi.update(close, commit=closed)
+        result = {
+            "open": open_price,
+            "high": high,
+            "low": low,
+            "close": close,
+            "RSI": _value(rsi),
+            "RSI[1]": _value(self.last_rsi),
+        }
+        for period, average in self.emas.items():
+            result[f"EMA{period}"] = _value(average.update(close, commit=closed))
+        for period, window in self.smas.items():
+            result[f"SMA{period}"] = _value(window.mean(close, commit=closed))
+        result["MACD.macd"], result["MACD.signal"] = map(_value, self.macd.update(close, commit=closed))
+        result["Stoch.K"], result["Stoch.D"] = map(_value, self.stochastic.update(high, low, close, commit=closed))
+        upper, _, lower = self.bollinger.update(close, commit=closed)
+        result["BB.upper"], result["BB.lower"] = _value(upper), _value(lower)
+        result.update(self.pivots)
+        if closed:
+            self.last_rsi = rsi
+            self.last_time = _milliseconds(candle.get("time", self.last_time))
+            self.candles += 1
+        return result
+
+    def seed(self, candles: pd.DataFrame, pivot_candles: pd.DataFrame = None) -> dict:
+        """Seed the indicators from closed historical candles.
+
+        Args:
+            candles (pd.DataFrame): The closed candles as returned by get_candles, in any order.
+            pivot_candles (pd.DataFrame, optional): The monthly candles for the Fibonacci pivots. Defaults to None.
+
+        Returns:
+            dict: The indicator data after the last candle. None if there are no candles.
+        """
+        if pivot_candles is not None and not pivot_candles.empty:
+            self.set_pivots(pivot_candles)
+        result = None
+        for candle in indicators._sorted_candles(candles).to_dict("records"):
+            result = self.update(candle)
+        return result
+
+    def set_pivots(self, pivot_candles: pd.DataFrame) -> None:
+        """Set the Fibonacci pivots from the monthly candles. The pivots change once a month and are not streamed."""
+        high, low, close = indicators._previous_period(pivot_candles)
+        self.pivots = {key: float(value) for key, value in indicators.fibonacci_pivots(high, low, close).items()}
+
+    def to_dict(self) -> dict:
+        return {
+            "market": self.market,
+            "interval": self.interval,
+            "rsi": self.rsi.to_dict(),
+            "emas": {str(period): average.to_dict() for period, average in self.emas.items()},
+            "smas": {str(period): window.to_dict() for period, window in self.smas.items()},
+            "macd": self.macd.to_dict(),
+            "stochastic": self.stochastic.to_dict(),
+            "bollinger": self.bollinger.to_dict(),
+            "pivots": self.pivots,
+            "last_rsi": self.last_rsi,
+            "last_time": self.last_time,
+            "candles": self.candles,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "IndicatorState":
+        indicator_state = cls(state["market"], state["interval"])
+        indicator_state.rsi = StreamingRSI.from_dict(state["rsi"])
+        indicator_state.emas = {int(period): ExponentialAverage.from_dict(average) for period, average in state["emas"].items()}
+        indicator_state.smas = {int(period): RollingWindow.from_dict(window) for period, window in state["smas"].items()}
+        indicator_state.macd = StreamingMACD.from_dict(state["macd"])
+        indicator_state.stochastic = StreamingStochastic.from_dict(state["stochastic"])
+        indicator_state.bollinger = StreamingBollinger.from_dict(state["bollinger"])
+        indicator_state.pivots = state["pivots"]
+        indicator_state.last_rsi = state["last_rsi"]
+        indicator_state.last_time = state["last_time"]
+        indicator_state.candles = state["candles"]
+        return indicator_state
+
+
+def save_states(states: dict, path: str) -> None:
+    """Save the indicator states of many markets to a JSON file.
+
+    Args:
+        states (dict): The IndicatorState of every market keyed by market.
+        path (str): The path of the JSON file.
+    """
+    with open(path, "w") as file:
+        json.dump({market: state.to_dict() for market, state in states.items()}, file)
+
+
+def load_states(path: str) -> dict:
+    """Load the indicator states saved with save_states.
+
+    Args:
+        path (str): The path of the JSON file.
+
+    Returns:
+        dict: The IndicatorState of every market keyed by market. Empty if the file does not exist.
+    """
+    try:
+        with open(path) as file:
+            states = json.load(file)
+    except FileNotFoundError:
+        return {}
+    return {market: IndicatorState.from_dict(state) for market, state in states.items()}
@@ -0,0 +1,5 @@
+"""The modules of the bot live in the root of the repository, next to this directory."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicators
+
+
+def _candles(length: int, seed: int = 0) -> pd.DataFrame:
+    close = 100.0 + np.cumsum(np.random.default_rng(seed).normal(0.0, 1.0, length))[::-1]
+    # Latest candle first, as returned by the exchange.
+    return pd.DataFrame(
+        {
+            "time": np.arange(length)[::-1],
+            "open": close,
+            "high": close + 1.0,
+            "low": close - 1.0,
+            "close": close,
+        }
+    )
+
+
+def test_compute_indicators_many_keeps_long_histories_with_a_short_market():
+    candles = {
+        "LONGUSDT": _candles(300, seed=1),
+        "SHORTUSDT": _candles(8, seed=2),
+        "OTHERUSDT": _candles(300, seed=3),
+    }
+
+    result = indicators.compute_indicators_many(candles)
+
+    assert list(result.index) == ["LONGUSDT", "SHORTUSDT", "OTHERUSDT"]
+    for market in ("LONGUSDT", "OTHERUSDT"):
+        expected = indicators.compute_indicators(candles[market])
+        assert result.loc[market, "RSI"] == pytest.approx(expected["RSI"])
+        assert result.loc[market, "EMA200"] == pytest.approx(expected["EMA200"])
+        assert not np.isnan(result.loc[market, "EMA200"])
+    assert np.isnan(result.loc["SHORTUSDT", "RSI"])
+    assert result.loc["SHORTUSDT", "close"] == candles["SHORTUSDT"]["close"].iloc[0]
+
+
+def test_compute_indicators_many_matches_single_market_pivots_per_group():
+    candles = {"AUSDT": _candles(50, seed=4), "BUSDT": _candles(30, seed=5)}
+    pivots = {"AUSDT": _candles(3, seed=6), "BUSDT": _candles(3, seed=7)}
+
+    result = indicators.compute_indicators_many(candles, pivot_candles=pivots)
+
+    for market in candles:
+        expected = indicators.compute_indicators(candles[market], pivot_candles=pivots[market])
+        pivot = "Pivot.M.Fibonacci.R1"
+        assert result.loc[market, pivot] == pytest.approx(expected[pivot])
+        assert result.loc[market, "SMA20"] == pytest.approx(expected["SMA20"])
+
+
+def test_ohlc_matrix_rejects_mixed_lengths():
+    with pytest.raises(ValueError):
+        indicators.ohlc_matrix([_candles(10), _candles(20)])
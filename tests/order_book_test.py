@@ -0,0 +1,74 @@
+import pytest
+
+import order_book
+
+
+class FakeAccount:
+    """The active orders endpoint of an account, one market per request."""
+
+    def __init__(self, orders: list) -> None:
+        self.orders = orders
+        self.markets = []
+        self.response = None
+
+    def active_orders(self, market: str = "", side: str = ""):
+        self.markets.append(market)
+        if self.response is not None:
+            return self.response
+        return {"orders": [order for order in self.orders if order["market"] == market]}
+
+
+def _order(order_id: str, market: str = "BTCUSDT", side: str = "buy", price: float = 1.0) -> dict:
+    return {"id": order_id, "market": market, "side": side, "status": "open", "price_per_unit": price}
+
+
+def _book(account: FakeAccount, markets: list = None) -> order_book.OrderBook:
+    config = {"reconcile_interval": 30.0, "markets": markets or []}
+    return order_book.OrderBook("test", config, account=lambda username: account)
+
+
+def test_reconcile_reports_drift_per_market():
+    account = FakeAccount([_order("a"), _order("b", side="sell"), _order("c", market="ETHUSDT")])
+    book = _book(account, markets=["BTCUSDT", "ETHUSDT"])
+
+    drift = book.reconcile()
+
+    assert sorted(drift["added"]) == ["a", "b", "c"]
+    assert [order["id"] for order in book.open_orders("BTCUSDT", "sell")] == ["b"]
+    account.orders = [_order("a", price=2.0), _order("c", market="ETHUSDT")]
+    drift = book.reconcile()
+    assert (drift["added"], drift["removed"], drift["changed"]) == ([], ["b"], ["a"])
+    assert book.get("a")["price_per_unit"] == 2.0
+
+
+def test_reconcile_keeps_the_book_on_a_rejected_listing():
+    account = FakeAccount([_order("a")])
+    book = _book(account, markets=["BTCUSDT"])
+    book.reconcile()
+    account.response = {"code": 422, "message": "Invalid market", "status": "error"}
+
+    with pytest.raises(Exception, match="No listing"):
+        book.reconcile()
+
+    assert book.get("a") is not None
+    assert book.stats()["removed"] == 0
+
+
+def test_reconcile_lists_the_markets_of_the_book_without_a_market_less_request():
+    account = FakeAccount([_order("a", market="XRPUSDT")])
+    book = _book(account)
+    book.apply("create", {}, {"orders": [_order("a", market="XRPUSDT")]})
+
+    book.reconcile()
+
+    assert account.markets == ["XRPUSDT"]
+    assert "" not in account.markets
+
+
+def test_apply_ignores_rejected_responses_and_removes_cancelled_orders():
+    book = _book(FakeAccount([]))
+    book.apply("create", {}, {"orders": [_order("a"), _order("b")]})
+    book.apply("cancel", {"id": "a"}, {"code": 422, "status": "error"})
+    book.apply("cancel", {"id": "b"}, {"code": 200})
+
+    assert [order["id"] for order in book.open_orders()] == ["a"]
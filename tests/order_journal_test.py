@@ -0,0 +1,38 @@
+import csv
+
+import order_journal
+
+
+def _config(**config):
+    return {**order_journal.ORDER_JOURNAL_CONFIG, "fsync": "never", **config}
+
+
+def _events(path):
+    with open(path, newline="") as file:
+        return [row["event"] for row in csv.DictReader(file)]
+
+
+def test_bots_sharing_the_journal_follow_its_rotation(tmp_path):
+    path = str(tmp_path / "orders.csv")
+    first = order_journal.OrderJournal(path, _config(max_bytes=400, backups=2))
+    second = order_journal.OrderJournal(path, _config(max_bytes=400, backups=2))
+    order = {"id": "1", "market": "BTCINR", "total_quantity": 1, "side": "buy", "price_per_unit": 100}
+    first.record("first", "create", order)
+    assert first.flush(5)
+    second.record("second", "create", order)
+    assert second.flush(5)
+    # Only the long record of the first bot overflows the file, the short one of the second would still fit in the backup.
+    first.record("first", "cancel", {**order, "client_order_id": "x" * 200})
+    assert first.flush(5)
+    assert first.stats()["rotations"] == 1
+    second.record("second", "edit_price", order)
+    assert second.flush(5)
+    assert "edit_price" in _events(path)
+    assert "edit_price" not in _events(f"{path}.1")
+
+
+def test_flush_reports_a_failed_write(tmp_path):
+    journal = order_journal.OrderJournal(str(tmp_path / "missing" / "orders.csv"), _config())
+    journal.record("user", "create", {"id": "1"})
+    assert not journal.flush(5)
+    assert journal.stats()["dropped"] == 1
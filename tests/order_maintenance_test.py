@@ -0,0 +1,39 @@
+import order_maintenance
+
+
+class Account:
+    def edit_price(self, order_id, price):
+        return {"status": "success"}
+
+    def cancel_multiple_by_ids(self, ids):
+        return {"message": "cancelled"}
+
+
+class Journal:
+    def __init__(self):
+        self.journaled = []
+
+    def record_response(self, username, event, body, data):
+        self.journaled.append((event, body))
+
+
+def test_reprice_ladder_journals_edits_and_cancels_but_not_unchanged_orders():
+    orders = [
+        {"id": "a", "market": "BTCUSDT", "side": "buy", "price_per_unit": 10.0},
+        {"id": "b", "market": "BTCUSDT", "side": "buy", "price_per_unit": 9.0},
+        {"id": "c", "market": "BTCUSDT", "side": "buy", "price_per_unit": 8.0},
+    ]
+    journal = Journal()
+    engine = order_maintenance.OrderMaintenance(account=lambda username: Account(), journal=journal)
+    results = engine.reprice_ladder("test", "BTCUSDT", "buy", [10.0, 9.5], orders=orders)
+    assert results == {"a": orders[0], "b": {"status": "success"}, "c": {"message": "cancelled"}}
+    assert journal.journaled == [("cancel_by_ids", {"ids": ["c"]}), ("edit_price", {"id": "b", "price_per_unit": 9.5})]
+
+
+def test_cancels_are_journaled_per_request():
+    journal = Journal()
+    engine = order_maintenance.OrderMaintenance(
+        config={"max_ids": 2, "workers": 2}, account=lambda username: Account(), journal=journal
+    )
+    engine.cancel("test", ["1", "2", "3"])
+    assert journal.journaled == [("cancel_by_ids", {"ids": ["1", "2"]}), ("cancel_by_ids", {"ids": ["3"]})]
@@ -0,0 +1,57 @@
+import pytest
+
+import order_tracker
+
+
+class FakeAccount:
+    def __init__(self, count: int, statuses: list, listing=None) -> None:
+        self.count = count
+        self.statuses = statuses
+        self.listing = listing
+        self.requested = []
+        self.listed_markets = []
+
+    def active_orders_count(self, market: str = "", side: str = "") -> int:
+        return self.count
+
+    def order_statuses(self, ids: list) -> list:
+        self.requested.append(list(ids))
+        return [order for order in self.statuses if order["id"] in ids]
+
+    def active_orders(self, market: str = "", side: str = ""):
+        self.listed_markets.append(market)
+        return self.listing
+
+
+def _tracker(account: FakeAccount, max_misses: int = 2) -> order_tracker.OrderTracker:
+    config = {"interval": 1.0, "batch": 50, "full_poll_every": 1, "max_misses": max_misses, "markets": []}
+    return order_tracker.OrderTracker("test", config, account=lambda username: account)
+
+
+def test_orders_missing_from_the_status_responses_expire():
+    account = FakeAccount(2, [{"id": "live", "market": "BTCUSDT", "status": "open"}])
+    tracker = _tracker(account)
+    tracker.track({"id": "live", "market": "BTCUSDT", "status": "open"})
+    tracker.track({"id": "purged", "market": "BTCUSDT", "status": "open"})
+    account.count = 1
+
+    tracker.poll()
+    assert "purged" in tracker.open_orders()
+    tracker.poll()
+
+    assert list(tracker.open_orders()) == ["live"]
+    assert tracker.stats()["expired"] == 1
+    tracker.poll()
+    assert account.requested[-1] == ["live"]
+
+
+def test_rejected_listing_is_not_read_as_empty():
+    account = FakeAccount(3, [], listing={"code": 422, "message": "Invalid market", "status": "error"})
+    tracker = _tracker(account)
+    tracker.track({"id": "a", "market": "BTCUSDT", "status": "open"})
+
+    with pytest.raises(Exception, match="No listing"):
+        tracker.poll()
+
+    assert account.listed_markets == ["BTCUSDT"]
+    assert "a" in tracker.open_orders()
@@ -0,0 +1,12 @@
+import rate_limiter
+from constants import URL_DICT
+
+
+def test_endpoint_class_by_signature():
+    assert rate_limiter.endpoint_class(URL_DICT["NEW_ORDER_URL"]) == "private"
+    assert rate_limiter.endpoint_class(URL_DICT["ACCOUNT_BALANCE_URL"]) == "private"
+    assert rate_limiter.endpoint_class(URL_DICT["MARKET_DETAILS_URL"]) == "public"
+    assert rate_limiter.endpoint_class(URL_DICT["MARKET_DATA_URL"]) == "public"
+    assert rate_limiter.endpoint_class(URL_DICT["CANDLES_URL"]) == "public"
+    assert rate_limiter.endpoint_class(rate_limiter.TRADINGVIEW_URL) == "tradingview"
+    assert rate_limiter.endpoint_class("https://example.com/") is None
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+import requests
+
+import exchange_client
+import resilience
+import ticker_decoder
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+def test_transient_errors():
+    assert resilience.transient(requests.ConnectionError())
+    assert resilience.transient(_http_error(503))
+    assert resilience.transient(_http_error(429))
+    assert not resilience.transient(_http_error(400))
+    assert not resilience.transient(KeyError("RSI"))
+
+
+def test_unparsable_bodies_are_transient():
+    for loads in (json.loads, ticker_decoder.loads):
+        with pytest.raises(ValueError) as error:
+            loads(b"<html>502 Bad Gateway</html>")
+        assert resilience.transient(error.value)
+    assert not resilience.transient(ValueError("could not convert string to float"))
+
+
+def test_policy_calls_are_not_retried_by_the_transport():
+    client = exchange_client.ExchangeClient()
+    url = "https://public.coindcx.com/market_data/candles"
+    assert client.session(url).get_adapter(url).max_retries.total == int(client.config["retries"])
+    assert client.session(url, retry=False).get_adapter(url).max_retries.total == 0
+
+
+def test_policy_sends_a_failing_call_retries_plus_one_times():
+    policy = resilience.ResiliencePolicy({**resilience.RESILIENCE_CONFIG, "backoff_base": 0.0, "failure_threshold": 10})
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise _http_error(503)
+
+    with pytest.raises(requests.HTTPError):
+        policy.call("endpoint", fail)
+    assert len(calls) == policy.config["retries"] + 1
+    assert policy.breaker("endpoint").failures == len(calls)
+
+
+def test_status_errors_of_tradingview_are_transient():
+    assert resilience.transient(Exception("Can't access TradingView's API. HTTP status code: 429. Check for invalid symbol"))
+    assert resilience.transient(Exception("Can't access TradingView's API. HTTP status code: 502."))
+    assert not resilience.transient(Exception("Can't access TradingView's API. HTTP status code: 400."))
+    assert not resilience.transient(Exception("Exchange or symbol not found."))
+
+
+def test_throttled_tradingview_calls_count_against_the_breaker():
+    policy = resilience.ResiliencePolicy({**resilience.RESILIENCE_CONFIG, "backoff_base": 0.0, "failure_threshold": 10})
+
+    def throttled():
+        raise Exception("Can't access TradingView's API. HTTP status code: 429.")
+
+    with pytest.raises(Exception, match="429"):
+        policy.call("tradingview", throttled)
+    assert policy.breaker("tradingview").failures == policy.config["retries"] + 1
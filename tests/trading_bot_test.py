@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+import trading_bot
+
+TICKER = {
+    "BTCUSDT": {"last_price": "100.0"},
+    "ETHUSDC": {"last_price": "10.0"},
+    "USDTINR": {"last_price": "90.0"},
+}
+MARKETS_DETAILS = pd.DataFrame(
+    [
+        {"coindcx_name": "BTCUSDT", "max_leverage": 5},
+        {"coindcx_name": "ETHUSDT", "max_leverage": 3},
+    ]
+)
+
+
+def _balances(rows: list) -> pd.DataFrame:
+    return pd.DataFrame([{"currency": currency, "balance": balance, "locked_balance": "0.0"} for currency, balance in rows])
+
+
+def test_value_balances_prices_in_usdt_then_usdc():
+    dataframe = trading_bot.value_balances(_balances([("BTC", "2.0"), ("ETH", "3.0")]), TICKER, MARKETS_DETAILS)
+    assert dataframe.set_index("market")["balance"].to_dict() == {"BTCUSDT": 200.0, "ETHUSDT": 30.0}
+    assert dataframe.set_index("market")["max_leverage"].to_dict() == {"BTCUSDT": 5, "ETHUSDT": 3}
+
+
+def test_value_balances_drops_coins_without_a_price_or_a_usdt_market():
+    dataframe = trading_bot.value_balances(
+        _balances([("BTC", "2.0"), ("INR", "5000.0"), ("USDT", "50.0"), ("XYZ", "7.0")]), TICKER, MARKETS_DETAILS
+    )
+    assert list(dataframe["market"]) == ["BTCUSDT"]
+    assert not dataframe["max_leverage"].isna().any()
+
+
+def test_bot_trader_inputs_raises_the_errors_that_are_not_failures_of_an_endpoint(monkeypatch):
+    monkeypatch.setattr(trading_bot, "get_candles", lambda coin_1, coin_2: pd.DataFrame())
+    monkeypatch.setattr(trading_bot, "get_indicator_data", lambda **kwargs: {"RSI": 50.0})
+
+    def get_account_balance(username):
+        raise KeyError("balance")
+
+    monkeypatch.setattr(trading_bot, "get_account_balance", get_account_balance)
+    monkeypatch.setattr(trading_bot.time, "sleep", lambda seconds: pytest.fail("waited on a non transient error"))
+    with pytest.raises(KeyError):
+        trading_bot._bot_trader_inputs("test", "BTC", "USDT", "Binance", "Crypto", "4h", "close", {})
+
+
+def _tradingview(monkeypatch, tmp_path, error: Exception):
+    resolutions = trading_bot.exchange_resolution.ExchangeResolutionCache(str(tmp_path / "resolutions.json"))
+    resolutions.record("NEWUSDT", "Crypto", "Binance")
+    policy = trading_bot.resilience.ResiliencePolicy({**trading_bot.RESILIENCE_CONFIG, "retries": 0})
+
+    class Handler:
+        def __init__(self, **kwargs):
+            pass
+
+        def get_analysis(self):
+            raise error
+
+    monkeypatch.setattr(trading_bot.exchange_resolution, "RESOLUTIONS", resolutions)
+    monkeypatch.setattr(trading_bot.exchange_resolution, "exchange_chain", lambda symbol, market: ["Binance", "GateIO"])
+    monkeypatch.setattr(trading_bot.resilience, "POLICY", policy)
+    monkeypatch.setattr(trading_bot, "TA_Handler", Handler)
+    assert trading_bot.get_tradingview_indicator_data("NEW", "USDT") is None
+    return resolutions
+
+
+def test_throttled_tradingview_keeps_the_learned_exchange(monkeypatch, tmp_path):
+    resolutions = _tradingview(monkeypatch, tmp_path, Exception("Can't access TradingView's API. HTTP status code: 429."))
+    assert resolutions.lookup("NEWUSDT", "Crypto") == (False, "Binance")
+
+
+def test_unlisted_symbol_is_negative_cached(monkeypatch, tmp_path):
+    resolutions = _tradingview(monkeypatch, tmp_path, Exception("Exchange or symbol not found."))
+    assert resolutions.lookup("NEWUSDT", "Crypto") == (True, None)
+
+
+def test_market_indicator_of_all_coins_scans_the_markets_of_the_ticker(monkeypatch):
+    scanned = []
+    monkeypatch.setattr(trading_bot.os.path, "exists", lambda path: False)
+    monkeypatch.setattr(
+        trading_bot.exchange_client,
+        "get_json",
+        lambda url: [{"market": "BTCUSDT", "last_price": "100.0"}, {"market": "ETHUSDT", "last_price": "10.0"}],
+    )
+    monkeypatch.setattr(trading_bot, "get_market_indicators", lambda markets, **kwargs: pd.DataFrame(index=markets))
+    monkeypatch.setattr(
+        trading_bot.scanner, "scan", lambda markets, function, **kwargs: scanned.extend(markets) or pd.DataFrame(index=markets)
+    )
+    dataframe = trading_bot.get_market_indicator(all_coins=True)
+    assert scanned == ["BTCUSDT", "ETHUSDT"]
+    assert list(dataframe.index) == ["BTCUSDT", "ETHUSDT"]
@@ -0,0 +1,78 @@
+"""Decoding of the ticker payload of the exchange into typed columns.
+
+The payload is parsed once, with orjson when it is installed, and every field is converted in one pass into a NumPy column: float64
+prices and volumes, int64 timestamps and a categorical market. The dataframe is built from the columns, never from a dict per market.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FLOAT_COLUMNS = ("change_24_hour", "high", "low", "volume", "last_price", "bid", "ask")
+INT_COLUMNS = ("timestamp",)
+
+
+def loads(content):
+    """Parse a JSON body, with orjson if it is installed.
+
+    Args:
+        content (bytes | str): The JSON body. Eg: response.content.
+
+    Returns:
+        The parsed body.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _floats(values: list) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Empty strings and other unparsable prices become NaN.
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _ints(values: list):
+    try:
+        return np.array(values, dtype=np.int64)
+    except (TypeError, ValueError):
+        return pd.array(pd.to_numeric(pd.Series(values, dtype=object), errors="coerce"), dtype="Int64")
+
+
+def decode(rows: list, float_columns: tuple = FLOAT_COLUMNS, int_columns: tuple = INT_COLUMNS) -> pd.DataFrame:
+    """Convert the parsed ticker of every market into a dataframe of typed columns.
+
+    Args:
+        rows (list): The parsed ticker payload, one dict per market.
+        float_columns (tuple, optional): The fields converted to float64, NaN where missing. Defaults to FLOAT_COLUMNS.
+        int_columns (tuple, optional): The fields converted to int64, or to the nullable Int64 if some are missing. Defaults to
+            INT_COLUMNS.
+
+    Returns:
+        pd.DataFrame: A categorical market column followed by the float and int columns, in the order of rows.
+    """
+    columns = {"market": pd.Categorical([row.get("market") for row in rows])}
+    for name in float_columns:
+        columns[name] = _floats([row.get(name) for row in rows])
+    for name in int_columns:
+        columns[name] = _ints([row.get(name) for row in rows])
+    return pd.DataFrame(columns, copy=False)
+
+
+def decode_ticker(content) -> pd.DataFrame:
+    """Parse and decode a ticker body.
+
+    Args:
+        content (bytes | str): The body of the ticker endpoint.
+
+    Returns:
+        pd.DataFrame: The ticker of every market. See decode.
+    """
+    return decode(loads(content))
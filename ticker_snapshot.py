@@ -0,0 +1,111 @@
+"""TTL cached snapshot of the exchange ticker indexed by market."""
+import logging
+import threading
+import time
+
+import pandas as pd
+
+import exchange_client
+import ticker_decoder
+from constants import CACHE_CONFIG, LOGFILE, URL_DICT
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+class TickerSnapshot:
+    """One download of the ticker payload held for a configurable time to live.
+
+    The payload is stored as a dictionary keyed by market so that looking up a single market is O(1). A scan over N coins therefore
+    makes a single ticker request instead of N.
+    """
+
+    def __init__(self, url: str = URL_DICT["TICKER_URL"], ttl: float = CACHE_CONFIG["ticker_ttl"]) -> None:
+        """Create an empty snapshot. The ticker is downloaded on the first lookup.
+
+        Args:
+            url (str, optional): The ticker url. Defaults to URL_DICT["TICKER_URL"].
+            ttl (float, optional): Seconds after which the snapshot is downloaded again. Defaults to CACHE_CONFIG["ticker_ttl"].
+        """
+        self.url = url
+        self.ttl = float(ttl)
+        self._markets = {}
+        self._dataframe = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def age(self) -> float:
+        """Get the age of the snapshot in seconds. Infinite if the ticker was never downloaded."""
+        if self._fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self._fetched_at
+
+    def refresh(self) -> dict:
+        """Download the ticker now and replace the snapshot.
+
+        Returns:
+            dict: The ticker of every market keyed by market.
+        """
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> dict:
+        markets = {coins["market"]: coins for coins in exchange_client.get_json(self.url)}
+        self._markets = markets
+        self._dataframe = None
+        self._fetched_at = time.monotonic()
+        logging.info(f"Ticker snapshot refreshed with {len(markets)} markets")
+        return markets
+
+    def markets(self, max_age: float = None) -> dict:
+        """Get the ticker of every market, downloading it again only if the snapshot is older than max_age.
+
+        Args:
+            max_age (float, optional): Maximum accepted age of the snapshot in seconds. Defaults to the ttl of the snapshot.
+
+        Returns:
+            dict: The ticker of every market keyed by market.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        if self.age() > max_age:
+            with self._lock:
+                # Another thread may have refreshed the snapshot while this one waited for the lock.
+                if self.age() > max_age:
+                    return self._refresh()
+        return self._markets
+
+    def dataframe(self, max_age: float = None) -> pd.DataFrame:
+        """Get the ticker of every market as typed columns, decoded once per snapshot.
+
+        Args:
+            max_age (float, optional): Maximum accepted age of the snapshot in seconds. Defaults to the ttl of the snapshot.
+
+        Returns:
+            pd.DataFrame: A copy of the decoded ticker. See ticker_decoder.decode.
+        """
+        markets = self.markets(max_age=max_age)
+        dataframe = self._dataframe
+        if dataframe is None or self._markets is not markets:
+            dataframe = ticker_decoder.decode(list(markets.values()))
+            if self._markets is markets:
+                self._dataframe = dataframe
+        return dataframe.copy()
+
+    def get(self, market: str, max_age: float = None) -> dict:
+        """Get the ticker of a single market.
+
+        Args:
+            market (str): The market. Eg: BTCUSDT.
+            max_age (float, optional): Maximum accepted age of the snapshot in seconds. Defaults to the ttl of the snapshot.
+
+        Returns:
+            dict: The ticker of the market. None if the market is not listed.
+        """
+        return self.markets(max_age=max_age).get(market)
+
+
+TICKER = TickerSnapshot()
@@ -1,21 +1,37 @@
 """A crypto trading bot to place buy and sell orders automatically"""
 import argparse
-import csv
-import hashlib
-import hmac
 import json
 import logging
 import os
 import smtplib
 import time
 from datetime import datetime, timedelta
+from functools import partial
 import pandas as pd
-import requests
 import yaml
 from matplotlib import pyplot
 from tradingview_ta import TA_Handler
+import account_client
+import async_exchange_client
+import candle_cache
 import constants
+import exchange_client
+import exchange_resolution
+import indicators
+import market_registry
+import order_book
+import order_gateway
+import order_journal
+import order_maintenance
+import order_tracker
+import rate_limiter
+import resilience
+import scanner
+import streaming_indicators
+import ticker_decoder
+import ticker_snapshot
 import trading_bot_auth
+import tradingview_batch
 from paths import paths
 
 # TODO: Encrypt regardless of where the keys are coming from.
@@ -31,6 +47,9 @@ API_DICTS = constants.API_DICTS
 INTERVAL_DICT = constants.INTERVAL_DICT
 URL_DICT = constants.URL_DICT
 REMOVE_CURRENCIES = constants.REMOVE_CURRENCIES
+INDICATOR_CONFIG = constants.INDICATOR_CONFIG
+SCANNER_CONFIG = constants.SCANNER_CONFIG
+RESILIENCE_CONFIG = constants.RESILIENCE_CONFIG
 
 
 with open(constants.CONFIG_FILE) as file:
@@ -87,6 +106,19 @@ def get_keys(first_name: str = "", last_name: str = "", username: str = "") -> t
     )
 
 
+def preload_keys(usernames: list = None, source: str = "database") -> dict:
+    """Load the keys of many usernames at once before a multi-account run.
+
+    Args:
+        usernames (list, optional): The usernames to load. Defaults to None to load every username.
+        source (str, optional): Either "database" or "config_file". Defaults to "database".
+
+    Returns:
+        dict: The source used, the number of usernames loaded and the seconds taken.
+    """
+    return trading_bot_auth.preload_credentials(usernames=usernames, source=source)
+
+
 def add_keys(
     username: str = "",
     first_name: str = "",
@@ -168,32 +200,33 @@ def delete_keys(first_name: str, last_name: str, username: str) -> dict:
     )
 
 
-def get_ticker(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False) -> pd.DataFrame:
-    """Get the ticker details of the coin
+def get_ticker(
+    coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False, max_age: float = None
+) -> pd.DataFrame:
+    """Get the ticker details of the coin. The ticker is served from a snapshot that is downloaded at most once per ttl.
 
     Args:
         coin_1 (str, optional): The coin to get the ticker details of. Defaults to "BTC".
         coin_2 (str, optional): The coin against which to get the ticker details of. Defaults to "USDT".
         all_coins (bool, optional): Whether to get the ticker details of all the coins. Defaults to False.
+        max_age (float, optional): Maximum accepted age of the ticker snapshot in seconds. Pass 0 to force a fresh download. Defaults to the configured ticker ttl.
 
     Returns:
         dict: The dictionary of the coins details
     """
-    url = URL_DICT["TICKER_URL"]
-    response = requests.get(url)
-    data = response.json()
+    if all_coins:
+        return ticker_snapshot.TICKER.dataframe(max_age=max_age)
+    markets = ticker_snapshot.TICKER.markets(max_age=max_age)
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
-    if all_coins:
-        ...
-    else:
-        for coins in data:
-            if coins["market"] == coin_1 + coin_2:
-                coins["unix_timestamp"] = coins["timestamp"]
-                coins["timestamp"] = datetime.fromtimestamp(coins["timestamp"]).strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                )
-                return pd.DataFrame.from_dict([coins])
+    coins = markets.get(coin_1 + coin_2)
+    if coins is not None:
+        coins = dict(coins)
+        coins["unix_timestamp"] = coins["timestamp"]
+        coins["timestamp"] = datetime.fromtimestamp(coins["timestamp"]).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+        return pd.DataFrame.from_dict([coins])
 
 
 def get_market_data(save_dataframe: bool = False, skip_btc: bool = False) -> pd.DataFrame:
@@ -205,21 +238,13 @@ def get_market_data(save_dataframe: bool = False, skip_btc: bool = False) -> pd.
     Returns:
         dict: The dictionary of the coins market data
     """
-    coins_dictionary = {}
-    url = URL_DICT["MARKET_DATA_URL"]
-    response = requests.get(url)
-    data = response.json()
-    for coins in data:
-        if "USDT" in coins["market"] and "insta" not in coins["market"]:
-            coins_dictionary[coins["market"]] = coins
-        elif "BTC" in coins["market"] and "insta" not in coins["market"]:
-            coins_dictionary[coins["market"]] = coins
-        elif "VRA" in coins["market"] and "insta" not in coins["market"]:
-            coins_dictionary[coins["market"]] = coins
+    dataframe = ticker_decoder.decode(exchange_client.get_json(URL_DICT["MARKET_DATA_URL"]))
+    markets = dataframe["market"].astype(str)
+    listed = markets.str.contains("USDT") | markets.str.contains("BTC") | markets.str.contains("VRA")
+    dataframe = dataframe[listed & ~markets.str.contains("insta")]
+    dataframe = dataframe.drop_duplicates("market", keep="last").sort_values("market")
     market_dataframe = get_markets_details(all_coins=True)[['coindcx_name', 'max_leverage']]
     market_dataframe.rename(columns={'coindcx_name': 'market'}, inplace=True)
-    dataframe = pd.DataFrame(coins_dictionary).T
-    dataframe = dataframe.sort_index(ascending=True, axis=0)
     dataframe["timestamp"] = pd.to_datetime(dataframe["timestamp"], unit="ms") - timedelta(
         hours=7, minutes=0
     )
@@ -254,23 +279,17 @@ def get_markets_details(
     Returns:
         dict: The dictionary of the market details of the coins.
     """
-    url = URL_DICT["MARKET_DETAILS_URL"]
-    response = requests.get(url)
-    data = response.json()
-    # print(data)
+    data = market_registry.REGISTRY.records()
     coins_dictionary = {}
 
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
 
     if all_coins:
-        for coins in data:
-            if coin_2 in coins["symbol"]:
-                coins_list.append(coins)
-        dataframe = pd.DataFrame.from_dict(coins_list)
+        dataframe = pd.DataFrame.from_dict([coins for coins in data if coin_2 in coins["symbol"]])
         if show_leverage_short:
             dataframe = dataframe[~dataframe['coindcx_name'].str.contains("USDT")]
-            dataframe = dataframe.loc[(dataframe['max_leverage_short'].astype(float) > 1.0) | (dataframe['max_leverage_short'].astype(float) > 1.0)]
+            dataframe = dataframe.loc[dataframe['coindcx_name'].isin(market_registry.REGISTRY.leveraged_markets(short=True))]
             dataframe = dataframe.sort_values(by=["max_leverage_short"], ascending=True)
             dataframe = dataframe.reset_index()
             if dataframe.empty:
@@ -286,7 +305,8 @@ def get_markets_details(
             return dataframe
         if show_leverage_long:
             dataframe = dataframe[~dataframe['coindcx_name'].str.contains("BTC")]
-            dataframe = dataframe.loc[(dataframe['max_leverage'].astype(float) > 1.0) | (dataframe['max_leverage_short'].astype(float) > 1.0)]
+            leveraged_markets = set(market_registry.REGISTRY.leveraged_markets()) | set(market_registry.REGISTRY.leveraged_markets(short=True))
+            dataframe = dataframe.loc[dataframe['coindcx_name'].isin(leveraged_markets)]
             dataframe = dataframe.sort_values(by=["max_leverage"], ascending=True)
             dataframe = dataframe.reset_index()
             if save_dataframe:
@@ -324,7 +344,7 @@ def get_markets_details(
             )
         return pd.DataFrame.from_dict(coins_dictionary)
     else:
-        dataframe = pd.DataFrame(data)
+        dataframe = market_registry.REGISTRY.dataframe()
         return dataframe[dataframe['coindcx_name'] == coin_1 + coin_2]
 
 
@@ -346,43 +366,17 @@ def place_buy_limit_order(
 
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {
-        "side": "buy",  # Toggle between 'buy' or 'sell'.
-        "order_type": "limit_order",  # Toggle between a 'market_order' or 'limit_order'.
-        "market": f"{coin_1+coin_2}",  # Replace 'SNTBTC' with your desired market pair.
-        "price_per_unit": price,  # This parameter is only required for a 'limit_order'
-        "total_quantity": 450,  # Replace this with the quantity you want
-        "timestamp": time_stamp,
-    }
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
+    order = {
+        "side": "buy",
+        "order_type": "limit_order",
+        "market": f"{coin_1+coin_2}",
+        "price_per_unit": price,
+        "total_quantity": total_quantity,
     }
-    response = requests.post(URL_DICT["NEW_ORDER_URL"], data=json_body, headers=headers)
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    data = response.json()
+    data = account_client.account(username).create_order(order)
     logging.info(data)
-    with open(ORDER_HISTORY_FILE, "a", newline="") as file:
-        csvwrite = csv.writer(file, dialect="excel")
-        csvwrite.writerow(
-            [
-                "",
-                coin_1 + coin_2,
-                total_quantity,
-                "market_order",
-                "buy",
-                TODAY,
-            ]
-        )
+    order_journal.record_response(username, "create", order, data)
     logging.info(f"Bought {total_quantity} {coin_1+coin_2} at {price}")
-    file.close()
     return data
 
 
@@ -404,45 +398,18 @@ def place_sell_limit_order(
 
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-
-    body = {
-        "side": "sell",  # Toggle between 'buy' or 'sell'.
-        "order_type": "limit_order",  # Toggle between a 'market_order' or 'limit_order'.
-        "market": f"{coin_1+coin_2}",  # Replace 'SNTBTC' with your desired market pair.
-        "price_per_unit": price,  # This parameter is only required for a 'limit_order'
-        "total_quantity": f"{total_quantity}",  # Replace this with the quantity you want
-        "timestamp": time_stamp,
+    order = {
+        "side": "sell",
+        "order_type": "limit_order",
+        "market": f"{coin_1+coin_2}",
+        "price_per_unit": price,
+        "total_quantity": f"{total_quantity}",
     }
-    json_body = json.dumps(body, separators=(",", ":"))
-
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(URL_DICT["NEW_ORDER_URL"], data=json_body, headers=headers)
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    data = response.json()
+    data = account_client.account(username).create_order(order)
     logging.info(data)
-    with open(ORDER_HISTORY_FILE, "a", newline="") as file:
-        csvwrite = csv.writer(file, dialect="excel")
-        csvwrite.writerow(
-            [
-                "",
-                coin_1 + coin_2,
-                total_quantity,
-                "market_order",
-                "sell",
-                TODAY,
-            ]
-        )
+    order_journal.record_response(username, "create", order, data)
     logging.info(f"Sold {total_quantity} {coin_1+coin_2} at {price}")
-    file.close()
+    return data
 
 
 def place_market_buy_order(
@@ -461,43 +428,15 @@ def place_market_buy_order(
 
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-
-    body = {
-        "side": "buy",  # Toggle between 'buy' or 'sell'.
-        "order_type": "market_order",  # Toggle between a 'market_order' or 'limit_order'.
-        "market": f"{coin_1+coin_2}",  # Replace 'SNTBTC' with your desired market pair.
-        "total_quantity": total_quantity,  # Replace this with the quantity you want
-        "timestamp": time_stamp,
+    order = {
+        "side": "buy",
+        "order_type": "market_order",
+        "market": f"{coin_1+coin_2}",
+        "total_quantity": total_quantity,
     }
-    json_body = json.dumps(body, separators=(",", ":"))
-
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(URL_DICT["NEW_ORDER_URL"], data=json_body, headers=headers)
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    data = response.json()
-
-    with open(ORDER_HISTORY_FILE, "a", newline="") as file:
-        csvwrite = csv.writer(file, dialect="excel")
-        csvwrite.writerow(
-            [
-                "",
-                coin_1 + coin_2,
-                total_quantity,
-                "market_order",
-                "buy",
-                TODAY,
-            ]
-        )
-        logging.info(f"Market bought {total_quantity} {coin_1+coin_2}")
+    data = account_client.account(username).create_order(order)
+    order_journal.record_response(username, "create", order, data)
+    logging.info(f"Market bought {total_quantity} {coin_1+coin_2}")
     return data
 
 
@@ -515,46 +454,19 @@ def place_market_sell_order(
         total_quantity (float): The number of stocks or coins to buy.
     """
 
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
-    body = {
-        "side": "sell",  # Toggle between 'buy' or 'sell'.
-        "order_type": "market_order",  # Toggle between a 'market_order' or 'limit_order'.
-        "market": f"{coin_1+coin_2}",  # Replace 'SNTBTC' with your desired market pair.
-        "total_quantity": f"{total_quantity}",  # Replace this with the quantity you want
-        "timestamp": time_stamp,
+    order = {
+        "side": "sell",
+        "order_type": "market_order",
+        "market": f"{coin_1+coin_2}",
+        "total_quantity": f"{total_quantity}",
     }
-    json_body = json.dumps(body, separators=(",", ":"))
-
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(URL_DICT["NEW_ORDER_URL"], data=json_body, headers=headers)
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    logging.info(response.json())
-    with open(ORDER_HISTORY_FILE, "a", newline="", encoding="utf-8") as file:
-        csvwrite = csv.writer(file, dialect="excel")
-        csvwrite.writerow(
-            [
-                "",
-                coin_1 + coin_2,
-                total_quantity,
-                "market_order",
-                "sell",
-                TODAY,
-            ]
-        )
+    data = account_client.account(username).create_order(order)
+    logging.info(data)
+    order_journal.record_response(username, "create", order, data)
     logging.info(f"Market sold {total_quantity} {coin_1+coin_2}")
-    file.close()
-    return response.json()
+    return data
 
 
 def create_multiple_orders(
@@ -564,81 +476,80 @@ def create_multiple_orders(
 
     Args:
         username (str): The username of the account to place the order in.
-        orders (str): The different orders that need to be placed for the username.
-    """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {
-        "orders": [
-            {
-                "side": "buy",  # Toggle between 'buy' or 'sell'.
-                "order_type": "limit_order",  # Toggle between a 'market_order' or 'limit_order'.
-                "market": "SNTBTC",  # Replace 'SNTBTC' with your desired market pair.
-                "price_per_unit": 0.03244,  # This parameter is only required for a 'limit_order'
-                "total_quantity": 400,  # Replace this with the quantity you want
-                "timestamp": time_stamp,
-                "ecode": "I",
-            },
-            {
-                "side": "buy",  # Toggle between 'buy' or 'sell'.
-                "order_type": "limit_order",  # Toggle between a 'market_order' or 'limit_order'.
-                "market": "SNTBTC",  # Replace 'SNTBTC' with your desired market pair.
-                "price_per_unit": 0.03244,  # This parameter is only required for a 'limit_order'
-                "total_quantity": 400,  # Replace this with the quantity you want
-                "timestamp": time_stamp,
-                "ecode": "I",
-            },
-        ]
-    }
+        orders (list): The orders to place. Every order is the body of the create order endpoint without the timestamp. Eg:
+            [{"side": "buy", "order_type": "limit_order", "market": "SNTBTC", "price_per_unit": 0.03244, "total_quantity": 400, "ecode": "I"}]
+    """
+    data = account_client.account(username).create_multiple_orders(orders)
+    logging.info(data)
+    order_journal.record_response(username, "create", {"orders": orders}, data)
+    return data
 
-    json_body = json.dumps(body, separators=(",", ":"))
 
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
+def place_orders(username: str = CONFIG["Owner"]["main_username"], orders: list = []) -> list:
+    """Place orders through the order gateway, which places the orders of an account sent within its window in one request. The
+    orders placed are tracked by the order tracker of the account.
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
+    Args:
+        username (str): The username of the account to place the orders in.
+        orders (list): The orders to place. Every order is the body of the create order endpoint without the timestamp. Eg: the
+            entries of a ladder.
 
-    response = requests.post(
-        URL_DICT["CREATE_MULTIPLE_ORDERS_URL"], data=json_body, headers=headers
-    )
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    logging.info(response.json())
-    return response.json()
+    Returns:
+        list: The order placed by the exchange, or the error of its request, for every order.
+    """
+    results = order_gateway.place(username, orders)
+    logging.info(results)
+    tracker = order_tracker.tracker(username)
+    for order, result in zip(orders, results):
+        if isinstance(result, dict) and "id" in result:
+            tracker.track(result)
+            order_journal.record(username, "create", result)
+        else:
+            order_journal.record(username, "create", order, "error")
+    return results
 
 
-def get_active_orders(username: str = CONFIG["Owner"]["main_username"]) -> dict:
+def subscribe_order_events(username: str = CONFIG["Owner"]["main_username"], callback=logging.info) -> order_tracker.OrderTracker:
+    """Call callback with the fill and cancel events of the tracked orders of the username.
+
+    Args:
+        username (str): The username of the account.
+        callback (callable, optional): Called with every event. Defaults to logging.info.
+
+    Returns:
+        order_tracker.OrderTracker: The tracker of the account, to track the orders not placed with place_orders.
+    """
+    tracker = order_tracker.tracker(username)
+    tracker.subscribe(callback)
+    return tracker
+
+
+def get_active_orders(username: str = CONFIG["Owner"]["main_username"], market: str = "SNTBTC", side: str = "buy") -> dict:
     """Get the current buy or sell active orders for the username.
 
     Args:
         username (str): The username of the account to get the active orders from.
+        market (str, optional): The market pair. Defaults to "SNTBTC".
+        side (str, optional): Either "buy" or "sell". Defaults to "buy".
 
     Returns:
         dict: List of all the active orders
     """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {
-        "side": "buy",  # Toggle between a 'buy' or 'sell' order.
-        "market": "SNTBTC",  # Replace 'SNTBTC' with your desired market pair.
-        "timestamp": time_stamp,
-    }
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(
-        URL_DICT["ACTIVE_ORDERS_URL"], data=json_body, headers=headers, timeout=60
-    )
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    return response.json()
+    return account_client.account(username).active_orders(market=market, side=side)
+
+
+def get_open_orders(username: str = CONFIG["Owner"]["main_username"], market: str = None, side: str = None) -> list:
+    """Get the open orders of the username from the local order book, without a request to the exchange.
+
+    Args:
+        username (str): The username of the account to get the open orders of.
+        market (str, optional): The market pair. Defaults to None for every market.
+        side (str, optional): Either "buy" or "sell". Defaults to None for both sides.
+
+    Returns:
+        list: The open orders.
+    """
+    return order_book.book(username).open_orders(market=market, side=side)
 
 
 def account_trade_history(username: str = CONFIG["Owner"]["main_username"], save_dataframe: bool = False, limit: int = 500) -> dict:
@@ -650,25 +561,7 @@ def account_trade_history(username: str = CONFIG["Owner"]["main_username"], save
     Returns:
         dict: The history of trades made by the username.
     """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-
-    body = {"from_id": 352622, "limit": 50, "timestamp": time_stamp, "sort": "desc", "limit": limit}
-
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(
-        URL_DICT["ACCOUNT_TRADE_HISTORY_URL"], data=json_body, headers=headers, timeout=60
-    )
-
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    dataframe = pd.DataFrame(response.json())
+    dataframe = pd.DataFrame(account_client.account(username).trade_history(limit=limit, sort="desc", from_id=352622))
     dataframe['timestamp'] = pd.to_datetime(dataframe["timestamp"], unit="ms") - timedelta(
             hours=7, minutes=0
         )
@@ -688,115 +581,120 @@ def cancel_order(username: str = CONFIG["Owner"]["main_username"], ids: str = ""
         username (str): The username of the account for whom the order needs to be cancelled.
         id (_type_): The order id.
     """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-
-    time_stamp = int(round(time.time() * 1000))
-    body = {"id": f"{ids}", "timestamp": time_stamp}  # Enter your Order ID here.
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(
-        URL_DICT["CANCEL_ONE_ACTIVE_ORDER_URL"], data=json_body, headers=headers, timeout=60
-    )
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    logging.info(response.json())
-    return response.json()
+    data = account_client.account(username).cancel_order(ids)
+    logging.info(data)
+    order_journal.record_response(username, "cancel", {"id": ids}, data)
+    return data
 
 
-def cancel_all_orders(username: str = CONFIG["Owner"]["main_username"]) -> None:
+def cancel_all_orders(username: str = CONFIG["Owner"]["main_username"], market: str = "SNTBTC", side: str = "buy") -> None:
     """Cancel all the active orders of the username.
 
     Args:
         username (str): The username of the account for which the order needs to be cancelled.
+        market (str, optional): The market pair. Defaults to "SNTBTC".
+        side (str, optional): Either "buy" or "sell". Defaults to "buy".
     """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    active_orders = get_active_orders()
-    time_stamp = int(round(time.time() * 1000))
-    body = {
-        "side": "buy",  # Toggle between a 'buy' or 'sell' order.
-        "market": "SNTBTC",  # Replace 'SNTBTC' with your desired market pair.
-        "timestamp": time_stamp,
-    }
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(
-        URL_DICT["CANCEL_ALL_ACTIVE_ORDERS_URL"], data=json_body, headers=headers, timeout=60
-    )
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    return response.json()
+    data = account_client.account(username).cancel_all_orders(market=market, side=side)
+    order_journal.record_response(username, "cancel_all", {"market": market, "side": side}, data)
+    return data
 
 
-def cancel_multiple_by_ids(username: str = CONFIG["Owner"]["main_username"], ids: list = []) -> None:
-    """Cancel multiple orders given by the list of ids for a particular username.
+def cancel_multiple_by_ids(username: str = CONFIG["Owner"]["main_username"], ids: list = []) -> dict:
+    """Cancel multiple orders given by the list of ids for a particular username, in concurrent requests of at most the max ids of
+    the exchange.
 
     Args:
         username (str): The username of the account for which the orders need to be cancelled.
         ids (list): The list of order ids to cancel.
-    """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
 
-    body = {"ids": ids}
-
-    json_body = json.dumps(body, separators=(",", ":"))
+    Returns:
+        dict: The response of its request, or the error of the request, for every id.
+    """
+    return order_maintenance.cancel(username, ids)
 
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
 
-    url = "https://api.coindcx.com/exchange/v1/orders/cancel_by_ids"
+def edit_price_of_orders(
+    username: str = CONFIG["Owner"]["main_username"], ids: list = [], price: float = ""
+) -> dict:
+    """Edit the buy or sell price of the orders. The orders are edited concurrently.
 
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
+    Args:
+        username (str): The username of the account for which the price needs to be edited.
+        ids (list | str): The order ids for which the price needs to be edited, or one order id.
+        price (float): The new price of the orders.
 
-    response = requests.post(url, data=json_body, headers=headers, timeout=60)
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    return response.json()
+    Returns:
+        dict: The response of the exchange for one order id, else the response, or the error of its request, for every id.
+    """
+    if isinstance(ids, str):
+        data = account_client.account(username).edit_price(ids, price)
+        order_journal.record_response(username, "edit_price", {"id": ids, "price_per_unit": price}, data)
+        return data
+    return order_maintenance.edit_prices(username, {order_id: price for order_id in ids})
 
 
-def edit_price_of_orders(
-    username: str = CONFIG["Owner"]["main_username"], ids: list = [], price: float = ""
-) -> None:
-    """Edit the buy or sell price of the orders.
+def reprice_ladder(
+    username: str = CONFIG["Owner"]["main_username"], market: str = "", side: str = "buy", levels: list = []
+) -> dict:
+    """Move the open orders of a market and side to new price levels in one operation. The best order gets the best level, the
+    orders beyond the last level are cancelled.
 
     Args:
-        username (str): The username of the account for which the price needs to be edited.
-        ids (_type_): The order id for which the price needs to be edited
-        price (float): _description_
+        username (str): The username of the account.
+        market (str): The market pair. Eg: "BTCUSDT".
+        side (str, optional): Either "buy" or "sell". Defaults to "buy".
+        levels (list): The new prices of the ladder.
+
+    Returns:
+        dict: The result of every order of the ladder.
     """
+    return order_maintenance.reprice_ladder(username, market, side, levels)
 
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {
-        "id": f"{ids}",  # Enter your Order ID here.
-        "timestamp": time_stamp,
-        "price_per_unit": f"{price}",  # Enter the new-price here
-    }
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(
-        URL_DICT["EDIT_PRICE_URL"], data=json_body, headers=headers, timeout=60
-    )
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    return response.json()
+
+def _bot_trader_inputs(
+    username: str,
+    coin_1: str,
+    coin_2: str,
+    market: str,
+    screener_name: str,
+    interval: str,
+    source: str,
+    states: dict,
+) -> tuple:
+    """Get the candles, indicator data and account balance of an iteration of bot_trader, waiting out the failures of the endpoints.
+
+    The reads are already retried with backoff by resilience.POLICY. When they still fail the bot waits until the open circuits of
+    its endpoints let a probe through, or for the max backoff, and reads again instead of stopping. The errors that are not
+    failures of an endpoint are raised.
+
+    Returns:
+        tuple: The candles, the indicator data and the account balance.
+    """
+    endpoints = [URL_DICT["CANDLES_URL"], URL_DICT["ACCOUNT_BALANCE_URL"], rate_limiter.TRADINGVIEW_URL]
+    while True:
+        try:
+            data = get_candles(coin_1=coin_1, coin_2=coin_2)
+            indicator_data_ = get_indicator_data(
+                coin_1=coin_1,
+                coin_2=coin_2,
+                market=market,
+                screener_name=screener_name,
+                interval=interval,
+                source=source,
+                states=states,
+            )
+            if data is not None and indicator_data_ is not None:
+                return data, indicator_data_, get_account_balance(username=username)
+            reason = f"no candles or indicator data for {coin_1+coin_2}"
+        except Exception as exception:
+            # The errors of the request itself, eg: rejected credentials or a missing indicator, would fail every time.
+            if not isinstance(exception, resilience.CircuitOpenError) and not resilience.transient(exception):
+                raise
+            reason = exception
+        wait = resilience.POLICY.retry_in(endpoints) or RESILIENCE_CONFIG["backoff_max"]
+        logging.error(f"{coin_1+coin_2} bot could not read its inputs: {reason}. Reading again in {wait:.1f}s")
+        time.sleep(wait)
 
 
 def bot_trader(
@@ -806,6 +704,7 @@ def bot_trader(
     market: str = "Binance",
     screener_name: str = "Crypto",
     interval: str = "4h",
+    source: str = INDICATOR_CONFIG["source"],
 ) -> None:
     """Execute trades automatically 24/7 based on input parameters
 
@@ -816,6 +715,8 @@ def bot_trader(
         market (str): he name of the exchange ("NSE", "BSE", "Binance").
         screener_name (str): Either "India" or "Crypto".
         interval (str): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M
+        source (str): "tradingview" or "local". The local indicators are streamed: seeded once, saved to the indicators state file
+            and updated with the last two candles on every iteration.
     """
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
@@ -824,9 +725,9 @@ def bot_trader(
     min_order_value = 0.0001
     order_size = 0
     logging.info(f"""{coin_1}{coin_2} Bot Started for {username} at {datetime.now()}!""")
-    indicator_data_ = get_indicator_data(
-        coin_1=coin_1, coin_2=coin_2, market=market, screener_name=screener_name, interval=interval
-    )
+    states = streaming_indicators.load_states(INDICATOR_CONFIG["state_file"]) if source == "local" else None
+    inputs = (username, coin_1, coin_2, market, screener_name, interval, source, states)
+    _, indicator_data_, _ = _bot_trader_inputs(*inputs)
     rsi = indicator_data_["RSI"]
     buy_price = indicator_data_["Pivot.M.Fibonacci.Middle"]
     sell_price = indicator_data_["Pivot.M.Fibonacci.R1"]
@@ -836,28 +737,7 @@ def bot_trader(
             \nOrder size is {order_size}."""
     )
     while no_of_trades <= 100:
-        try:
-            data = get_candles(coin_1=coin_1, coin_2=coin_2)
-            indicator_data_ = get_indicator_data(
-                coin_1=coin_1,
-                coin_2=coin_2,
-                market=market,
-                screener_name=screener_name,
-                interval=interval,
-            )
-            account_balance = get_account_balance(username=username)
-        except Exception as exception:
-            logging.error(exception)
-            time.sleep(60)
-            data = get_candles(coin_1=coin_1, coin_2=coin_2)
-            indicator_data_ = get_indicator_data(
-                coin_1=coin_1,
-                coin_2=coin_2,
-                market=market,
-                screener_name=screener_name,
-                interval=interval,
-            )
-            account_balance = get_account_balance(username=username)
+        data, indicator_data_, account_balance = _bot_trader_inputs(*inputs)
 
         rsi = indicator_data_["RSI"]
         ema50 = indicator_data_["EMA50"]
@@ -941,6 +821,48 @@ def bot_trader(
             send_mail(f"Sold {coin_2} for {profit}% profits!")
 
 
+def value_balances(
+    balances: pd.DataFrame,
+    ticker: dict,
+    markets_details: pd.DataFrame,
+    quote_currencies: tuple = ("USDT", "USDC"),
+) -> pd.DataFrame:
+    """Value the balance table of an account in one pass using one ticker snapshot and one markets details snapshot.
+
+    Args:
+        balances (pd.DataFrame): The balances returned by the exchange with the currency, balance and locked_balance columns.
+        ticker (dict): The ticker of every market keyed by market. Eg: ticker_snapshot.TICKER.markets().
+        markets_details (pd.DataFrame): The markets details. Eg: market_registry.REGISTRY.dataframe().
+        quote_currencies (tuple, optional): The quote currencies to price a coin in, in order of preference. Defaults to ("USDT", "USDC").
+
+    Returns:
+        pd.DataFrame: The holdings with a USDT market, with the quantity, the balance and locked balance in the quote currency and
+            the max leverage of the USDT market.
+    """
+    dataframe = balances.copy()
+    dataframe["balance"] = dataframe["balance"].astype(float)
+    dataframe["locked_balance"] = dataframe["locked_balance"].astype(float)
+    dataframe = dataframe[(dataframe["balance"] > 0.0) | (dataframe["locked_balance"] > 0.0)]
+    last_prices = pd.Series(
+        {market: coins["last_price"] for market, coins in ticker.items()}, dtype=object
+    ).astype(float)
+    price = pd.Series(float("nan"), index=dataframe.index)
+    for quote in quote_currencies:
+        price = price.fillna((dataframe["currency"] + quote).map(last_prices))
+    # Coins without a price in any of the quote currencies have no value in them and are left out below.
+    dataframe["quantity"] = dataframe["balance"]
+    dataframe["balance"] = dataframe["balance"] * price
+    dataframe["locked_balance"] = dataframe["locked_balance"] * price
+    dataframe = dataframe[(dataframe["balance"] > 0.5) | (dataframe["locked_balance"] > 0.5)]
+    dataframe = dataframe[dataframe["quantity"] > 0.01]
+    dataframe["currency"] = dataframe["currency"] + "USDT"
+    market_dataframe = markets_details[["coindcx_name", "max_leverage"]].rename(columns={"coindcx_name": "currency"})
+    # The coins without a USDT market on the exchange, eg: USDT and INR, are dropped.
+    dataframe = pd.merge(dataframe, market_dataframe, on="currency", how="inner")
+    dataframe.rename(columns={"currency": "market"}, inplace=True)
+    return dataframe
+
+
 def get_account_balance(username: str = CONFIG["Owner"]["main_username"], save_dataframe: bool = False) -> dict:
     """Get the account balance of the username.
 
@@ -950,48 +872,11 @@ def get_account_balance(username: str = CONFIG["Owner"]["main_username"], save_d
     Returns:
         dict: The dictionary of the account balances of all the currencies.
     """
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {"timestamp": time_stamp}
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-
-    response = requests.post(
-        URL_DICT["ACCOUNT_BALANCE_URL"], data=json_body, headers=headers, timeout=60
+    dataframe = value_balances(
+        pd.DataFrame(account_client.account(username).balances()),
+        ticker_snapshot.TICKER.markets(),
+        market_registry.REGISTRY.dataframe(),
     )
-    if type(response.json) == dict and 401 in response.json().values():
-        raise Exception("Unauthorized user credentials")
-    dataframe = pd.DataFrame(response.json())
-    # print(get_ticker().keys())
-    dataframe = dataframe[(dataframe['balance'].astype(float) > 0.0) | dataframe['locked_balance'].astype(float) > 0.0]
-    for coin in dataframe['currency']:
-        try:
-            dataframe.loc[dataframe['currency'] == coin, "quantity"] = dataframe.loc[dataframe['currency'] == coin]["balance"].astype(float)
-            dataframe.loc[dataframe['currency'] == coin, "balance"] = float(dataframe.iloc[dataframe['currency'] == coin]["balance"]) * float(get_ticker(coin_1=coin)['last_price'])
-            dataframe.loc[dataframe['currency'] == coin, "locked_balance"] = float(dataframe.iloc[dataframe['currency'] == coin]["locked_balance"]) * float(get_ticker(coin_1=coin)['last_price'])
-        except Exception as e:
-            logging.info(e)
-            try:
-                dataframe.loc[dataframe['currency'] == coin, "quantity"] = dataframe.loc[dataframe['currency'] == coin]["balance"].astype(float)
-                dataframe.loc[dataframe['currency'] == coin, "balance"] = float(dataframe.iloc[dataframe['currency'] == coin]["balance"])* float(get_ticker(coin_1=coin, coin_2 = "USDC")['last_price'])
-                dataframe.loc[dataframe['currency'] == coin, "locked_balance"] = float(dataframe.iloc[dataframe['currency'] == coin]["locked_balance"]) * float(get_ticker(coin_1=coin, coin_2 = "USDC")['last_price'])
-            except Exception as e:
-                logging.info(e)
-    dataframe = dataframe[(dataframe['balance'].astype(float) > 0.5) | dataframe['locked_balance'].astype(float) > 0.5]
-    dataframe = dataframe[dataframe['quantity'] > 0.01]
-    market_dataframe = get_markets_details(all_coins=True)[['coindcx_name', 'max_leverage']]
-    market_dataframe.columns = ['currency', 'max_leverage']
-    for coin in dataframe['currency']:
-        dataframe['currency'] = dataframe['currency'].replace(coin, coin + "USDT")
-        if coin + "USDT" not in market_dataframe['currency'].values:
-            dataframe = dataframe.drop(dataframe[dataframe['currency'] == coin].index)
-    dataframe = pd.merge(dataframe, market_dataframe, on='currency', how='left')
-    dataframe.rename(columns={'currency': 'market'}, inplace=True)
     dataframe.fillna(0, inplace=True)
     dataframe.reset_index(drop=True, inplace=True)
     if save_dataframe:
@@ -999,6 +884,17 @@ def get_account_balance(username: str = CONFIG["Owner"]["main_username"], save_d
     return dataframe
 
 
+def _fetch_candles(pair: str, interval: str, limit: int) -> pd.DataFrame:
+    # A throttled or failed response raises instead of being parsed and cached as candles. resilience.POLICY is the only layer
+    # retrying it.
+    data = exchange_client.get_json(
+        URL_DICT["CANDLES_URL"], params={"pair": pair, "interval": interval, "limit": limit}, timeout=60, retry=False
+    )
+    dataframe = pd.DataFrame.from_dict(data)
+    dataframe["time"] = pd.to_datetime(dataframe["time"], unit="ms")
+    return dataframe
+
+
 def get_candles(
     coin_1: str = "BTC",
     coin_2: str = "USDT",
@@ -1015,19 +911,18 @@ def get_candles(
         interval (str, optional): [1m   5m  15m 30m 1h  2h  4h  6h  8h  1d  3d  1w  1M] m -> minutes, h -> hours, d -> days, w -> weeks, M -> months. Defaults to "4h".
 
     Returns:
-        pd.DataFrame: The historical candle data of the coin market pair.
+        pd.DataFrame: The historical candle data of the coin market pair. Served from the candle cache until the candle in progress
+            closes or the candle refresh interval of the config file elapses.
     """
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
     try:
-        url = (
-            URL_DICT["CANDLES_URL"]
-            + f"?pair={get_markets_details(coin_1=coin_1,coin_2=coin_2)['pair'].values[0]}&interval={interval}&limit={limit}"
+        pair = market_registry.REGISTRY.pair(coin_1, coin_2)
+        dataframe = candle_cache.CACHE.get(
+            (pair, interval, "candles", limit),
+            interval,
+            lambda: resilience.POLICY.call(URL_DICT["CANDLES_URL"], _fetch_candles, pair, interval, limit),
         )
-        response = requests.get(url, timeout=60)
-        data = response.json()
-        dataframe = pd.DataFrame.from_dict(data)
-        dataframe["time"] = pd.to_datetime(dataframe["time"], unit="ms")
 
         if save_dataframe:
             dataframe.to_csv(f"{constants.MARKET_DATA_DIRECTORY}/{coin_1}_{coin_2}_{interval}_candles.csv")
@@ -1040,69 +935,297 @@ def get_candles(
         pass
 
 
+def get_candles_many(markets: list, limit: int = 100, interval: str = "4h") -> dict:
+    """Get the candles of many markets concurrently on the event loop of async_exchange_client.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        limit (int, optional): maximum 1000 candles. Defaults to 100.
+        interval (str, optional): [1m   5m  15m 30m 1h  2h  4h  6h  8h  1d  3d  1w  1M]. Defaults to "4h".
+
+    Returns:
+        dict: The candles of every market keyed by market. None for the markets whose request failed.
+    """
+    return async_exchange_client.run_sync(
+        async_exchange_client.get_candles_many(markets, limit=limit, interval=interval)
+    )
+
+
+def _candle_interval(interval: str) -> str:
+    """Translate a TradingView interval to the interval of the candles endpoint."""
+    return "1w" if interval == "1W" else interval
+
+
+def get_local_indicator_data(
+    coin_1: str = "BTC",
+    coin_2: str = "USDT",
+    interval: str = "4h",
+    limit: int = INDICATOR_CONFIG["candles"],
+) -> dict:
+    """Compute the indicator data of a market locally from its candles instead of requesting it from Trading View.
+
+    Args:
+        coin_1 (str, optional): Symbol of coin_1. Defaults to "BTC".
+        coin_2 (str, optional): Symbol of coin_2. Defaults to "USDT".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        limit (int, optional): The number of candles to compute the indicators from. Defaults to the indicators candles of the config file.
+
+    Returns:
+        dict: The indicator data with the same keys as the Trading View analysis.
+    """
+    candles = get_candles(coin_1=coin_1, coin_2=coin_2, limit=limit, interval=_candle_interval(interval))
+    if candles is None or candles.empty:
+        logging.info(f"No candles to compute the indicators of {coin_1+coin_2}")
+        return None
+    pivot_candles = get_candles(coin_1=coin_1, coin_2=coin_2, limit=2, interval="1M")
+    return indicators.compute_indicators(candles, pivot_candles=pivot_candles)
+
+
+def _indicator_candles(market: str, interval: str, limit: int, pivots: bool) -> tuple:
+    """The candles and the monthly candles, if pivots is True, of a market for get_local_indicators."""
+    coin_1, coin_2 = market_registry.REGISTRY.split(market)
+    candles = get_candles(coin_1=coin_1, coin_2=coin_2, limit=limit, interval=_candle_interval(interval))
+    pivot_candles = get_candles(coin_1=coin_1, coin_2=coin_2, limit=2, interval="1M") if pivots else None
+    return candles, pivot_candles
+
+
+def get_local_indicators(
+    markets: list,
+    interval: str = "4h",
+    limit: int = INDICATOR_CONFIG["candles"],
+    pivots: bool = True,
+    workers: int = SCANNER_CONFIG["workers"],
+) -> pd.DataFrame:
+    """Compute the indicator data of many markets locally in one vectorized pass. Only the candles are fetched.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        limit (int, optional): The number of candles to compute the indicators from. Defaults to the indicators candles of the config file.
+        pivots (bool, optional): Whether to fetch the monthly candles for the Fibonacci pivots. Defaults to True.
+        workers (int, optional): The number of markets whose candles are fetched concurrently. Defaults to the scanner workers of the
+            config file.
+
+    Returns:
+        pd.DataFrame: The indicator data indexed by market. Markets without candles are left out.
+    """
+    outcomes = scanner.map_markets(
+        markets,
+        partial(_indicator_candles, interval=interval, limit=limit, pivots=pivots),
+        workers=workers,
+        description="get_local_indicators",
+    )
+    candles = {market: result[0] for market, result, error in outcomes if result is not None}
+    pivot_candles = {market: result[1] for market, result, error in outcomes if result is not None and result[1] is not None}
+    return indicators.compute_indicators_many(candles, pivot_candles=pivot_candles or None)
+
+
+def get_market_indicators(
+    markets: list,
+    market: str = "Binance",
+    screener_name: str = "Crypto",
+    interval: str = "4h",
+    source: str = INDICATOR_CONFIG["source"],
+    workers: int = SCANNER_CONFIG["workers"],
+) -> pd.DataFrame:
+    """Get the indicator data of many markets at once for the all coins scans.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        market (str, optional): The exchange on Trading View. Defaults to "Binance".
+        screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        source (str, optional): "tradingview" or "local". Defaults to the indicators source of the config file.
+        workers (int, optional): The number of markets whose candles are fetched concurrently with the local source. Defaults to the
+            scanner workers of the config file.
+
+    Returns:
+        pd.DataFrame: The indicator data indexed by market. Markets without indicator data are left out.
+    """
+    if source == "local":
+        return get_local_indicators(markets, interval=interval, workers=workers)
+    return tradingview_batch.get_indicators(markets, exchange=market, screener_name=screener_name, interval=interval)
+
+
+def seed_indicator_state(
+    coin_1: str = "BTC",
+    coin_2: str = "USDT",
+    interval: str = "4h",
+    limit: int = INDICATOR_CONFIG["candles"],
+) -> streaming_indicators.IndicatorState:
+    """Seed the streaming indicators of a market from its closed candles.
+
+    Args:
+        coin_1 (str, optional): Symbol of coin_1. Defaults to "BTC".
+        coin_2 (str, optional): Symbol of coin_2. Defaults to "USDT".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        limit (int, optional): The number of candles to seed the indicators from. Defaults to the indicators candles of the config file.
+
+    Returns:
+        streaming_indicators.IndicatorState: The seeded indicator state. None if the market has no candles.
+    """
+    candles = get_candles(coin_1=coin_1, coin_2=coin_2, limit=limit, interval=_candle_interval(interval))
+    if candles is None or candles.empty:
+        logging.info(f"No candles to seed the indicators of {coin_1+coin_2}")
+        return None
+    state = streaming_indicators.IndicatorState(market=coin_1 + coin_2, interval=interval)
+    # The latest candle is still in progress, only the closed candles are committed.
+    state.seed(
+        candles.sort_values("time").iloc[:-1],
+        pivot_candles=get_candles(coin_1=coin_1, coin_2=coin_2, limit=2, interval="1M"),
+    )
+    return state
+
+
+def update_indicator_state(
+    state: streaming_indicators.IndicatorState,
+    coin_1: str = "BTC",
+    coin_2: str = "USDT",
+    interval: str = "4h",
+) -> tuple:
+    """Bring the streaming indicators of a market up to date with the last two candles only.
+
+    The previous candle is committed if it closed since the last update and the candle in progress is evaluated without changing the
+    state. The state is seeded again if candles were missed, eg: after a long restart.
+
+    Args:
+        state (streaming_indicators.IndicatorState): The indicator state of the market. None to seed a new one.
+        coin_1 (str, optional): Symbol of coin_1. Defaults to "BTC".
+        coin_2 (str, optional): Symbol of coin_2. Defaults to "USDT".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+
+    Returns:
+        tuple: The indicator state and the indicator data of the candle in progress.
+    """
+    candles = get_candles(coin_1=coin_1, coin_2=coin_2, limit=2, interval=_candle_interval(interval))
+    if candles is None or len(candles) < 2:
+        return state, None
+    previous, current = candles.sort_values("time").to_dict("records")
+    previous_time = streaming_indicators._milliseconds(previous["time"])
+    candle_length = streaming_indicators._milliseconds(current["time"]) - previous_time
+    if state is None or state.interval != interval or state.last_time is None or previous_time - state.last_time > candle_length:
+        state = seed_indicator_state(coin_1=coin_1, coin_2=coin_2, interval=interval)
+        if state is None:
+            return None, None
+    elif previous_time > state.last_time:
+        state.update(previous)
+    return state, state.update(current, closed=False)
+
+
 def get_indicator_data(
     coin_1: str = "BTC",
     coin_2: str = "USDT",
     market: str = "Binance",
     screener_name: str = "Crypto",
     interval: str = "4h",
+    source: str = INDICATOR_CONFIG["source"],
+    states: dict = None,
 ) -> dict:
-    """Get complete indicator data from Trading View.
+    """Get complete indicator data from Trading View or compute it locally from the candles of the exchange.
 
     Args:
         symbol (_type_): Ticker Ex: "CIPLA", "TATAMOTORS", "XVGBTC", "BTCUSDT"
         market (str): Exchange ("NSE", "BSE", "Binance", "Huobi", "Kucoin")
         screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
         interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        source (str, optional): "tradingview" or "local". Defaults to the indicators source of the config file.
+        states (dict, optional): The streaming indicator states keyed by market. With the local source the indicators are updated
+            from the last two candles instead of computed from the full history, and the states are saved to the indicators
+            state file whenever a candle closes. Defaults to None.
 
     Returns:
-        list: The indicator data for the market pair in an exchange.
+        list: The indicator data for the market pair in an exchange. Served from the candle cache until the candle in progress
+            closes or the candle refresh interval of the config file elapses.
     """
     coin_1 = coin_1.upper()
     coin_2 = coin_2.upper()
-    try:
-        trading_pair = TA_Handler(
-            symbol=f"{coin_1+coin_2}",
-            screener=f"{screener_name}",
-            exchange=f"{market}",
-            interval=INTERVAL_DICT[str(interval)],
+    if source == "local" and states is not None:
+        state = states.get(coin_1 + coin_2)
+        last_time = state.last_time if state else None
+        state, indicator_data = update_indicator_state(state, coin_1=coin_1, coin_2=coin_2, interval=interval)
+        if state is not None and state.last_time != last_time:
+            states[coin_1 + coin_2] = state
+            streaming_indicators.save_states(states, INDICATOR_CONFIG["state_file"])
+        return indicator_data
+    if source == "local":
+        fetch = partial(get_local_indicator_data, coin_1=coin_1, coin_2=coin_2, interval=interval)
+    else:
+        fetch = partial(
+            get_tradingview_indicator_data,
+            coin_1=coin_1,
+            coin_2=coin_2,
+            market=market,
+            screener_name=screener_name,
+            interval=interval,
         )
-        return trading_pair.get_analysis().indicators
-    except Exception as e:
-        logging.info(f"Error in get_indicator_data for {coin_1}: {e}")
+    return candle_cache.CACHE.get(
+        (coin_1 + coin_2, interval, source, market, screener_name), _candle_interval(interval), fetch
+    )
+
+
+def get_tradingview_indicator_data(
+    coin_1: str = "BTC",
+    coin_2: str = "USDT",
+    market: str = "Binance",
+    screener_name: str = "Crypto",
+    interval: str = "4h",
+) -> dict:
+    """Get complete indicator data from Trading View, trying the exchanges of the market until one serves it.
+
+    Args:
+        coin_1 (str, optional): Symbol of coin_1. Defaults to "BTC".
+        coin_2 (str, optional): Symbol of coin_2. Defaults to "USDT".
+        market (str, optional): Exchange to try first ("NSE", "BSE", "Binance", "Huobi", "Kucoin"). Defaults to "Binance".
+        screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+
+    Returns:
+        dict: The indicator data. None if no exchange serves the market or TradingView is failing.
+    """
+    symbol = coin_1 + coin_2
+    resolutions = exchange_resolution.RESOLUTIONS
+    chain = exchange_resolution.exchange_chain(symbol, market)
+    missing, resolved = resolutions.lookup(symbol, screener_name, chain=chain)
+    if missing:
+        logging.info(f"No exchange serves {symbol} on Trading View, skipped until the negative cache expires")
+        return None
+    if resolved:
+        chain = [resolved] + [exchange for exchange in chain if exchange != resolved]
+    transient = False
+    for attempts, exchange in enumerate(chain, start=1):
         try:
-            market = constants.MARKETS[get_markets_details(coin_1="NAKA", coin_2=coin_2)["ecode"].values[0]]
             trading_pair = TA_Handler(
-                symbol=f"{coin_1+coin_2}",
+                symbol=symbol,
                 screener=f"{screener_name}",
-                exchange=f"{market}",
+                exchange=f"{exchange}",
                 interval=INTERVAL_DICT[str(interval)],
             )
-            return trading_pair.get_analysis().indicators
+            indicator_data = resilience.POLICY.call(
+                rate_limiter.TRADINGVIEW_URL, rate_limiter.LIMITER.call, rate_limiter.TRADINGVIEW_URL, trading_pair.get_analysis
+            ).indicators
+        except resilience.CircuitOpenError as e:
+            # TradingView is down, the other exchanges of the chain would fail the same way.
+            logging.info(f"Error in get_indicator_data for {coin_1}: {e}")
+            return None
         except Exception as e:
             print(coin_1, e)
-            logging.info(f"Error in get_indicator_data for {coin_1}: {e}")
-            try:
-                trading_pair = TA_Handler(
-                symbol=f"{coin_1+coin_2}",
-                screener=f"{screener_name}",
-                exchange="GateIO",
-                interval=INTERVAL_DICT[str(interval)],
-                )
-                return trading_pair.get_analysis().indicators
-            except Exception as e:
-                print(coin_1, e)
-                logging.info(f"Error in get_indicator_data for {coin_1}: {e}")
-                try:
-                    trading_pair = TA_Handler(
-                    symbol=f"{coin_1+coin_2}",
-                    screener=f"{screener_name}",
-                    exchange="MEXC",
-                    interval=INTERVAL_DICT[str(interval)],
-                    )
-                    return trading_pair.get_analysis().indicators
-                except Exception as e:
-                    print(coin_1, e)
+            logging.info(f"Error in get_indicator_data for {coin_1} on {exchange}: {e}")
+            if resilience.transient(e):
+                # Throttled, failing or unreachable: the other exchanges of the chain would fail the same way and the symbol
+                # may well be listed, so nothing is learned or forgotten.
+                return None
+            # Only the answer that the exchange does not list the symbol is a miss, the other errors say nothing about the listing.
+            if str(e) != exchange_resolution.NOT_FOUND:
+                transient = True
+            elif exchange == resolved:
+                resolutions.forget(symbol, screener_name)
+            continue
+        resolutions.record(symbol, screener_name, exchange, attempts=attempts if exchange != resolved else 1)
+        resolutions.save()
+        return indicator_data
+    if not transient:
+        resolutions.record_missing(symbol, screener_name)
+        resolutions.save()
 
 
 def auto_trader(username: str = CONFIG["Owner"]["main_username"]):
@@ -1112,7 +1235,7 @@ def auto_trader(username: str = CONFIG["Owner"]["main_username"]):
         username (str): The name of the username to trade for.
     """
     unneccessary_coins = ["NOAH", "XEC", "INR"]
-    current_orders = get_active_orders(username=username)["orders"]
+    current_orders = get_open_orders(username=username)
     if len(current_orders) == 0:
         coins_currently_held = get_account_balance(username=username)
         for coin in unneccessary_coins:
@@ -1284,19 +1407,7 @@ def fetch_lend_orders(username: str = CONFIG["Owner"]["main_username"]):
     Returns:
         dict: A dictionary containing the list of lend orders.
     """
-    fetch_lend_orders_url = constants.URL_DICT["FETCH_LEND_ORDERS_URL"]
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {"timestamp": time_stamp}
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(fetch_lend_orders_url, data=json_body, headers=headers)
-    return response.json()
+    return account_client.account(username).fetch_lend_orders()
 
 
 def lend_order(
@@ -1312,19 +1423,7 @@ def lend_order(
     Returns:
         None
     """
-    lend_url = constants["URL_DICT"]["LEND_ORDERS_URL"]
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {"timestamp": time_stamp}
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(lend_url, data=json_body, headers=headers)
-    return response.json()
+    return account_client.account(username).lend_order(coin_name=coin_name, amount=amount)
 
 
 def settle_orders(username: str = CONFIG["Owner"]["main_username"]):
@@ -1337,19 +1436,7 @@ def settle_orders(username: str = CONFIG["Owner"]["main_username"]):
     Returns:
         dict: A dictionary containing the list of settle orders.
     """
-    settle_orders_url = constants["URL_DICT"]["SETTLE_ORDERS_URL"]
-    secret_bytes = bytes(get_keys(username=username)[1], encoding="utf-8")
-    time_stamp = int(round(time.time() * 1000))
-    body = {"timestamp": time_stamp}
-    json_body = json.dumps(body, separators=(",", ":"))
-    signature = hmac.new(secret_bytes, json_body.encode(), hashlib.sha256).hexdigest()
-    headers = {
-        "Content-Type": "application/json",
-        "X-AUTH-APIKEY": get_keys(username=username)[0],
-        "X-AUTH-SIGNATURE": signature,
-    }
-    response = requests.post(settle_orders_url, data=json_body, headers=headers)
-    return response.json()
+    return account_client.account(username).settle_orders()
 
 
 def crypto_price_tracker(save_dataframe: bool = False):
@@ -1423,6 +1510,17 @@ def crypto_price_tracker(save_dataframe: bool = False):
         return initial_market_data
 
 
+def _price_on_date_row(coin: str, date: str, days: int) -> dict:
+    """The close of a market on a date for get_price_of_coin_on_date with all_coins."""
+    coin_1, coin_2 = market_registry.REGISTRY.split(coin)
+    candle_dataframe = get_candles(coin_1=coin_1, coin_2=coin_2, interval="1d", limit=days)
+    selected = candle_dataframe["time"] == date
+    return {
+        "close": candle_dataframe["close"].values[selected][0],
+        "time": candle_dataframe["time"].values[selected][0],
+    }
+
+
 def get_price_of_coin_on_date(
     coin_1: str = "",
     coin_2: str = "USDT",
@@ -1431,6 +1529,7 @@ def get_price_of_coin_on_date(
     get_dataframe: bool = False,
     save_dataframe: bool = False,
     all_coins: bool = False,
+    workers: int = SCANNER_CONFIG["workers"],
 ):
     """
     Get the price of a coin on a specific date.
@@ -1439,6 +1538,7 @@ def get_price_of_coin_on_date(
         coin_1 (str): The symbol of the first coin.
         coin_2 (str): The symbol of the second coin.
         date (str): The date in DD-MM-YYYY format for which to retrieve the price.
+        workers (int): The number of markets fetched concurrently with all_coins. Defaults to the scanner workers of the config file.
 
     Returns:
         dict: A dictionary containing the price of the coin on the specified date.
@@ -1454,31 +1554,13 @@ def get_price_of_coin_on_date(
             complete_dataframe = pd.DataFrame()
             dataframe = get_market_data()
             date_required = datetime.now() - datetime.strptime(date, "%Y-%m-%d")
-            count = 1
-            for coins in dataframe["market"].values:
-                if "USDT" in coins:
-                    coin_1 = coins.split("USDT")[0]
-                    coin_2 = "USDT"
-                elif "BTC" in coins:
-                    coin_1 = coins.split("BTC")[0]
-                    coin_2 = "BTC"
-                elif "VRA" in coins:
-                    coin_1 = coins.split("VRA")[0]
-                    coin_2 = coins.split("VRA")[1]
-                try:
-                    candle_dataframe = get_candles(
-                        coin_1=coin_1, coin_2=coin_2, interval="1d", limit=date_required.days
-                    )
-                    complete_dataframe[count] = {
-                        "market": coins,
-                        "close": candle_dataframe["close"].values[candle_dataframe["time"] == date][0],
-                        "time": candle_dataframe["time"].values[candle_dataframe["time"] == date][0],
-                    }
-                    count += 1
-
-                except Exception as e:
-                    pass
-            complete_dataframe.T.to_csv(
+            complete_dataframe = scanner.scan(
+                list(dataframe["market"].values),
+                partial(_price_on_date_row, date=date, days=date_required.days),
+                workers=workers,
+                description="get_price_of_coin_on_date",
+            )
+            complete_dataframe.to_csv(
                 os.path.join(constants.MARKET_DATA_DIRECTORY, f"{date}_market_data.csv"), index=True
             )
         else:
@@ -1498,6 +1580,42 @@ def get_price_of_coin_on_date(
         return {404: "Please provide either a date or a number of days."}
 
 
+def _market_indicator_row(coin: str, indicator_dataframe: pd.DataFrame) -> dict:
+    """The get_market_indicator row of a market of an all coins scan."""
+    coin_1, coin_2 = market_registry.REGISTRY.split(coin)
+    ticker_data = get_ticker(coin_1=coin_1, coin_2=coin_2)
+    candle_data = get_candles(coin_1=coin_1, coin_2=coin_2, interval="1d", limit=1)
+    indicator_data_ = indicator_dataframe.loc[coin]
+    return {
+        "RSI": indicator_data_["RSI"],
+        "EMA10": indicator_data_["EMA10"],
+        "EMA50": indicator_data_["EMA50"],
+        "EMA200": indicator_data_["EMA200"],
+        "Stoch.K": indicator_data_["Stoch.K"],
+        "Stoch.D": indicator_data_["Stoch.D"],
+        "MACD.macd": indicator_data_["MACD.macd"],
+        "MACD.signal": indicator_data_["MACD.signal"],
+        "Pivot": indicator_data_["Pivot.M.Fibonacci.Middle"],
+        "Supports": [
+            indicator_data_["Pivot.M.Fibonacci.S1"],
+            indicator_data_["Pivot.M.Fibonacci.S2"],
+            indicator_data_["Pivot.M.Fibonacci.S3"],
+        ],
+        "Resistances": [
+            indicator_data_["Pivot.M.Fibonacci.R1"],
+            indicator_data_["Pivot.M.Fibonacci.R2"],
+            indicator_data_["Pivot.M.Fibonacci.R3"],
+        ],
+        "open": candle_data["open"].values[0],
+        "high": candle_data["high"].values[0],
+        "low": candle_data["low"].values[0],
+        "close": candle_data["close"].values[0],
+        "Current Price": ticker_data["last_price"].values[0],
+        "change_24h": ticker_data["change_24_hour"].values[0],
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
 def get_market_indicator(
     coin_1: str = "BTC",
     coin_2: str = "USDT",
@@ -1506,6 +1624,7 @@ def get_market_indicator(
     interval: str = "4h",
     all_coins: bool = False,
     save_dataframe: bool = False,
+    workers: int = SCANNER_CONFIG["workers"],
 ):
     """
     Retrieves market indicator data for a specified cryptocurrency pair.
@@ -1516,6 +1635,7 @@ def get_market_indicator(
         market (str): The market where the indicator data will be retrieved from. Default is "Binance".
         screener_name (str): The name of the screener used to filter the indicator data. Default is "Crypto".
         interval (str): The time interval for the indicator data. Default is "4h".
+        workers (int): The number of markets scanned concurrently with all_coins. Default is the scanner workers of the config file.
 
     Returns:
         None
@@ -1529,65 +1649,17 @@ def get_market_indicator(
         if os.path.exists(rf"{constants.MARKET_DATA_DIRECTORY}\2023-12-20_market_data.csv"):
             data = pd.read_csv(rf"{constants.MARKET_DATA_DIRECTORY}\2023-12-20_market_data.csv")
         else:
-            url = URL_DICT["MARKET_DATA_URL"]
-            response = requests.get(url)
-            data = response.json()
+            data = ticker_decoder.decode(exchange_client.get_json(URL_DICT["MARKET_DATA_URL"]))
         coins_dictionary = data["market"].to_dict()
-        for coin in coins_dictionary.values():
-            if "USDT" in coin:
-                coin_1 = coin.split("USDT")[0]
-                coin_2 = "USDT"
-            elif "BTC" in coin:
-                coin_1 = coin.split("BTC")[0]
-                coin_2 = "BTC"
-            elif "USDC" in coin:
-                coin_1 = coin.split("USDC")[0]
-                coin_2 = "USDC"
-            ticker_data = get_ticker(coin_1=coin_1, coin_2=coin_2)
-            candle_data = get_candles(coin_1=coin_1, coin_2=coin_2, interval="1d", limit=1)
-            try:
-                indicator_data_ = get_indicator_data(
-                    coin_1=coin_1,
-                    coin_2=coin_2,
-                    market=market,
-                    screener_name=screener_name,
-                    interval=interval,
-                )
-                supports = [
-                    indicator_data_["Pivot.M.Fibonacci.S1"],
-                    indicator_data_["Pivot.M.Fibonacci.S2"],
-                    indicator_data_["Pivot.M.Fibonacci.S3"],
-                ]
-                resistances = [
-                    indicator_data_["Pivot.M.Fibonacci.R1"],
-                    indicator_data_["Pivot.M.Fibonacci.R2"],
-                    indicator_data_["Pivot.M.Fibonacci.R3"],
-                ]
-                dataframe[count] = {
-                    "market": coin_1 + coin_2,
-                    "RSI": indicator_data_["RSI"],
-                    "EMA10": indicator_data_["EMA10"],
-                    "EMA50": indicator_data_["EMA50"],
-                    "EMA200": indicator_data_["EMA200"],
-                    "Stoch.K": indicator_data_["Stoch.K"],
-                    "Stoch.D": indicator_data_["Stoch.D"],
-                    "MACD.macd": indicator_data_["MACD.macd"],
-                    "MACD.signal": indicator_data_["MACD.signal"],
-                    "Pivot": indicator_data_["Pivot.M.Fibonacci.Middle"],
-                    "Supports": supports,
-                    "Resistances": resistances,
-                    "open": candle_data["open"],
-                    "high": candle_data["high"],
-                    "low": candle_data["low"],
-                    "close": candle_data["close"],
-                    "Current Price": ticker_data["last_price"],
-                    "change_24h": ticker_data["change_24_hour"],
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                }
-            except Exception as e:
-                pass
-            count += 1
-        dataframe = dataframe.T
+        indicator_dataframe = get_market_indicators(
+            list(coins_dictionary.values()), market=market, screener_name=screener_name, interval=interval, workers=workers
+        )
+        dataframe = scanner.scan(
+            list(coins_dictionary.values()),
+            partial(_market_indicator_row, indicator_dataframe=indicator_dataframe),
+            workers=workers,
+            description="get_market_indicator",
+        )
         if save_dataframe:
             dataframe.to_csv(
                 rf"{constants.MARKET_DATA_DIRECTORY}\market_indicator_data.csv", index=False
@@ -1801,7 +1873,31 @@ def what_if(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False,
     # Iffy in sideways market
 
 
-def long_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False, save_dataframe: bool = False, interval: str = "5m", balance_only: bool= False, max_leverage: int = 2):
+def _long_row(coin: str, indicator_dataframe: pd.DataFrame) -> dict:
+    """The long_recommendations row of a market that can be longed: RSI under 30 and the price under the lower Bollinger band or
+    the MACD under its signal. None otherwise."""
+    if coin not in indicator_dataframe.index:
+        return None
+    coin_1, coin_2 = market_registry.REGISTRY.split(coin)
+    current_price = float(get_ticker(coin_1=coin_1, coin_2=coin_2)["last_price"].values[0])
+    indicator_data = indicator_dataframe.loc[coin]
+    if indicator_data["RSI"] < 30 and (
+        current_price < indicator_data["BB.lower"] or indicator_data["MACD.signal"] > indicator_data["MACD.macd"]
+    ):
+        print(
+            f"{coin} can be longed at {current_price} as its RSI is {indicator_data['RSI']} and the BB lower is {indicator_data['BB.lower']}"
+        )
+        return {
+            "RSI": indicator_data["RSI"],
+            "BB.upper": indicator_data["BB.upper"],
+            "BB.lower": indicator_data["BB.lower"],
+            "MACD.signal": indicator_data["MACD.signal"],
+            "current_price": current_price,
+        }
+    return None
+
+
+def long_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False, save_dataframe: bool = False, interval: str = "5m", balance_only: bool= False, max_leverage: int = 2, workers: int = SCANNER_CONFIG["workers"]):
     """
     Generates long recommendations based on certain criteria.
 
@@ -1811,6 +1907,7 @@ def long_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: b
         all_coins (bool, optional): Whether to consider all coins. Defaults to False.
         save_dataframe (bool, optional): Whether to save the resulting dataframe. Defaults to False.
         interval (str, optional): The interval to use for calculations. Defaults to "4h".
+        workers (int, optional): The number of markets scanned concurrently. Defaults to the scanner workers of the config file.
 
     Returns:
         pandas.DataFrame: The resulting dataframe containing long recommendations.
@@ -1827,83 +1924,28 @@ def long_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: b
         account_balance_dataframe = get_account_balance(username=CONFIG["Owner"]["main_username"], save_dataframe=True)
     account_balance_dataframe = account_balance_dataframe[account_balance_dataframe['max_leverage'] > max_leverage]
     if balance_only:
-        for coin in account_balance_dataframe["market"].values:
-            if "USDT" in coin:
-                coin_1 = coin.split("USDT")[0]
-                coin_2 = "USDT"
-            elif "BTC" in coin:
-                coin_1 = coin.split("BTC")[0]
-                coin_2 = "BTC"
-            elif "USDC" in coin:
-                coin_1 = coin.split("USDC")[0]
-                coin_2 = "USDC"
-            current_price = get_ticker(coin_1=coin_1, coin_2=coin_2)['last_price'].astype(float).values[0]
-            indicator_data = get_indicator_data(coin_1=coin_1, coin_2 = coin_2, interval=interval)
-            print(coin_1+coin_2, current_price.values[0], indicator_data["RSI"], indicator_data["BB.lower"])
-            try:
-                print(indicator_data)
-                if indicator_data["RSI"] < 30 and current_price < indicator_data['BB.lower'].values[0]:
-                    print(indicator_data)
-                    long_dataframe['market'] = coin_1+coin_2
-                    long_dataframe['RSI'] = indicator_data['RSI']
-                    long_dataframe['BB.upper'] = indicator_data['BB.upper']
-                    long_dataframe['BB.lower'] = indicator_data['BB.lower']
-                    long_dataframe['MACD.signal'] = indicator_data['MACD.signal']
-                    long_dataframe['current_price'] = current_price
-                elif indicator_data['RSI'] < 30 and indicator_data['MACD.signal'] > indicator_data['MACD.macd']:
-                    print(indicator_data)
-                    long_dataframe['market'] = coin_1+coin_2
-                    long_dataframe['RSI'] = indicator_data['RSI']
-                    long_dataframe['BB.upper'] = indicator_data['BB.upper']
-                    long_dataframe['BB.lower'] = indicator_data['BB.lower']
-                    long_dataframe['MACD.signal'] = indicator_data['MACD.signal']
-                    long_dataframe['current_price'] = current_price
-            except Exception as e:
-                print(e)
-                pass
+        markets = list(account_balance_dataframe["market"].values)
+        indicator_dataframe = get_market_indicators(markets, interval=interval, workers=workers)
+        long_dataframe = scanner.scan(
+            markets,
+            partial(_long_row, indicator_dataframe=indicator_dataframe),
+            workers=workers,
+            description="long_recommendations",
+            errors=False,
+        )
         print(long_dataframe)
         if not long_dataframe.empty:
             send_mail(f"The following can be longed: {long_dataframe}!", CONFIG["Owner"]["email"])
     if all_coins:
-        dataframe = get_markets_details(all_coins=all_coins)
-        dataframe.fillna(0, inplace=True)
-        dataframe = dataframe.loc[dataframe['max_leverage'] > max_leverage]
-        dataframe.sort_values(by="max_leverage", ascending=False, inplace=True)
-        for coin in dataframe["coindcx_name"].values:
-            if "USDT" in coin:
-                coin_1 = coin.split("USDT")[0]
-                coin_2 = "USDT"
-            elif "BTC" in coin:
-                coin_1 = coin.split("BTC")[0]
-                coin_2 = "BTC"
-            elif "USDC" in coin:
-                coin_1 = coin.split("USDC")[0]
-                coin_2 = "USDC"
-            current_price = get_ticker(coin_1=coin_1, coin_2=coin_2)['last_price'].astype(float)
-            indicator_data = get_indicator_data(coin_1=coin_1, coin_2 = coin_2, interval=interval)
-            print(coin_1+coin_2, current_price.values[0])
-            try:
-                # print(type(indicator_data["RSI"]), type(indicator_data["BB.lower"]), type(indicator_data["MACD.macd"]), type(indicator_data["MACD.signal"]))
-                if indicator_data["RSI"] < 30 and current_price.values[0] < indicator_data['BB.lower']:
-                    long_dataframe['market'] = coin_1+coin_2
-                    long_dataframe['RSI'] = indicator_data['RSI']
-                    long_dataframe['BB.upper'] = indicator_data['BB.upper']
-                    long_dataframe['BB.lower'] = indicator_data['BB.lower']
-                    long_dataframe['MACD.signal'] = indicator_data['MACD.signal']
-                    long_dataframe['current_price'] = current_price
-                elif indicator_data['RSI'] < 30 and indicator_data['MACD.signal'] > indicator_data['MACD.macd']:
-                    long_dataframe['market'] = coin_1+coin_2
-                    long_dataframe['RSI'] = indicator_data['RSI']
-                    long_dataframe['BB.upper'] = indicator_data['BB.upper']
-                    long_dataframe['BB.lower'] = indicator_data['BB.lower']
-                    long_dataframe['MACD.signal'] = indicator_data['MACD.signal']
-                    long_dataframe['current_price'] = current_price
-                    print(f"{coin_1+coin_2} can be longed at {current_price.values[0]} as its RSI is {indicator_data['RSI']} and the BB lower is {indicator_data['BB.lower']}")
-            except Exception as e:
-                logging.info(e)
-                print(f'Exception is {e} for {coin_1+coin_2}')
-                print(indicator_data)
-                pass
+        leveraged_markets = market_registry.REGISTRY.leveraged_markets(min_leverage=max_leverage, quote=coin_2)
+        indicator_dataframe = get_market_indicators(leveraged_markets, interval=interval, workers=workers)
+        long_dataframe = scanner.scan(
+            leveraged_markets,
+            partial(_long_row, indicator_dataframe=indicator_dataframe),
+            workers=workers,
+            description="long_recommendations",
+            errors=False,
+        )
     if not long_dataframe.empty:
         send_mail(f"The following can be longed: {long_dataframe}!", CONFIG["Owner"]["email"])
     if save_dataframe:
@@ -1912,7 +1954,25 @@ def long_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: b
     return long_dataframe
 
 
-def short_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False, save_dataframe: bool = False, interval: str = "4h"):
+def _short_row(coin: str, indicator_dataframe: pd.DataFrame) -> dict:
+    """The short_recommendations row of a market that can be shorted: RSI over 75 and the price over the upper Bollinger band.
+    None otherwise."""
+    if coin not in indicator_dataframe.index:
+        return None
+    coin_1, coin_2 = market_registry.REGISTRY.split(coin)
+    current_price = float(get_ticker(coin_1=coin_1, coin_2=coin_2)["last_price"].values[0])
+    indicator_data = indicator_dataframe.loc[coin]
+    if indicator_data["RSI"] > 75 and current_price > indicator_data["BB.upper"]:
+        return {
+            "RSI": indicator_data["RSI"],
+            "BB.upper": indicator_data["BB.upper"],
+            "BB.lower": indicator_data["BB.lower"],
+            "current_price": current_price,
+        }
+    return None
+
+
+def short_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins: bool = False, save_dataframe: bool = False, interval: str = "4h", workers: int = SCANNER_CONFIG["workers"]):
     # For a short position with isolated margin, the formula is Entry price / (1 - (Initial margin ratio / Leverage))
 
     coin_1 = coin_1.upper()
@@ -1921,25 +1981,15 @@ def short_recommendations(coin_1: str = "BTC", coin_2: str = "USDT", all_coins:
     if all_coins:
         dataframe = get_market_data()
         print(dataframe)
-        for coin in dataframe["market"].values:
-            if "USDT" in coin:
-                coin_1 = coin.split("USDT")[0]
-                coin_2 = "USDT"
-            elif "BTC" in coin:
-                coin_1 = coin.split("BTC")[0]
-                coin_2 = "BTC"
-            elif "USDC" in coin:
-                coin_1 = coin.split("USDC")[0]
-                coin_2 = "USDC"
-            current_price = get_ticker(coin_1=coin_1, coin_2=coin_2)['last_price']
-            indicator_data = get_indicator_data(coin_1=coin_1, coin_2 = coin_2, interval=interval)
-            print(coin_1+coin_2, current_price)
-            if indicator_data["RSI"] > 75 and current_price > indicator_data['BB.Upper']:
-                short_dataframe['market'] = coin_1+coin_2
-                short_dataframe['RSI'] = indicator_data['RSI']
-                short_dataframe['BB.upper'] = indicator_data['BB.upper']
-                short_dataframe['BB.lower'] = indicator_data['BB.lower']
-                short_dataframe['current_price'] = current_price
+        markets = list(dataframe["market"].values)
+        indicator_dataframe = get_market_indicators(markets, interval=interval, workers=workers)
+        short_dataframe = scanner.scan(
+            markets,
+            partial(_short_row, indicator_dataframe=indicator_dataframe),
+            workers=workers,
+            description="short_recommendations",
+            errors=False,
+        )
 
     if save_dataframe:
         short_dataframe.to_csv(os.path.join(constants.MARKET_DATA_DIRECTORY, "\long_recommendations.csv"))
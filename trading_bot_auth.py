@@ -1,11 +1,13 @@
 """Python script to manage Authentication of users to use the trading bot."""
 import argparse
 import logging
+import threading
+import time
 
 import yaml
 
 import database_handler
-from constants import CONFIG, CONFIG_FILE, LOGFILE
+from constants import CACHE_CONFIG, CONFIG, CONFIG_FILE, LOGFILE
 
 PARSER = argparse.ArgumentParser()
 logging.basicConfig(
@@ -16,6 +18,77 @@ logging.basicConfig(
 )
 
 
+class CredentialCache:
+    """In memory cache of the decrypted API key and secret key of every user for a configurable time to live.
+
+    Without it every signed request reads and decrypts the keys from the database. The decrypted keys are never written to disk
+    or logged, and updating or deleting the credentials of a user drops the cached keys of the user.
+    """
+
+    def __init__(self, ttl: float = CACHE_CONFIG["credentials_ttl"]) -> None:
+        """Create an empty cache.
+
+        Args:
+            ttl (float, optional): Seconds after which the keys of a user are read from the database again. 0 disables the cache.
+                Defaults to the credentials ttl of the config file.
+        """
+        self.ttl = float(ttl)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, user: str):
+        """Get the cached keys of a user.
+
+        Args:
+            user (str): The normalized username. Eg: "vishalnadig".
+
+        Returns:
+            tuple: The API key and the secret key. None if they are not cached or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(user)
+            if entry is not None and time.monotonic() < entry[1]:
+                self._stats["hits"] += 1
+                return entry[0]
+            self._entries.pop(user, None)
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, user: str, credentials: tuple) -> None:
+        """Cache the keys of a user. Anything but an (api_key, secret_key) tuple, eg: a {404: ...} error, is not cached."""
+        if self.ttl <= 0 or not isinstance(credentials, tuple) or len(credentials) != 2:
+            return
+        with self._lock:
+            self._entries[user] = (credentials, time.monotonic() + self.ttl)
+
+    def put_many(self, credentials: dict) -> None:
+        """Cache the keys of many users at once. credentials maps every normalized username to its (api_key, secret_key)."""
+        if self.ttl <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for user, keys in credentials.items():
+                if isinstance(keys, tuple) and len(keys) == 2:
+                    self._entries[user] = (keys, expires_at)
+
+    def invalidate(self, user: str = None) -> None:
+        """Drop the keys of one user, or of every user if user is None."""
+        with self._lock:
+            if user is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user, None)
+
+    def stats(self) -> dict:
+        """Get the hits, misses and number of users of the cache."""
+        with self._lock:
+            return dict(self._stats, users=len(self._entries))
+
+
+CREDENTIALS = CredentialCache()
+
+
 def get_credentials_config_file(
     first_name: str = "", last_name: str = "", username: str = ""
 ) -> tuple:
@@ -46,6 +119,26 @@ def get_credentials_config_file(
         return {404: "Key Error! Check user or first name and last name."}
 
 
+def get_all_credentials_config_file(usernames: list = None) -> dict:
+    """Get the API key and secret key of many users of the config file in one pass over its accounts.
+
+    Args:
+        usernames (list, optional): The usernames to get. Defaults to None to get every account of the config file.
+
+    Returns:
+        dict: The tuple of API key and secret key of every user found, keyed by username.
+    """
+    accounts = CONFIG["trading"]["accounts"]
+    if usernames is not None:
+        users = {username.lower().replace(" ", "") for username in usernames}
+        accounts = {user: account for user, account in accounts.items() if user in users}
+    return {
+        user: (account["api_key"], account["secret_key"])
+        for user, account in accounts.items()
+        if isinstance(account, dict) and "api_key" in account and "secret_key" in account
+    }
+
+
 def add_user_credentials_config_file(
     username: str = "",
     first_name: str = "",
@@ -135,6 +228,7 @@ def update_user_credentials_config_file(
         config_dictionary["trading"]["accounts"][user] = updated_dictionary
         with open(CONFIG_FILE, "w", encoding="utf-8") as file:
             yaml.safe_dump(config_dictionary, file)
+        CREDENTIALS.invalidate(user)
         logging.info(f"{user} updated successfully.")
         return {200: "User updated!"}
 
@@ -164,6 +258,7 @@ def delete_user_credentials_config_file(first_name: str, last_name: str, usernam
         del CONFIG["trading"]["accounts"][user]
         with open(CONFIG_FILE, "w", encoding="utf-8") as file:
             yaml.safe_dump(CONFIG, file)
+        CREDENTIALS.invalidate(user)
         logging.info(f"{user} deleted successfully.")
         return {200: "User deleted!"}
     else:
@@ -268,15 +363,19 @@ def update_user_credentials_database(
     else:
         raise ValueError("Either username or first_name and last_name must be provided.")
     logging.info(f"Updating credentials for {user}.")
-    return database_handler.update_user_credentials(
-        username=user,
-        first_name=first_name,
-        last_name=last_name,
-        api_key=api_key,
-        secret_key=secret_key,
-        email=email,
-        google_auth_key=google_auth_key,
-    )
+    try:
+        return database_handler.update_user_credentials(
+            username=user,
+            first_name=first_name,
+            last_name=last_name,
+            api_key=api_key,
+            secret_key=secret_key,
+            email=email,
+            google_auth_key=google_auth_key,
+        )
+    finally:
+        # Dropped after the write so that a concurrent lookup cannot cache the old keys again.
+        CREDENTIALS.invalidate(user)
 
 
 def delete_user_credentials_database(first_name: str, last_name: str, username: str = ""):
@@ -298,14 +397,17 @@ def delete_user_credentials_database(first_name: str, last_name: str, username:
     else:
         raise ValueError("Either username or first_name and last_name must be provided.")
     logging.info(f"Deleting credentials for {user}.")
-    return database_handler.delete_user_credentials(
-        first_name=first_name, last_name=last_name, username=user
-    )
+    try:
+        return database_handler.delete_user_credentials(
+            first_name=first_name, last_name=last_name, username=user
+        )
+    finally:
+        CREDENTIALS.invalidate(user)
 
 
 def get_user_credentials(first_name: str = "", last_name: str = "", username: str = ""):
     """
-    Retrieves the user credentials based on the provided parameters.
+    Retrieves the user credentials based on the provided parameters. The keys are served from CREDENTIALS once they were read.
 
     Parameters:
         first_name (str): The first name of the user. Defaults to an empty string.
@@ -320,23 +422,61 @@ def get_user_credentials(first_name: str = "", last_name: str = "", username: st
     """
     if username:
         user = username.lower().replace(" ", "")
+    elif first_name and last_name:
+        user = (first_name + last_name).lower().replace(" ", "")
+    else:
+        raise ValueError("Either username or first_name and last_name must be provided.")
+    credentials = CREDENTIALS.get(user)
+    if credentials is not None:
+        return credentials
+    if username:
         try:
-            return get_user_credentials_database(username=user)
+            credentials = get_user_credentials_database(username=user)
         except Exception as e:
             logging.error(e)
             return {404: e}
-    elif first_name and last_name:
+    else:
         try:
-            return get_user_credentials_database(first_name=first_name, last_name=last_name)
+            credentials = get_user_credentials_database(first_name=first_name, last_name=last_name)
         except Exception as e:
             logging.error(e)
             try:
-                return get_credentials_config_file(first_name=first_name, last_name=last_name)
+                credentials = get_credentials_config_file(first_name=first_name, last_name=last_name)
             except Exception as e:
                 logging.error(e)
                 return {404: e}
-    else:
-        raise ValueError("Either username or first_name and last_name must be provided.")
+    CREDENTIALS.put(user, credentials)
+    return credentials
+
+
+def preload_credentials(usernames: list = None, source: str = "database", workers: int = 8) -> dict:
+    """Load the keys of many users into CREDENTIALS at startup so that their signed requests never wait for the database.
+
+    The database source reads every user in a single query and decrypts the keys on workers threads. If it fails, the keys are
+    loaded from the config file instead.
+
+    Args:
+        usernames (list, optional): The usernames to load. Defaults to None to load every user.
+        source (str, optional): Either "database" or "config_file". Defaults to "database".
+        workers (int, optional): The number of threads decrypting the keys. Defaults to 8.
+
+    Returns:
+        dict: The source used, the number of users loaded and the seconds taken.
+    """
+    start = time.perf_counter()
+    credentials = None
+    if source == "database":
+        try:
+            credentials = database_handler.get_all_user_credentials(usernames=usernames, workers=workers)
+        except Exception as e:
+            logging.error(e)
+            source = "config_file"
+    if credentials is None:
+        credentials = get_all_credentials_config_file(usernames=usernames)
+    CREDENTIALS.put_many(credentials)
+    report = {"source": source, "users": len(credentials), "seconds": round(time.perf_counter() - start, 3)}
+    logging.info(f"Preloaded credentials: {report}")
+    return report
 
 
 def add_user_credentials(first_name: str = "", last_name: str = "", username: str = "", api_key: str = "", secret_key: str = "", email: str = "", google_auth_key: str = ""):
@@ -0,0 +1,132 @@
+"""Indicator data of many markets from TradingView in a few multi-symbol requests."""
+import logging
+
+import pandas as pd
+from tradingview_ta import get_multiple_analysis
+
+import exchange_resolution
+import rate_limiter
+from constants import INTERVAL_DICT, LOGFILE, TRADINGVIEW_CONFIG
+
+logging.basicConfig(
+    level=logging.INFO,
+    filemode="a",
+    filename=LOGFILE,
+    format="%(asctime)s;%(levelname)s;%(message)s",
+)
+
+
+def _chunks(items: list, size: int) -> list:
+    return [items[index : index + size] for index in range(0, len(items), size)]
+
+
+def fetch_batch(
+    markets: list,
+    exchange: str = "Binance",
+    screener_name: str = "Crypto",
+    interval: str = "4h",
+    timeout: float = TRADINGVIEW_CONFIG["timeout"],
+) -> dict:
+    """Get the indicator data of markets of one exchange in a single TradingView request.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        exchange (str, optional): The exchange on TradingView. Defaults to "Binance".
+        screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        timeout (float, optional): Seconds to wait for TradingView. Defaults to the tradingview timeout of the config file.
+
+    Returns:
+        dict: The indicator data keyed by market. Markets TradingView does not know are left out.
+    """
+    symbols = {f"{exchange.upper()}:{market}": market for market in markets}
+    analysis = rate_limiter.LIMITER.call(
+        rate_limiter.TRADINGVIEW_URL,
+        get_multiple_analysis,
+        screener=screener_name,
+        interval=INTERVAL_DICT[str(interval)],
+        symbols=list(symbols),
+        timeout=timeout,
+    )
+    return {
+        symbols[symbol]: result.indicators for symbol, result in analysis.items() if result is not None and symbol in symbols
+    }
+
+
+def get_indicators(
+    markets: list,
+    exchange: str = "Binance",
+    screener_name: str = "Crypto",
+    interval: str = "4h",
+    fallback_exchanges: list = None,
+    batch_size: int = TRADINGVIEW_CONFIG["batch_size"],
+) -> pd.DataFrame:
+    """Get the indicator data of many markets with chunked multi-symbol requests instead of one request per market.
+
+    The markets are grouped by exchange and requested batch_size at a time. A market missing from its batch falls back to the next
+    exchange of its own chain: the exchange it is listed on at CoinDCX, then the fallback exchanges. The fallbacks of all the missing
+    markets of an exchange are batched as well. Markets whose exchange is in the exchange resolution cache are requested from it
+    directly and markets no exchange served recently are skipped.
+
+    Args:
+        markets (list): The markets. Eg: ["BTCUSDT", "ETHUSDT"].
+        exchange (str, optional): The exchange to look the markets up on first. Defaults to "Binance".
+        screener_name (str, optional): Either "India" or "Crypto". Defaults to "Crypto".
+        interval (str, optional): Interval of chart "1m", "5m", "30m", "1h", "2h", "4h", "1d", "1W", "1M". Defaults to "4h".
+        fallback_exchanges (list, optional): The exchanges to try last. Defaults to the tradingview fallback exchanges of the config file.
+        batch_size (int, optional): The maximum number of symbols per request. Defaults to the tradingview batch size of the config file.
+
+    Returns:
+        pd.DataFrame: The indicator data indexed by market with the exchange it was found on. Markets found nowhere are left out.
+    """
+    resolutions = exchange_resolution.RESOLUTIONS
+    pending = {}
+    chains = {}
+    for market in dict.fromkeys(markets):
+        chains[market] = exchange_resolution.exchange_chain(market, exchange, fallback_exchanges)
+        missing, resolved = resolutions.lookup(market, screener_name, chain=chains[market])
+        if missing:
+            continue
+        pending[market] = list(chains[market])
+        if resolved:
+            pending[market] = [resolved] + [candidate for candidate in chains[market] if candidate != resolved]
+    results = {}
+    errored = set()
+    requests_made = 0
+    while pending:
+        groups = {}
+        for market, chain in pending.items():
+            groups.setdefault(chain[0], []).append(market)
+        for group_exchange, group in groups.items():
+            for chunk in _chunks(group, batch_size):
+                requests_made += 1
+                try:
+                    found = fetch_batch(chunk, exchange=group_exchange, screener_name=screener_name, interval=interval)
+                except Exception as e:
+                    logging.info(f"Error in the TradingView batch of {len(chunk)} markets on {group_exchange}: {e}")
+                    # A failed request says nothing about the listings, the cache is left as it is for these markets.
+                    errored.update(chunk)
+                    found = {}
+                for market in chunk:
+                    if market in found:
+                        results[market] = {**found[market], "exchange": group_exchange}
+                        attempts = chains[market].index(group_exchange) + 1 if group_exchange in chains[market] else 1
+                        resolutions.record(market, screener_name, group_exchange, attempts=attempts)
+                        del pending[market]
+                    else:
+                        if market not in errored:
+                            resolutions.forget(market, screener_name)
+                        pending[market].pop(0)
+                        if not pending[market]:
+                            if market not in errored:
+                                resolutions.record_missing(market, screener_name)
+                            del pending[market]
+    resolutions.save()
+    missing = len(dict.fromkeys(markets)) - len(results)
+    logging.info(
+        f"TradingView indicators of {len(results)} markets in {requests_made} requests, {missing} not found. "
+        f"Exchange resolutions: {resolutions.stats()}"
+    )
+    dataframe = pd.DataFrame.from_dict(results, orient="index")
+    dataframe.index.name = "market"
+    return dataframe